@@ -0,0 +1 @@
+"""Pages of the Streamlit app, loaded by ``st.navigation`` in ``autoparts_app.py``."""
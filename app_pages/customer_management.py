@@ -0,0 +1,108 @@
+import streamlit as st
+
+from autoparts import catalog, crm, exports, metrics, parallel, replica, reports
+from autoparts.db import get_engine
+from app_pages.ui import export_button, replica_caption
+
+engine = get_engine()
+report_engine = replica.reporting_engine(engine)
+
+# every tab renders on each rerun, so start the reads the tabs don't feed into first
+cust_list_df = parallel.submit(catalog.customers_snapshot, engine, section="customer list")
+cust_analytics = parallel.submit(reports.customer_analytics, report_engine, section="analytics")
+
+st.subheader("👥 Customer Relationship Management")
+tab1, tab2, tab3, tab4 = st.tabs(["View Customers", "Add New Customer", "Remove Customer", "Customer Analytics"])
+
+with tab1:
+    st.write("### 📇 Active Customer Directory")
+
+    search_customer = st.text_input("🔍 Search customers by name or email")
+
+    directory_conditions = crm.directory_filters(search_customer)
+    with metrics.section("directory"):
+        cust_df = crm.directory_frame(engine, directory_conditions)
+
+    if not cust_df.empty:
+        st.dataframe(
+            cust_df,
+            use_container_width=True,
+            column_config={
+                "CreatedDate": st.column_config.DateColumn(format="DD/MM/YYYY")
+            }
+        )
+
+        export_button(
+            "📥 Export Customer List", "customers_export",
+            lambda fmt, out: exports.export(engine, crm.directory_export(directory_conditions), out, fmt),
+            key="customers_export",
+        )
+    else:
+        st.info("No customers found.")
+
+with tab2:
+    st.write("### ➕ Register New Customer")
+    with st.form("add_cust_form"):
+        new_cust_name = st.text_input("Full Name *", placeholder="John Doe")
+        new_cust_email = st.text_input("Email Address", placeholder="john@example.com")
+        new_cust_phone = st.text_input("Phone Number", placeholder="+27 123 456 789")
+
+        submit_cust = st.form_submit_button("Add Customer", type="primary")
+
+        if submit_cust:
+            if new_cust_name == "":
+                st.error("Full Name is required.")
+            else:
+                try:
+                    crm.add_customer(engine, new_cust_name, new_cust_email, new_cust_phone)
+                    st.success(f"✅ {new_cust_name} added successfully!")
+                    st.rerun()
+                except Exception as e:
+                    metrics.record_error(e)
+                    st.error(f"Error adding customer: {str(e)}")
+
+with tab3:
+    st.write("### 🗑️ Remove Customer Profile")
+    st.warning("⚠️ Action cannot be undone. Be careful!")
+
+    cust_list_df = cust_list_df.result()
+
+    if not cust_list_df.empty:
+        cust_to_del = st.selectbox("Select Customer to Remove", cust_list_df['FullName'].tolist())
+
+        target_id = cust_list_df[cust_list_df['FullName'] == cust_to_del]['CustomerID'].values[0]
+        with metrics.section("sales count"):
+            sales_count = crm.sales_count(engine, target_id)
+
+        if sales_count > 0:
+            st.error(f"This customer has {sales_count} sales records. Deletion is blocked for audit purposes.")
+            st.info("Consider marking them as inactive instead.")
+        else:
+            if st.button("Delete Customer Permanently", type="secondary"):
+                try:
+                    crm.remove_customer(engine, target_id)
+                    st.success(f"🗑️ Record for {cust_to_del} has been deleted.")
+                    st.rerun()
+                except Exception as e:
+                    metrics.record_error(e)
+                    st.error(f"Error deleting customer: {str(e)}")
+    else:
+        st.info("No customers to delete.")
+
+with tab4:
+    st.write("### 📊 Customer Analytics")
+
+    cust_analytics = cust_analytics.result()
+    replica_caption(report_engine)
+
+    if not cust_analytics.empty:
+        st.dataframe(
+            cust_analytics,
+            use_container_width=True,
+            column_config={
+                "TotalSpent": st.column_config.NumberColumn(format="R %.2f"),
+                "AvgPurchase": st.column_config.NumberColumn(format="R %.2f")
+            }
+        )
+    else:
+        st.info("No purchase data available.")
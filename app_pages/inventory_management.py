@@ -0,0 +1,212 @@
+import pandas as pd
+import streamlit as st
+
+from autoparts import catalog, inventory, metrics, pricelist, reorder, search
+from autoparts.db import get_engine
+from app_pages.ui import STATUS_COLORS, style_stock
+
+engine = get_engine()
+
+st.subheader("📦 Stock Control Center")
+tab1, tab_receive, tab2, tab3 = st.tabs(
+    ["Restock Existing Item", "Goods Received", "Add New Product", "Import Price List"]
+)
+
+with tab1:
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.write("### 📋 Current Inventory Overview")
+
+        search_inv = st.text_input("🔍 Search inventory", "")
+
+        with metrics.section("stock list"):
+            restock_conditions = inventory.part_filters(search.search(search_inv, engine) if search_inv else None)
+            stock_df = inventory.parts_frame(engine, restock_conditions)[
+                ['PartID', 'PartName', 'CarModel', 'StockQTY', 'Price', 'CostPrice']
+            ]
+
+        if not stock_df.empty:
+            with metrics.section("reorder status"):
+                status = reorder.statuses(engine, stock_df['PartID'])
+                styled_df = style_stock(stock_df, engine, status).format({
+                    "Price": "R {:.2f}",
+                    "CostPrice": "R {:.2f}"
+                })
+
+            st.dataframe(styled_df, use_container_width=True)
+
+            to_reorder = int((status == reorder.REORDER).sum())
+            if to_reorder:
+                st.warning(f"⚠️ {to_reorder} items are at or below their reorder point")
+        else:
+            st.info("No items found.")
+
+    with col2:
+        st.write("### ➕ Update Stock")
+        st.info("Select an item to increase quantity.")
+
+        if not stock_df.empty:
+            display_names = dict(zip(stock_df['PartID'], stock_df['PartName'] + " (" + stock_df['CarModel'] + ")"))
+
+            selected_part_id = st.selectbox("Select Part to Restock", list(display_names),
+                                            format_func=display_names.get)
+            selected_row = stock_df[stock_df['PartID'] == selected_part_id].iloc[0]
+            current_stock = int(selected_row['StockQTY'])
+
+            stock_color = STATUS_COLORS.get(status.get(selected_row['PartID']), "gray")
+
+            st.markdown(f"**Current Stock:** <span style='color:{stock_color}; font-weight:bold'>{current_stock}</span>", unsafe_allow_html=True)
+
+            add_qty = st.number_input("Quantity to Add", min_value=1, value=10)
+
+            if st.button("✅ Confirm Restock", type="primary"):
+                try:
+                    inventory.receive_goods(engine, [(selected_part_id, add_qty)])
+                    st.success(f"✅ Added {add_qty} units to {selected_row['PartName']}!")
+                    st.rerun()
+                except inventory.DeliveryError as e:
+                    st.error(str(e))
+        else:
+            st.info("No items available for restocking.")
+
+with tab_receive:
+    st.write("### 🚚 Goods Received")
+    st.caption(
+        "Enter the delivery's lines by PartID, or upload the supplier's delivery note (CSV, gzip CSV or Parquet "
+        "with PartID and Qty columns). The whole delivery is booked in one transaction."
+    )
+    # a new round gives the uploader and line editor fresh keys, so a booked delivery is cleared
+    delivery_round = st.session_state.setdefault('delivery_round', 0)
+    if 'delivery_booked' in st.session_state:
+        st.success(st.session_state.pop('delivery_booked'))
+
+    delivery_note = st.file_uploader("Delivery note", type=["csv", "gz", "parquet"],
+                                     key=f"delivery_note_{delivery_round}")
+    delivery = None
+    if delivery_note is not None:
+        try:
+            delivery = inventory.read_delivery_note(delivery_note, pricelist.format_of(delivery_note.name))
+        except (inventory.DeliveryError, pricelist.PriceListError) as e:
+            st.error(str(e))
+    else:
+        delivery = st.data_editor(
+            pd.DataFrame({"PartID": pd.Series(dtype="Int64"), "Qty": pd.Series(dtype="Int64")}),
+            num_rows="dynamic",
+            use_container_width=True,
+            key=f"delivery_lines_{delivery_round}",
+            column_config={
+                "PartID": st.column_config.NumberColumn("PartID", min_value=1, step=1, required=True),
+                "Qty": st.column_config.NumberColumn("Quantity", min_value=1, step=1, required=True),
+            },
+        ).dropna()
+
+    if delivery is not None and not delivery.empty:
+        with metrics.section("delivery preview"):
+            per_part = delivery.groupby('PartID', as_index=False)['Qty'].sum()
+            preview = per_part.merge(
+                catalog.parts_snapshot(engine)[['PartID', 'PartName', 'CarModel', 'StockQTY']], on='PartID', how='left'
+            )
+            preview['After'] = preview['StockQTY'] + preview['Qty']
+        unknown = preview[preview['PartName'].isna()]
+
+        metric1, metric2, metric3 = st.columns(3)
+        metric1.metric("Lines", len(delivery))
+        metric2.metric("Parts", len(per_part))
+        metric3.metric("Units", f"{int(per_part['Qty'].sum()):,}")
+        st.dataframe(
+            preview[['PartID', 'PartName', 'CarModel', 'StockQTY', 'Qty', 'After']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "StockQTY": st.column_config.NumberColumn("In Stock", format="%d"),
+                "Qty": st.column_config.NumberColumn("Received", format="%d"),
+                "After": st.column_config.NumberColumn("After", format="%d"),
+            },
+        )
+        if not unknown.empty:
+            st.warning(f"⚠️ No part with PartID {', '.join(map(str, unknown['PartID'].tolist()[:20]))}. "
+                       "Correct or remove these lines before booking.")
+
+        if st.button("✅ Book Delivery", type="primary", disabled=not unknown.empty):
+            try:
+                received = inventory.receive_goods(engine, delivery[['PartID', 'Qty']].itertuples(index=False))
+                st.session_state['delivery_booked'] = (
+                    f"✅ Booked {sum(received.values()):,} units across {len(received)} parts!"
+                )
+                st.session_state['delivery_round'] = delivery_round + 1
+                st.rerun()
+            except inventory.DeliveryError as e:
+                st.error(str(e))
+
+with tab2:
+    st.write("### 🆕 Add New Product to Database")
+    with st.form("new_part_form"):
+        col_a, col_b = st.columns(2)
+
+        with col_a:
+            new_name = st.text_input("Part Name *", placeholder="Brake Pad")
+            new_model = st.text_input("Car Model *", placeholder="VW Polo")
+            new_qty = st.number_input("Initial Stock Quantity", min_value=0, value=10)
+            supplier = st.text_input("Supplier", placeholder="Auto Parts Inc.")
+
+        with col_b:
+            cost_price = st.number_input("Cost Price (R) *", min_value=0.0, value=50.0, format="%.2f")
+            markup_pct = st.slider("Markup Percentage (%)", min_value=10, max_value=200, value=50)
+            selling_price = inventory.selling_price(cost_price, markup_pct)
+
+            st.metric("Calculated Selling Price", f"R {selling_price:,.2f}")
+            st.caption(f"Profit per unit: R {selling_price - cost_price:.2f}")
+
+        submit_new = st.form_submit_button("🚀 Add to Inventory", type="primary")
+
+        if submit_new:
+            if not new_name or not new_model:
+                st.error("Part Name and Car Model are required.")
+            else:
+                try:
+                    inventory.add_part(engine, new_name, new_model, selling_price, cost_price, new_qty, supplier)
+                    st.success(f"🚀 {new_name} added successfully!")
+                    st.info(f"Cost: R{cost_price:.2f} | Price: R{selling_price:.2f} | Markup: {markup_pct}%")
+                    st.rerun()
+                except Exception as e:
+                    metrics.record_error(e)
+                    st.error(f"Error adding product: {str(e)}")
+
+with tab3:
+    st.write("### 📥 Import a Supplier Price List")
+    st.caption(
+        "CSV, gzip CSV or Parquet with PartName, CarModel and CostPrice columns, and optionally Supplier, "
+        "Price and MarkupPct. Parts the same supplier already lists are repriced; new parts are added with no stock."
+    )
+    price_file = st.file_uploader("Price list", type=["csv", "gz", "parquet"])
+    col_a, col_b = st.columns(2)
+    with col_a:
+        import_supplier = st.text_input("Supplier for rows that name none", "")
+    with col_b:
+        import_markup = st.slider("Markup for rows without a price (%)", min_value=10, max_value=200,
+                                  value=pricelist.DEFAULT_MARKUP, key="import_markup")
+
+    if price_file is not None and st.button("📥 Import Price List", type="primary"):
+        try:
+            with st.spinner("Importing..."), metrics.section("price list import"):
+                result = pricelist.import_price_list(
+                    engine, price_file, pricelist.format_of(price_file.name), import_supplier or None, import_markup,
+                )
+            st.success(f"✅ Imported {result.rows:,} rows from {price_file.name}")
+            kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
+            kpi1.metric("Inserted", f"{result.inserted:,}")
+            kpi2.metric("Updated", f"{result.updated:,}")
+            kpi3.metric("Unchanged", f"{result.unchanged:,}")
+            kpi4.metric("Superseded", f"{result.superseded:,}",
+                        help="Rows left out because a later row in the list is for the same part")
+            kpi5.metric("Rejected", f"{result.rejected:,}")
+            if result.rejected:
+                shown = "" if len(result.rejects) == result.rejected else f" (first {len(result.rejects):,})"
+                st.warning(f"⚠️ {result.rejected:,} rows were not imported{shown}:")
+                st.dataframe(result.rejects, use_container_width=True, hide_index=True)
+        except pricelist.PriceListError as e:
+            st.error(str(e))
+        except Exception as e:
+            metrics.record_error(e)
+            st.error(f"Error importing price list: {str(e)}")
@@ -0,0 +1,73 @@
+import streamlit as st
+
+from autoparts import exports, inventory, metrics, parallel, reorder, search
+from autoparts.db import get_engine
+from autoparts.pagination import PAGE_SIZES
+from app_pages.ui import export_button, keyset_pager, pager_controls, style_stock
+
+engine = get_engine()
+
+st.subheader("📦 Current Stock Levels")
+
+col1, col2, col3 = st.columns([3, 1, 1])
+with col1:
+    search_term = st.text_input("🔍 Search parts by name or car model", "")
+with col2:
+    reorder_only = st.checkbox("Show parts due for reorder only")
+with col3:
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+due = None
+if reorder_only:
+    with metrics.section("reorder status"):
+        due = reorder.reorder_ids(engine)
+matches = all_matches = None
+if search_term:
+    with metrics.section("search"):
+        all_matches = search.search(search_term, engine, part_ids=due, limit=None)
+    matches = all_matches[:search.DEFAULT_LIMIT]
+conditions = inventory.part_filters(matches, due)
+
+pager = keyset_pager('inventory_pager', (search_term, reorder_only, page_size))
+# the tiles cover every match, not just the top ones the grid lists
+if all_matches is None:
+    kpis = parallel.submit(inventory.parts_kpis, engine, conditions, section="kpis")
+else:
+    kpis = parallel.submit(inventory.matched_kpis, engine, all_matches, section="kpis")
+with metrics.section("grid"):
+    page = inventory.parts_page(engine, conditions, pager['cursors'][-1], page_size)
+df = page.rows
+
+if not df.empty:
+    if all_matches is not None and len(all_matches) > search.DEFAULT_LIMIT:
+        st.caption(f"Listing the top {search.DEFAULT_LIMIT} of {len(all_matches):,} matches; the totals cover all "
+                   f"of them. Refine your search to narrow the list.")
+
+    kpis = kpis.result()
+
+    metric1, metric2, metric3 = st.columns(3)
+    metric1.metric("Total Items", kpis['TotalItems'])
+    metric2.metric("Total Stock QTY", kpis['TotalQty'])
+    metric3.metric("Total Inventory Value", f"R {kpis['TotalValue']:,.2f}")
+
+    with metrics.section("reorder status"):
+        styled_df = style_stock(df, engine)
+
+    st.dataframe(
+        styled_df,
+        use_container_width=True,
+        column_config={
+            "Price": st.column_config.NumberColumn("Price", format="R %.2f"),
+            "StockQTY": st.column_config.NumberColumn("In Stock", format="%d"),
+            "CostPrice": st.column_config.NumberColumn("Cost", format="R %.2f")
+        }
+    )
+    pager_controls('inventory_pager', pager, page)
+
+    export_button(
+        "📥 Export Inventory", "inventory_export",
+        lambda fmt, out: exports.export(engine, inventory.parts_export(conditions), out, fmt),
+        key="inventory_export",
+    )
+else:
+    st.info("No items found matching your search criteria.")
@@ -0,0 +1,81 @@
+import streamlit as st
+from datetime import datetime, date, timedelta
+
+from autoparts import exports, metrics, replica, reports
+from autoparts.db import get_engine
+from app_pages.ui import export_button, replica_caption
+
+engine = get_engine()
+
+st.subheader("📊 Financial Overview & Profit Report")
+
+col1, col2 = st.columns(2)
+with col1:
+    report_month = st.selectbox("Select Period", reports.PERIODS + reports.MONTHS)
+
+with col2:
+    report_year = datetime.now().year
+    custom_start = custom_end = None
+
+    if report_month == "Custom Range":
+        custom_start = st.date_input("Start Date", date.today() - timedelta(days=30))
+        custom_end = st.date_input("End Date", date.today())
+    elif report_month in reports.MONTHS:
+        report_year = st.selectbox("Select Year", 
+                                 [datetime.now().year, datetime.now().year - 1])
+
+period_start, period_end = reports.period_range(report_month, report_year, custom_start, custom_end)
+
+try:
+    report_engine = replica.reporting_engine(engine)
+    with metrics.section("profit report"):
+        df_sales = reports.profit_report(report_engine, period_start, period_end)
+    replica_caption(report_engine)
+
+    if df_sales.empty:
+        st.info("No sales recorded for the selected period.")
+    else:
+        total_rev = df_sales['Total_Revenue'].sum()
+        total_cost = df_sales['Total_Cost'].sum()
+        total_profit = df_sales['Gross_Profit'].sum()
+        avg_margin = (total_profit / total_rev) * 100 if total_rev > 0 else 0
+        total_units = df_sales['Units_Sold'].sum()
+
+        kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
+        kpi1.metric("Total Revenue", f"R {total_rev:,.2f}")
+        kpi2.metric("Total Cost", f"R {total_cost:,.2f}")
+        kpi3.metric("Gross Profit", f"R {total_profit:,.2f}")
+        kpi4.metric("Avg Margin", f"{avg_margin:.1f}%")
+        kpi5.metric("Units Sold", f"{total_units:,}")
+
+        st.divider()
+
+        st.dataframe(
+            df_sales, 
+            use_container_width=True,
+            column_config={
+                "Total_Revenue": st.column_config.NumberColumn(format="R %.2f"),
+                "Total_Cost": st.column_config.NumberColumn(format="R %.2f"),
+                "Gross_Profit": st.column_config.NumberColumn(format="R %.2f"),
+                "Margin_%": st.column_config.NumberColumn(format="%.1f%%"),
+                "Units_Sold": st.column_config.NumberColumn(format="%d")
+            }
+        )
+
+        if report_month == "Custom Range":
+            file_name_part = f"custom_{custom_start}_{custom_end}"
+        elif report_month.isdigit():
+            file_name_part = f"{report_month}_{report_year}"
+        else:
+            file_name_part = report_month.lower().replace(" ", "_")
+
+        export_button(
+            "📥 Download Profit Report", f"profit_report_{file_name_part}",
+            lambda fmt, out: exports.export(report_engine, reports.profit_export(period_start, period_end), out,
+                                            fmt, transform=reports.add_margins),
+            key="profit_export",
+        )
+
+except Exception as e:
+    metrics.record_error(e)
+    st.error(f"Database Error: {e}")
@@ -0,0 +1,249 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from autoparts import catalog, holds, journal, metrics, numbering, parallel, receipts, search
+from autoparts.config import get_settings
+from autoparts.db import UNREACHABLE, get_engine
+
+engine = get_engine()
+
+st.subheader("🛒 New Transaction")
+
+if 'cart' not in st.session_state:
+    st.session_state['cart'] = []
+
+# the cart's stock holds are placed under this token
+if 'hold_token' not in st.session_state:
+    st.session_state['hold_token'] = holds.new_token()
+
+# taken afresh after each sale; None while the till has no numbers left and the database cannot be reached
+if st.session_state.get('receipt_number') is None:
+    try:
+        st.session_state['receipt_number'] = numbering.next_receipt_number()
+    except UNREACHABLE as e:
+        metrics.record_error(e)
+        st.session_state['receipt_number'] = None
+
+# units this till has sold that the central stock does not show yet
+sold_here = pd.Series(dtype="int64")
+if journal.enabled():
+    # also drains sales left in the journal by an earlier run
+    replicator = journal.replicator(engine)
+    sold_here = journal.pending_units()
+    waiting = journal.counts()[journal.PENDING]
+    if waiting:
+        st.caption(f"🕒 {waiting} sales on this till are waiting to reach the central database."
+                   + (f" Last attempt: {replicator.last_error}" if replicator.last_error else ""))
+
+customers_df = parallel.submit(catalog.customers_snapshot, engine, section="customers")
+held_elsewhere = parallel.submit(holds.held_elsewhere, engine, st.session_state['hold_token'], section="holds")
+with metrics.section("parts"):
+    parts_df = catalog.parts_snapshot(engine)
+customers_df = customers_df.result()
+
+if customers_df.empty:
+    st.error("No customers found! Please add customers first.")
+else:
+    selected_cust_name = st.selectbox("Select Customer", customers_df['FullName'].tolist())
+    cust_id = customers_df[customers_df['FullName'] == selected_cust_name]['CustomerID'].values[0]
+
+    col_rec1, col_rec2 = st.columns([2, 1])
+    with col_rec1:
+        st.info(f"**Receipt No:** {st.session_state['receipt_number'] or '—'} | **Customer:** {selected_cust_name}")
+    with col_rec2:
+        st.info(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+
+    st.divider()
+
+    col_search, col_filter = st.columns([3, 1])
+    with col_search:
+        part_search = st.text_input("🔍 Search parts", "")
+    with col_filter:
+        unique_models = ["All"] + parts_df['CarModel'].unique().tolist()
+        selected_car = st.selectbox("Filter by Car Model", unique_models)
+
+    if part_search:
+        with metrics.section("search"):
+            matches = search.search(part_search, engine, fields=search.NAME,
+                                    car_model=None if selected_car == "All" else selected_car)
+            filtered_parts = search.select_ranked(parts_df, matches)
+    elif selected_car != "All":
+        filtered_parts = parts_df[parts_df['CarModel'] == selected_car]
+    else:
+        filtered_parts = parts_df
+
+    if not filtered_parts.empty:
+        col1, col2, col3 = st.columns([2, 2, 1])
+
+        with col1:
+            selected_part_name = st.selectbox("Select Part", filtered_parts['PartName'].tolist())
+
+        with col2:
+            selected_model = filtered_parts[filtered_parts['PartName'] == selected_part_name]['CarModel'].iloc[0]
+            st.text_input("Car Model", selected_model, disabled=True)
+
+        with col3:
+            item_details = filtered_parts[filtered_parts['PartName'] == selected_part_name].iloc[0]
+            part_id = int(item_details['PartID'])
+            # stock less the units other carts hold, unreplicated sales and those already in this cart
+            in_cart = sum(line['Qty'] for line in st.session_state['cart'] if line['PartID'] == part_id)
+            available_stock = (int(item_details['StockQTY']) - int(held_elsewhere.result().get(part_id, 0))
+                               - int(sold_here.get(part_id, 0)) - in_cart)
+            qty = st.number_input("Quantity", min_value=1, max_value=max(available_stock, 1), value=1,
+                                  disabled=available_stock < 1)
+
+        if selected_part_name:
+            price = round(float(item_details['Price']), 2)
+            max_stock = available_stock
+            line_total = round(price * qty, 2)
+
+            st.info(f"💰 **Unit Price:** R{price:,.2f} | **Line Total:** R{line_total:,.2f} | **Available:** {max_stock}")
+
+            col_add, col_info = st.columns([1, 3])
+            with col_add:
+                if st.button("➕ Add to Cart", use_container_width=True, disabled=max_stock < 1):
+                    try:
+                        held = journal.hold(engine, st.session_state['hold_token'], part_id, qty, max_stock)
+                        st.session_state['cart'].append({
+                            "PartID": part_id,
+                            "PartName": selected_part_name,
+                            "CarModel": selected_model,
+                            "Qty": qty,
+                            "Price": price,
+                            "Total": line_total
+                        })
+                        st.session_state.pop('last_sale', None)
+                        st.toast(f"Added {selected_part_name} to cart!" if held else
+                                 f"Added {selected_part_name} to cart (held on this till only: "
+                                 f"the central database cannot be reached)")
+                        st.rerun()
+                    except holds.HoldError as e:
+                        st.error(str(e))
+
+            with col_info:
+                if max_stock < 1:
+                    st.error("No units available: the rest are sold or held in other carts.")
+                elif qty > max_stock:
+                    st.error(f"Only {max_stock} units available!")
+
+    st.divider()
+
+    st.write("### 🛒 Current Shopping Cart")
+    if st.session_state['cart']:
+        cart_display = pd.DataFrame(st.session_state['cart'])
+
+        st.dataframe(
+            cart_display[['PartName', 'CarModel', 'Qty', 'Price', 'Total']],
+            use_container_width=True,
+            column_config={
+                "Price": st.column_config.NumberColumn(format="R %.2f"),
+                "Total": st.column_config.NumberColumn(format="R %.2f")
+            }
+        )
+
+        st.caption(f"Cart items are held for {get_settings().hold_ttl // 60} minutes after the cart last changed.")
+
+        grand_total = round(cart_display['Total'].sum(), 2)
+        total_items = cart_display['Qty'].sum()
+
+        col_summary1, col_summary2 = st.columns(2)
+        with col_summary1:
+            st.metric("Total Items in Cart", total_items)
+        with col_summary2:
+            st.metric("Grand Total", f"R {grand_total:,.2f}")
+
+        col_clear, col_sale, col_export = st.columns(3)
+        with col_clear:
+            if st.button("🗑️ Clear Cart", use_container_width=True):
+                journal.release(engine, st.session_state['hold_token'])
+                st.session_state['cart'] = []
+                st.rerun()
+
+        with col_sale:
+            if st.session_state['receipt_number'] is None:
+                st.warning("No receipt numbers left on this till until the central database is back.")
+            if st.button("✅ Complete Sale", type="primary", use_container_width=True,
+                         disabled=st.session_state['receipt_number'] is None):
+                sale_date = datetime.now()
+                try:
+                    with metrics.section("checkout"):
+                        journaled = journal.checkout(engine, cust_id, st.session_state['cart'], sale_date,
+                                                     st.session_state['receipt_number'],
+                                                     st.session_state['hold_token'])
+
+                    # the sale is recorded: the next one gets a fresh receipt number, cart and hold token
+                    st.session_state['last_sale'] = {
+                        'receipt_number': st.session_state['receipt_number'],
+                        'receipt_html': receipts.render_receipt(
+                            selected_cust_name,
+                            st.session_state['cart'],
+                            grand_total,
+                            sale_date,
+                            st.session_state['receipt_number']
+                        ),
+                        'receipt_csv': cart_display.to_csv(index=False).encode('utf-8'),
+                        'total': grand_total,
+                        'journaled': journaled,
+                    }
+                    st.session_state['receipt_number'] = None
+                    st.session_state['cart'] = []
+                    st.session_state['hold_token'] = holds.new_token()
+                    st.session_state['celebrate'] = True
+                    st.rerun()
+
+                except Exception as e:
+                    metrics.record_error(e)
+                    st.error(f"Transaction failed: {str(e)}")
+
+        with col_export:
+            csv = cart_display.to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Export Cart",
+                data=csv,
+                file_name='cart_export.csv',
+                mime='text/csv',
+                use_container_width=True
+            )
+    elif 'last_sale' not in st.session_state:
+        st.info("Your cart is empty. Add items to begin.")
+
+    last_sale = st.session_state.get('last_sale')
+    if last_sale:
+        st.success(f"✅ Sale completed successfully! Total: R{last_sale['total']:,.2f}")
+        if last_sale['journaled']:
+            st.caption("Saved on this till; it is sent on to the central database in the background.")
+        if st.session_state.pop('celebrate', False):
+            st.balloons()
+
+        st.divider()
+        st.write(f"### 📄 Sales Receipt {last_sale['receipt_number']}")
+
+        st.components.v1.html(last_sale['receipt_html'].decode('utf-8'), height=800, scrolling=True)
+
+        col_html, col_csv, col_new = st.columns(3)
+
+        with col_html:
+            st.download_button(
+                label="📥 Download Receipt (HTML)",
+                data=last_sale['receipt_html'],
+                file_name=f"receipt_{last_sale['receipt_number']}.html",
+                mime="text/html",
+                use_container_width=True
+            )
+
+        with col_csv:
+            st.download_button(
+                label="📥 Export Cart as CSV",
+                data=last_sale['receipt_csv'],
+                file_name=f"receipt_{last_sale['receipt_number']}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+        with col_new:
+            if st.button("🔄 Start New Sale", use_container_width=True):
+                del st.session_state['last_sale']
+                st.rerun()
+
+        st.info("💡 **Tip:** You can print this receipt by pressing **Ctrl+P** and saving as PDF")
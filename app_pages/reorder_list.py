@@ -0,0 +1,71 @@
+import streamlit as st
+
+from autoparts import exports, metrics, reorder
+from autoparts.config import get_settings
+from autoparts.db import get_engine
+from app_pages.ui import export_button, style_stock
+
+engine = get_engine()
+settings = get_settings()
+
+st.subheader("🚚 Reorder List")
+st.caption(
+    f"Velocity is units sold per day over the last {settings.reorder_window} days. A part is due for reorder when "
+    f"its stock covers no more than the {settings.reorder_lead_days}-day lead time plus safety stock, and on watch "
+    f"when it will be due within the {settings.reorder_review_days}-day review period."
+)
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    search_term = st.text_input("🔍 Filter by part, car model or supplier", "")
+with col2:
+    include_watch = st.checkbox("Include parts on watch")
+
+try:
+    with metrics.section("reorder list"):
+        df = reorder.reorder_list(engine, include_watch)
+    if search_term:
+        text = df['PartName'] + " " + df['CarModel'] + " " + df['Supplier'].fillna("")
+        df = df[text.str.contains(search_term, case=False, regex=False)]
+
+    metric1, metric2, metric3 = st.columns(3)
+    metric1.metric("Parts to Reorder", int((df['Status'] == reorder.REORDER).sum()))
+    metric2.metric("Units to Order", f"{int(df['OrderQty'].sum()):,}")
+    metric3.metric("Order Value at Cost", f"R {df['OrderCost'].sum():,.2f}")
+
+    if df.empty:
+        st.success("✅ Nothing needs reordering.")
+    else:
+        st.dataframe(
+            style_stock(df, engine),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "StockQTY": st.column_config.NumberColumn("In Stock", format="%d"),
+                "Velocity": st.column_config.NumberColumn("Sold / Day", format="%.2f"),
+                "DaysOfCover": st.column_config.NumberColumn("Days of Cover", format="%.1f"),
+                "ReorderPoint": st.column_config.NumberColumn("Reorder Point", format="%d"),
+                "OrderQty": st.column_config.NumberColumn("Suggested Order", format="%d"),
+                "OrderCost": st.column_config.NumberColumn("Order Cost", format="R %.2f"),
+            }
+        )
+
+        if not df['Supplier'].isna().all():
+            st.write("### 📦 Orders by Supplier")
+            by_supplier = (
+                df[df['OrderQty'] > 0]
+                .groupby(df['Supplier'].fillna("(no supplier)"))
+                .agg(Parts=('PartID', 'count'), Units=('OrderQty', 'sum'), Cost=('OrderCost', 'sum'))
+                .sort_values('Cost', ascending=False)
+            )
+            st.dataframe(by_supplier, use_container_width=True,
+                         column_config={"Cost": st.column_config.NumberColumn(format="R %.2f")})
+
+        export_button(
+            "📥 Export Reorder List", "reorder_list",
+            lambda fmt, out: exports.write([df], out, fmt),
+            key="reorder_export",
+        )
+except Exception as e:
+    metrics.record_error(e)
+    st.error(f"Could not work out the reorder list: {e}")
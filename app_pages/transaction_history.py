@@ -0,0 +1,100 @@
+import streamlit as st
+from datetime import date, timedelta
+import tempfile
+
+from autoparts import exports, metrics, parallel, receipts, replica, sales
+from autoparts.db import get_engine
+from autoparts.pagination import PAGE_SIZES
+from app_pages.ui import SPOOL_LIMIT, export_button, keyset_pager, pager_controls, replica_caption
+
+engine = get_engine()
+
+st.subheader("📋 Sales Transaction History")
+
+col1, col2 = st.columns(2)
+with col1:
+    start_date = st.date_input("Start Date", date.today() - timedelta(days=30))
+with col2:
+    end_date = st.date_input("End Date", date.today())
+
+col_search, col_size = st.columns([3, 1])
+with col_search:
+    search_term = st.text_input("🔍 Search by customer or part name")
+with col_size:
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+conditions = sales.history_filters(start_date, end_date, search_term)
+report_engine = replica.reporting_engine(engine)
+pager = keyset_pager('history_pager', (start_date, end_date, search_term, page_size))
+kpis = parallel.submit(sales.history_kpis, report_engine, conditions, section="kpis")
+with metrics.section("grid"):
+    page = sales.history_page(report_engine, conditions, pager['cursors'][-1], page_size)
+df_sales = page.rows
+replica_caption(report_engine)
+
+if not df_sales.empty:
+    kpis = kpis.result()
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Total Sales", f"R {kpis['TotalSales']:,.2f}")
+    m2.metric("Total Transactions", kpis['Transactions'])
+    m3.metric("Average Sale", f"R {kpis['AverageSale']:,.2f}")
+
+    st.dataframe(
+        df_sales,
+        use_container_width=True,
+        column_config={
+            "SaleDate": st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm"),
+            "TotalAmount": st.column_config.NumberColumn(format="R %.2f")
+        }
+    )
+    pager_controls('history_pager', pager, page)
+
+    def receipts_zip():
+        archive = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+        receipts.write_receipts_zip(report_engine, start_date, end_date, archive)
+        archive.seek(0)
+        return archive
+
+    col_csv, col_zip = st.columns(2)
+    with col_csv:
+        export_button(
+            "📥 Export Transaction History", f"sales_history_{date.today()}",
+            lambda fmt, out: exports.export(report_engine, sales.history_export(conditions), out, fmt),
+            key="history_export",
+        )
+    with col_zip:
+        st.download_button(
+            label="📦 Export Receipts (ZIP)",
+            data=receipts_zip,
+            file_name=f'receipts_{start_date}_{end_date}.zip',
+            mime='application/zip',
+        )
+else:
+    st.info("No sales records found for the selected period.")
+
+st.divider()
+st.write("### 🧾 Find Receipt")
+receipt_lookup = st.text_input("Receipt No", placeholder="20260101-000001")
+if receipt_lookup:
+    with metrics.section("receipt lookup"):
+        order = sales.find_order(engine, receipt_lookup.strip())
+    if order is None:
+        st.info(f"No receipt found with number {receipt_lookup}.")
+    else:
+        st.info(f"**Receipt No:** {order.receipt_number} | **Customer:** {order.customer} | "
+                f"**Date:** {order.order_date:%Y-%m-%d %H:%M} | **Total:** R{order.total:,.2f}")
+        st.dataframe(
+            order.lines,
+            use_container_width=True,
+            column_config={
+                "Price": st.column_config.NumberColumn(format="R %.2f"),
+                "Total": st.column_config.NumberColumn(format="R %.2f")
+            }
+        )
+        st.download_button(
+            label="🖨️ Reprint Receipt (HTML)",
+            data=receipts.render_order(order),
+            file_name=f"receipt_{order.receipt_number}.html",
+            mime="text/html",
+        )
@@ -0,0 +1,98 @@
+"""Widgets shared by several pages."""
+import tempfile
+
+import pandas as pd
+import streamlit as st
+
+from autoparts import exports, reorder, replica
+from autoparts.db import get_engine
+
+SPOOL_LIMIT = 16 * 1024 * 1024
+
+STATUS_STYLES = {
+    reorder.REORDER: 'color: red; font-weight: bold',
+    reorder.WATCH: 'color: orange',
+    reorder.OK: 'color: green',
+}
+STATUS_COLORS = {reorder.REORDER: "red", reorder.WATCH: "orange", reorder.OK: "green"}
+
+
+def export_button(label, file_stem, write, key):
+    """Format picker and download button for a streamed export; ``write(fmt, fileobj)`` runs on click"""
+    fmt = st.radio("Export format", exports.FORMATS, horizontal=True, key=f"{key}_format",
+                   label_visibility="collapsed")
+
+    def data():
+        out = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+        write(fmt, out)
+        out.seek(0)
+        return out
+
+    st.download_button(label=label, data=data, file_name=f"{file_stem}.{fmt}", mime=exports.MIME_TYPES[fmt], key=key)
+
+
+def style_stock(df, engine, status=None):
+    """``df.style`` with StockQTY coloured by each part's reorder status rather than a fixed cutoff.
+
+    Pass ``status`` (from ``reorder.statuses()``) when the page already has it.
+    """
+    if status is None:
+        status = reorder.statuses(engine, df['PartID'])
+    styles = df['PartID'].map(status).map(STATUS_STYLES).fillna('').tolist()
+    return df.style.apply(lambda _column: styles, subset=['StockQTY'])
+
+
+def replica_caption(report_engine):
+    """Say how fresh the figures are when a page reads from the reporting replica"""
+    if report_engine is not get_engine():
+        st.caption(f"Figures from the reporting replica, as of {replica.synced_at():%Y-%m-%d %H:%M}.")
+
+
+def keyset_pager(state_key, filters):
+    """Cursor stack for a keyset-paginated grid, reset whenever the filters change"""
+    pager = st.session_state.get(state_key)
+    if pager is None or pager['filters'] != filters:
+        pager = {'filters': filters, 'cursors': [None]}
+        st.session_state[state_key] = pager
+    return pager
+
+
+def pager_controls(state_key, pager, page):
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("◀ Previous", key=f"{state_key}_prev", disabled=len(pager['cursors']) == 1):
+            pager['cursors'].pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(pager['cursors'])}")
+    with col_next:
+        if st.button("Next ▶", key=f"{state_key}_next", disabled=not page.has_next):
+            pager['cursors'].append(page.last_key)
+            st.rerun()
+
+
+def debug_panel(trace):
+    """Sidebar breakdown of a finished rerun: total, per-section and per-statement timings"""
+    with st.sidebar.expander("🐞 Debug: this rerun", expanded=False):
+        col1, col2 = st.columns(2)
+        col1.metric("Rerun", f"{trace.total_ms:,.0f} ms")
+        col2.metric("SQL", f"{trace.sql_ms:,.0f} ms")
+        col1.metric("Statements", len(trace.statements))
+        col2.metric("Rows read", f"{trace.rows:,}")
+        st.caption(f"{trace.bytes / 1024:,.0f} KiB of frames read")
+
+        if trace.sections:
+            st.write("**Sections**")
+            st.dataframe(
+                pd.DataFrame(sorted(trace.sections.items(), key=lambda item: -item[1]), columns=["Section", "ms"]),
+                hide_index=True, use_container_width=True,
+            )
+        if trace.statements:
+            st.write("**Statements** (slowest first)")
+            statements = pd.DataFrame([vars(statement) for statement in trace.statements])
+            st.dataframe(
+                statements.sort_values("ms", ascending=False)[["ms", "rows", "bytes", "section", "sql"]],
+                hide_index=True, use_container_width=True,
+            )
+        for error in trace.errors:
+            st.error(error)
@@ -0,0 +1 @@
+"""Core data-access layer for AutoParts Pro."""
@@ -0,0 +1,197 @@
+"""Command-line entry point for reports and batch jobs: ``python -m autoparts <command>``.
+
+    python -m autoparts report --period last-month
+    python -m autoparts report --kind customers --output customers.parquet
+    python -m autoparts export history --start 2025-01-01 --end 2025-12-31 --output sales.csv.gz
+    python -m autoparts low-stock
+    python -m autoparts reorder --watch -o orders.csv.gz
+    python -m autoparts receive delivery.csv
+    python -m autoparts migrate upgrade      # also: rollup, replica, synth, bench, loadtest, pricelist, journal
+
+Nothing here imports Streamlit, and each command imports only the modules
+it uses, so scheduled jobs start fast and can be profiled on their own
+(``python -X importtime -m autoparts ...``).
+"""
+import argparse
+import sys
+from datetime import date
+
+# commands that hand the rest of the command line to another module's main()
+DELEGATED = {
+    "migrate": "autoparts.migrate",
+    "rollup": "autoparts.rollup",
+    "replica": "autoparts.replica",
+    "synth": "autoparts.synth",
+    "bench": "autoparts.bench",
+    "loadtest": "autoparts.loadtest",
+    "pricelist": "autoparts.pricelist",
+    "journal": "autoparts.journal",
+}
+# exports.FORMATS, repeated so --help does not import pandas
+FORMATS = ["csv.gz", "parquet"]
+
+
+def _engine(args):
+    from autoparts.db import get_engine
+
+    if not args.replica:
+        return get_engine()
+    from autoparts import replica
+    from autoparts.config import get_settings
+
+    root = get_settings().replica_dir
+    if not root or replica.synced_at(root) is None:
+        sys.exit("The replica has not been synced; run 'python -m autoparts replica sync' first")
+    return replica.replica_engine(root)
+
+
+def _format(args):
+    if args.format:
+        return args.format
+    for fmt in FORMATS:
+        if args.output.endswith(f".{fmt}"):
+            return fmt
+    sys.exit(f"Cannot tell the format of {args.output!r}; pass --format ({' or '.join(FORMATS)})")
+
+
+def _write(args, frames, columns=()):
+    """Write ``frames`` to ``--output`` (``-`` for stdout); returns the row count"""
+    from autoparts import exports
+
+    if args.output == "-":
+        return exports.write(frames, sys.stdout.buffer, _format(args), columns)
+    with open(args.output, "wb") as out:
+        return exports.write(frames, out, _format(args), columns)
+
+
+def _period(args):
+    from autoparts import reports
+
+    if args.start or args.end:
+        if not (args.start and args.end):
+            sys.exit("--start and --end go together")
+        return reports.period_range("Custom Range", custom_start=args.start, custom_end=args.end)
+    periods = {period.lower().replace(" ", "-"): period for period in reports.PERIODS if period != "Custom Range"}
+    period = periods.get(args.period, args.period.zfill(2))
+    if period not in reports.PERIODS and period not in reports.MONTHS:
+        sys.exit(f"Unknown period {args.period!r}; use one of {', '.join(periods)}, a month number, or --start/--end")
+    return reports.period_range(period, args.year)
+
+
+def _show(args, df):
+    if args.output:
+        rows = _write(args, [df])
+        print(f"Wrote {rows} rows to {args.output}", file=sys.stderr)
+    else:
+        print(df.to_string(index=False) if not df.empty else "No rows")
+
+
+def report(args):
+    from autoparts import reports
+
+    engine = _engine(args)
+    if args.kind == "customers":
+        _show(args, reports.customer_analytics(engine))
+    else:
+        start, end = _period(args)
+        _show(args, reports.profit_report(engine, start, end))
+
+
+def export(args):
+    from autoparts import crm, exports, inventory, reorder, sales
+
+    if args.what == "inventory":
+        due = reorder.reorder_ids(_engine(args)) if args.low_stock else None
+        stmt = inventory.parts_export(inventory.part_filters(reorder_ids=due))
+    elif args.what == "customers":
+        stmt = crm.directory_export(crm.directory_filters(args.search))
+    else:
+        stmt = sales.history_export(sales.history_filters(args.start, args.end, args.search))
+    rows = _write(args, exports.iter_frames(_engine(args), stmt), stmt.selected_columns)
+    print(f"Wrote {rows} rows to {args.output}", file=sys.stderr)
+
+
+def low_stock(args):
+    from autoparts import reorder
+
+    df = reorder.reorder_list(_engine(args))
+    _show(args, df[["PartID", "PartName", "CarModel", "StockQTY", "ReorderPoint", "Supplier"]])
+
+
+def reorder(args):
+    from autoparts import reorder
+
+    _show(args, reorder.reorder_list(_engine(args), include_watch=args.watch))
+
+
+def receive(args):
+    from autoparts import inventory, pricelist
+    from autoparts.db import get_engine
+
+    try:
+        with open(args.path, "rb") as fileobj:
+            lines = inventory.read_delivery_note(fileobj, args.format or pricelist.format_of(args.path))
+        received = inventory.receive_goods(get_engine(), lines[["PartID", "Qty"]].itertuples(index=False))
+    except (OSError, inventory.DeliveryError, pricelist.PriceListError) as e:
+        sys.exit(str(e))
+    print(f"Booked {sum(received.values())} units across {len(received)} parts")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m autoparts", description="AutoParts Pro reports and batch jobs")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    def add_command(name, handler, help):
+        command = commands.add_parser(name, help=help)
+        command.set_defaults(handler=handler)
+        command.add_argument("--replica", action="store_true", help="read from the reporting replica")
+        command.add_argument("--format", choices=FORMATS, help="output format (default: from the --output name)")
+        return command
+
+    report_cmd = add_command("report", report, "print or save the profit report or customer analytics")
+    report_cmd.add_argument("--kind", choices=["profit", "customers"], default="profit")
+    report_cmd.add_argument("--period", default="current-month",
+                            help="current-month, last-month, last-30-days, all-time, or a month number")
+    report_cmd.add_argument("--year", type=int, help="year of a month-number period (default: this year)")
+    report_cmd.add_argument("--start", type=date.fromisoformat, help="first day of a custom period")
+    report_cmd.add_argument("--end", type=date.fromisoformat, help="last day of a custom period (included)")
+    report_cmd.add_argument("--output", "-o", help="write to this file instead of printing")
+
+    export_cmd = add_command("export", export, "stream a table export to gzip CSV or Parquet")
+    export_cmd.add_argument("what", choices=["inventory", "history", "customers"])
+    export_cmd.add_argument("--output", "-o", required=True, help="file to write, or - for stdout")
+    export_cmd.add_argument("--start", type=date.fromisoformat, help="history: first day (default: all)")
+    export_cmd.add_argument("--end", type=date.fromisoformat, help="history: last day, included (default: all)")
+    export_cmd.add_argument("--search", default="", help="history/customers: name search")
+    export_cmd.add_argument("--low-stock", action="store_true", help="inventory: only parts due for reorder")
+
+    low_stock_cmd = add_command("low-stock", low_stock, "list parts at or below their reorder point")
+    low_stock_cmd.add_argument("--output", "-o", help="write to this file instead of printing")
+
+    reorder_cmd = add_command("reorder", reorder, "list parts at their reorder point, with suggested order quantities")
+    reorder_cmd.add_argument("--watch", action="store_true", help="also list parts due within the review period")
+    reorder_cmd.add_argument("--output", "-o", help="write to this file instead of printing")
+
+    receive_cmd = commands.add_parser("receive", help="book a delivery note (PartID, Qty lines) into stock")
+    receive_cmd.set_defaults(handler=receive)
+    receive_cmd.add_argument("path", help="delivery note: .csv, .csv.gz or .parquet")
+    receive_cmd.add_argument("--format", choices=["csv", "csv.gz", "parquet"], help="default: from the file name")
+
+    for name, module in DELEGATED.items():
+        commands.add_parser(name, help=f"see python -m {module} --help", add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in DELEGATED:
+        import importlib
+
+        importlib.import_module(DELEGATED[argv[0]]).main(argv[1:])
+        return
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
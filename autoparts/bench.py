@@ -0,0 +1,279 @@
+"""Read-path benchmarks: each page's queries and pandas work, timed as p50/p95.
+
+Every case does what its page does on a rerun (minus drawing widgets), with
+inputs drawn from the data already in the database, so run it against a
+database filled by ``autoparts.synth``:
+
+    python -m autoparts.bench                         # every case, 20 runs each
+    python -m autoparts.bench --only history --repeat 50
+    python -m autoparts.bench --json results.json     # keep the numbers for comparison
+    python -m autoparts.bench --save-thresholds       # accept this run as the new baseline
+
+A case fails when its p95 is above the threshold recorded for it in
+``bench_thresholds.json`` (next to this module); the command then exits
+with status 1, so a release check can run it as is.
+"""
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import sqlalchemy as sa
+
+from autoparts import catalog, inventory, reorder, reports, sales, search
+from autoparts.schema import customers, parts, sales as sales_table
+
+THRESHOLDS = Path(__file__).with_name("bench_thresholds.json")
+REPEAT = 20
+# a new baseline allows this much over the measured p95 before a case fails
+HEADROOM = 1.5
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    run: Callable
+    # reporting pages read from the replica when --replica is given
+    reporting: bool = False
+    # drop the cached snapshots and search index before every run, as after a write
+    cold: bool = False
+
+
+@dataclass
+class Inputs:
+    """Search terms and filters sampled from the data, so every query finds something"""
+    part_terms: list
+    car_models: list
+    customer_terms: list
+    today: date
+
+
+def sample_inputs(engine, seed=0, n=50):
+    rng = random.Random(seed)
+    with engine.connect() as conn:
+        part_names = conn.execute(sa.select(parts.c.PartName).order_by(parts.c.PartID).limit(5000)).scalars().all()
+        car_models = conn.execute(sa.select(parts.c.CarModel).distinct()).scalars().all()
+        customer_names = conn.execute(
+            sa.select(customers.c.FullName).order_by(customers.c.CustomerID).limit(5000)
+        ).scalars().all()
+        last_sale = conn.execute(sa.select(sa.func.max(sales_table.c.SaleDate))).scalar()
+    if not part_names or not customer_names:
+        raise SystemExit("No parts or customers to benchmark; fill the database with python -m autoparts.synth first")
+
+    def terms(names):
+        picked = []
+        for name in rng.choices(names, k=n):
+            words = name.split()
+            # the prefixes people type: one word, or two words cut short
+            picked.append(rng.choice(words)[:5] if rng.random() < 0.5 else " ".join(w[:4] for w in words[:2]))
+        return picked
+
+    return Inputs(
+        part_terms=terms(part_names),
+        car_models=car_models,
+        customer_terms=[name.split()[1] for name in rng.choices(customer_names, k=n)],
+        today=last_sale.date() if last_sale else date.today(),
+    )
+
+
+def _inventory_view(engine, inputs, rng, term=None, reorder_only=False):
+    due = reorder.reorder_ids(engine) if reorder_only else None
+    matches = all_matches = None
+    if term:
+        all_matches = search.search(term, engine, part_ids=due, limit=None)
+        matches = all_matches[:search.DEFAULT_LIMIT]
+    conditions = inventory.part_filters(matches, due)
+    page = inventory.parts_page(engine, conditions)
+    kpis = None
+    if not page.rows.empty:
+        kpis = (inventory.parts_kpis(engine, conditions) if all_matches is None
+                else inventory.matched_kpis(engine, all_matches))
+    return reorder.reorder_count(engine), page, kpis
+
+
+def _process_sale(engine, inputs, rng, term=None, car_model="All"):
+    customers_df = catalog.customers_snapshot(engine)
+    parts_df = catalog.parts_snapshot(engine)
+    customer_options = customers_df['FullName'].tolist()
+    model_options = ["All"] + parts_df['CarModel'].unique().tolist()
+    if term:
+        matches = search.search(term, engine, fields=search.NAME, car_model=None if car_model == "All" else car_model)
+        filtered = search.select_ranked(parts_df, matches)
+    elif car_model != "All":
+        filtered = parts_df[parts_df['CarModel'] == car_model]
+    else:
+        filtered = parts_df
+    part_options = filtered['PartName'].tolist()
+    selected = filtered[filtered['PartName'] == part_options[0]].iloc[0] if part_options else None
+    return customer_options, model_options, part_options, selected
+
+
+def _history(engine, inputs, rng, days=30, term=""):
+    conditions = sales.history_filters(inputs.today - timedelta(days=days), inputs.today, term)
+    page = sales.history_page(engine, conditions)
+    return page, sales.history_kpis(engine, conditions) if not page.rows.empty else None
+
+
+def _monthly_report(engine, inputs, rng, period="Current Month"):
+    start, end = reports.period_range(period, inputs.today.year, today=inputs.today)
+    df = reports.profit_report(engine, start, end)
+    totals = df[['Total_Revenue', 'Total_Cost', 'Gross_Profit', 'Units_Sold']].sum()
+    return df, totals
+
+
+def _customer_analytics(engine, inputs, rng):
+    return reports.customer_analytics(engine)
+
+
+def _reorder_list(engine, inputs, rng, include_watch=False):
+    return reorder.reorder_list(engine, include_watch)
+
+
+def cases():
+    def term(kind):
+        return lambda inputs, rng: rng.choice(getattr(inputs, kind))
+
+    def case(name, page, reporting=False, cold=False, **choices):
+        def run(engine, inputs, rng):
+            page(engine, inputs, rng, **{key: pick(inputs, rng) for key, pick in choices.items()})
+        return Case(name, run, reporting, cold)
+
+    model = term("car_models")
+    return [
+        case("inventory/first_page", _inventory_view),
+        case("inventory/reorder_only", _inventory_view, reorder_only=lambda inputs, rng: True),
+        case("inventory/search", _inventory_view, term=term("part_terms")),
+        case("sale/cold_search", _process_sale, cold=True, term=term("part_terms")),
+        case("sale/car_model", _process_sale, car_model=model),
+        case("sale/search", _process_sale, term=term("part_terms"), car_model=model),
+        case("history/last_30_days", _history, reporting=True),
+        case("history/last_year", _history, reporting=True, days=lambda inputs, rng: 365),
+        case("history/search", _history, reporting=True, term=term("customer_terms")),
+        *[
+            case(f"report/{period.lower().replace(' ', '_')}", _monthly_report, reporting=True,
+                 period=lambda inputs, rng, period=period: period)
+            for period in reports.PERIODS if period != "Custom Range"
+        ],
+        case("report/customer_analytics", _customer_analytics, reporting=True),
+        case("reorder/after_sale", _reorder_list, cold=True),
+        case("reorder/with_watch", _reorder_list, include_watch=lambda inputs, rng: True),
+    ]
+
+
+def measure(case, engine, inputs, repeat=REPEAT, seed=0):
+    """Seconds taken by each of ``repeat`` runs of ``case``, after one untimed warm-up run"""
+    rng = random.Random(seed)
+    timings = []
+    for run in range(repeat + 1):
+        if case.cold:
+            catalog.invalidate()
+            search.invalidate()
+        started = time.perf_counter()
+        case.run(engine, inputs, rng)
+        if run:
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(timings):
+    """p50, p95 and max of ``timings``, in milliseconds"""
+    ms = np.asarray(timings) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 2), "p95_ms": round(float(np.percentile(ms, 95)), 2),
+            "max_ms": round(float(ms.max()), 2)}
+
+
+def load_thresholds(path=THRESHOLDS):
+    """``{case: {"p95_ms": limit}}``, plus the ``_baseline`` dataset they were measured on"""
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def dataset(engine):
+    """Backend and table sizes, recorded with a baseline so runs are compared like for like"""
+    with engine.connect() as conn:
+        rows = {
+            table.name: conn.execute(sa.select(sa.func.count()).select_from(table)).scalar_one()
+            for table in (parts, customers, sales_table)
+        }
+    return {"backend": engine.dialect.name, **rows}
+
+
+def save_thresholds(results, path=THRESHOLDS, baseline=None):
+    """Replace the thresholds file with this run's cases, so renamed or dropped cases leave no stale limits"""
+    thresholds = {"_baseline": baseline} if baseline is not None else {}
+    thresholds.update({name: {"p95_ms": round(stats["p95_ms"] * HEADROOM, 1)} for name, stats in results.items()})
+    Path(path).write_text(json.dumps(dict(sorted(thresholds.items())), indent=2) + "\n")
+
+
+def run(engine, report_engine=None, only=(), repeat=REPEAT, thresholds=None):
+    """Benchmark every case (or those whose name starts with one of ``only``).
+
+    Returns ``{case: {"p50_ms", "p95_ms", "max_ms", "threshold_ms", "ok"}}``.
+    """
+    thresholds = load_thresholds() if thresholds is None else thresholds
+    inputs = sample_inputs(engine)
+    results = {}
+    for case in cases():
+        if only and not case.name.startswith(tuple(only)):
+            continue
+        stats = summarize(measure(case, report_engine if case.reporting and report_engine else engine, inputs, repeat))
+        limit = thresholds.get(case.name, {}).get("p95_ms")
+        stats["threshold_ms"] = limit
+        stats["ok"] = limit is None or stats["p95_ms"] <= limit
+        results[case.name] = stats
+    return results
+
+
+def main(argv=None):
+    from autoparts import replica
+    from autoparts.config import get_settings
+    from autoparts.db import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.bench", description="Time each page's read path")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help=f"timed runs per case (default: {REPEAT})")
+    parser.add_argument("--only", action="append", default=[], help="run the cases starting with this (repeatable)")
+    parser.add_argument("--replica", action="store_true", help="run the reporting cases against the replica")
+    parser.add_argument("--thresholds", default=THRESHOLDS, help="thresholds file (default: %(default)s)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--save-thresholds", action="store_true",
+                        help=f"record this run's p95 x {HEADROOM} as the thresholds, replacing the file")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    report_engine = None
+    if args.replica:
+        root = get_settings().replica_dir
+        if not root or replica.synced_at(root) is None:
+            parser.exit(1, "The replica has not been synced; run 'python -m autoparts replica sync' first\n")
+        report_engine = replica.replica_engine(root)
+
+    thresholds = load_thresholds(args.thresholds)
+    measured_on = dataset(engine)
+    print(", ".join(f"{key}: {value}" for key, value in measured_on.items()))
+    if thresholds.get("_baseline", measured_on) != measured_on:
+        print("Thresholds were set on " + ", ".join(f"{key}: {value}" for key, value in thresholds["_baseline"].items()))
+    results = run(engine, report_engine, args.only, args.repeat, thresholds)
+    print(f"{'case':<28} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'limit':>9}")
+    for name, stats in results.items():
+        limit = f"{stats['threshold_ms']:.1f}" if stats["threshold_ms"] is not None else "-"
+        flag = "" if stats["ok"] else "  REGRESSION"
+        print(f"{name:<28} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['max_ms']:>9.1f} {limit:>9}{flag}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"dataset": measured_on, "cases": results}, indent=2) + "\n")
+    if args.save_thresholds:
+        save_thresholds(results, args.thresholds, measured_on)
+        print(f"Saved thresholds to {args.thresholds}")
+    elif not all(stats["ok"] for stats in results.values()):
+        parser.exit(1, "p95 above threshold for: "
+                       + ", ".join(name for name, stats in results.items() if not stats["ok"]) + "\n")
+
+
+if __name__ == "__main__":
+    main()
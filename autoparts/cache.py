@@ -0,0 +1,70 @@
+"""Small thread-safe TTL cache shared by every session in the process."""
+import threading
+import time
+
+
+class TTLCache:
+    """Keyed cache whose entries expire after ``ttl`` seconds or on ``invalidate()``.
+
+    Loads are single-flight per key, so concurrent reruns wait for one fetch
+    instead of all hitting the database. A load that started before an
+    invalidation is returned to its caller but not stored. If a load raises
+    one of ``fallback`` and the key has been loaded before, the last value
+    is served (and kept for another ``ttl``) instead.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._last = {}
+        self._generations = {}
+        self._key_locks = {}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def get(self, key, loader, fallback=()):
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[1]
+
+        with self._key_lock(key):
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+            with self._lock:
+                generation = self._generations.get(key, 0)
+            try:
+                value = loader()
+            except fallback:
+                with self._lock:
+                    if key not in self._last:
+                        raise
+                    value = self._last[key]
+                    self._entries[key] = (time.monotonic(), value)
+                return value
+            with self._lock:
+                self._last[key] = value
+                if self._generations.get(key, 0) == generation:
+                    self._entries[key] = (time.monotonic(), value)
+            return value
+
+    def peek(self, key):
+        """The cached value for ``key`` if it is still fresh, without loading"""
+        entry = self._fresh(key)
+        return entry[1] if entry is not None else None
+
+    def invalidate(self, *keys):
+        """Drop ``keys`` (or everything when called without arguments)"""
+        with self._lock:
+            for key in keys or set(self._entries) | set(self._key_locks):
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
@@ -0,0 +1,72 @@
+"""Cached snapshots of the Parts and Customers tables and the live stock holds.
+
+Snapshots are shared by every session in the process, kept apart per
+database (engine URL), and expire after ``AUTOPARTS_SNAPSHOT_TTL`` seconds.
+Code that writes to any of them must call ``invalidate()`` so the next
+read refetches. While the database cannot be reached, the last snapshot
+read is served instead (so a till with a sales journal keeps selling).
+"""
+import threading
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from autoparts.cache import TTLCache
+from autoparts.config import get_settings
+from autoparts.db import UNREACHABLE, get_engine
+from autoparts.metrics import read_frame
+from autoparts.schema import customers, parts, stock_holds
+
+PARTS = "parts"
+CUSTOMERS = "customers"
+HOLDS = "holds"
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def _cache(engine):
+    """The snapshot cache of the database ``engine`` points at"""
+    with _snapshots_lock:
+        cache = _snapshots.get(engine.url)
+        if cache is None:
+            cache = _snapshots[engine.url] = TTLCache(ttl=get_settings().snapshot_ttl)
+        return cache
+
+
+def _read(stmt, engine, **kwargs):
+    with engine.connect() as conn:
+        return read_frame(stmt, conn, **kwargs)
+
+
+def parts_snapshot(engine=None):
+    """PartID, PartName, CarModel, StockQTY, Price, CostPrice, Supplier for the whole catalog (treat as read-only)"""
+    stmt = sa.select(parts.c.PartID, parts.c.PartName, parts.c.CarModel, parts.c.StockQTY, parts.c.Price,
+                     parts.c.CostPrice, parts.c.Supplier)
+    engine = engine or get_engine()
+    return _cache(engine).get(PARTS, lambda: _read(stmt, engine), UNREACHABLE)
+
+
+def customers_snapshot(engine=None):
+    """CustomerID, FullName for every customer (treat as read-only)"""
+    stmt = sa.select(customers.c.CustomerID, customers.c.FullName)
+    engine = engine or get_engine()
+    return _cache(engine).get(CUSTOMERS, lambda: _read(stmt, engine), UNREACHABLE)
+
+
+def holds_snapshot(engine=None):
+    """PartID, HoldToken, Qty, ExpiresAt of the stock holds unexpired when read (treat as read-only)"""
+    stmt = sa.select(stock_holds.c.PartID, stock_holds.c.HoldToken, stock_holds.c.Qty, stock_holds.c.ExpiresAt)
+    engine = engine or get_engine()
+    return _cache(engine).get(
+        HOLDS, lambda: _read(stmt.where(stock_holds.c.ExpiresAt > datetime.now()), engine, parse_dates=["ExpiresAt"]),
+        UNREACHABLE,
+    )
+
+
+def invalidate(*names):
+    """Drop the named snapshots (``PARTS``, ``CUSTOMERS``, ``HOLDS``), or all of them, for every database"""
+    with _snapshots_lock:
+        caches = list(_snapshots.values())
+    for cache in caches:
+        cache.invalidate(*names)
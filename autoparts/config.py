@@ -0,0 +1,107 @@
+"""Runtime settings, read from AUTOPARTS_* environment variables."""
+import os
+import urllib.parse
+from dataclasses import dataclass
+from functools import lru_cache
+
+DEFAULT_ODBC = (
+    r'DRIVER={ODBC Driver 17 for SQL Server};'
+    r'SERVER=DESKTOP-6O63UFT\SQLEXPRESS01;'
+    r'DATABASE=AutoPartsDB;'
+    r'Trusted_Connection=yes;'
+)
+
+
+def _env(name, default):
+    return os.environ.get(f"AUTOPARTS_{name}", default)
+
+
+def _env_int(name, default):
+    return int(_env(name, default))
+
+
+def _env_float(name, default):
+    return float(_env(name, default))
+
+
+def _env_bool(name, default):
+    return str(_env(name, default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    backend: str = "mssql"
+    odbc: str = DEFAULT_ODBC
+    sqlite_path: str = "autoparts.db"
+    url: str = ""
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    snapshot_ttl: int = 60
+    search_index_ttl: int = 900
+    receipt_block: int = 50
+    receipt_blocks_ahead: int = 1
+    replica_dir: str = ""
+    replica_lag: int = 30
+    replica_refresh: int = 300
+    debug_panel: bool = False
+    metrics_log: str = ""
+    metrics_textfile: str = ""
+    fetch_workers: int = 8
+    reorder_window: int = 90
+    reorder_lead_days: int = 7
+    reorder_review_days: int = 14
+    reorder_service_z: float = 1.65
+    reorder_refresh: int = 60
+    hold_ttl: int = 900
+    journal_path: str = ""
+    journal_batch: int = 200
+    journal_interval: int = 2
+
+    @property
+    def database_url(self):
+        """SQLAlchemy URL for the configured backend (AUTOPARTS_DB_URL wins if set)"""
+        if self.url:
+            return self.url
+        if self.backend == "sqlite":
+            return f"sqlite:///{self.sqlite_path}"
+        if self.backend == "mssql":
+            return f"mssql+pyodbc:///?odbc_connect={urllib.parse.quote_plus(self.odbc)}"
+        raise ValueError(f"Unknown AUTOPARTS_DB_BACKEND: {self.backend!r} (expected 'mssql' or 'sqlite')")
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    return Settings(
+        backend=_env("DB_BACKEND", "mssql").strip().lower(),
+        odbc=_env("MSSQL_ODBC", DEFAULT_ODBC),
+        sqlite_path=_env("SQLITE_PATH", "autoparts.db"),
+        url=_env("DB_URL", ""),
+        pool_size=_env_int("POOL_SIZE", 5),
+        max_overflow=_env_int("MAX_OVERFLOW", 10),
+        pool_timeout=_env_int("POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("POOL_RECYCLE", 1800),
+        pool_pre_ping=_env_bool("POOL_PRE_PING", True),
+        snapshot_ttl=_env_int("SNAPSHOT_TTL", 60),
+        search_index_ttl=_env_int("SEARCH_INDEX_TTL", 900),
+        receipt_block=_env_int("RECEIPT_BLOCK", 50),
+        receipt_blocks_ahead=_env_int("RECEIPT_BLOCKS_AHEAD", 1),
+        replica_dir=_env("REPLICA_DIR", ""),
+        replica_lag=_env_int("REPLICA_LAG", 30),
+        replica_refresh=_env_int("REPLICA_REFRESH", 300),
+        debug_panel=_env_bool("DEBUG_PANEL", False),
+        metrics_log=_env("METRICS_LOG", ""),
+        metrics_textfile=_env("METRICS_TEXTFILE", ""),
+        fetch_workers=_env_int("FETCH_WORKERS", 8),
+        reorder_window=_env_int("REORDER_WINDOW", 90),
+        reorder_lead_days=_env_int("REORDER_LEAD_DAYS", 7),
+        reorder_review_days=_env_int("REORDER_REVIEW_DAYS", 14),
+        reorder_service_z=_env_float("REORDER_SERVICE_Z", 1.65),
+        reorder_refresh=_env_int("REORDER_REFRESH", 60),
+        hold_ttl=_env_int("HOLD_TTL", 900),
+        journal_path=_env("JOURNAL_PATH", ""),
+        journal_batch=_env_int("JOURNAL_BATCH", 200),
+        journal_interval=_env_int("JOURNAL_INTERVAL", 2),
+    )
@@ -0,0 +1,67 @@
+"""Customer Management queries and writes."""
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from autoparts import catalog, filters
+from autoparts.metrics import read_frame
+from autoparts.schema import customers, sales
+
+
+def directory_filters(search_term=""):
+    """WHERE conditions for the customer directory search (name or email)"""
+    if not search_term:
+        return []
+    return [filters.contains(search_term, customers.c.FullName, customers.c.Email)]
+
+
+def directory_export(conditions):
+    """Select of CustomerID, FullName, Email, Phone, CreatedDate for every matching customer"""
+    return sa.select(
+        customers.c.CustomerID, customers.c.FullName, customers.c.Email, customers.c.Phone, customers.c.CreatedDate,
+    ).where(*conditions).order_by(customers.c.CustomerID)
+
+
+def directory_frame(engine, conditions):
+    """CustomerID, FullName, Email, Phone, CreatedDate for every matching customer"""
+    with engine.connect() as conn:
+        return read_frame(directory_export(conditions), conn)
+
+
+def sales_count(engine, customer_id):
+    """Number of sales lines recorded against ``customer_id``"""
+    stmt = sa.select(sa.func.count()).select_from(sales).where(sales.c.CustomerID == int(customer_id))
+    with engine.connect() as conn:
+        return conn.execute(stmt).scalar_one()
+
+
+class CustomerHasSalesError(Exception):
+    """The customer has sales on record, so deleting them is blocked for audit purposes"""
+
+    def __init__(self, customer_id, sales_lines):
+        self.customer_id = customer_id
+        self.sales_lines = sales_lines
+        super().__init__(f"Customer {customer_id} has {sales_lines} sales records")
+
+
+def add_customer(engine, full_name, email=None, phone=None, created_date=None):
+    """Register a customer; returns the new CustomerID"""
+    with engine.begin() as conn:
+        result = conn.execute(customers.insert().values(
+            FullName=full_name, Email=email, Phone=phone, CreatedDate=created_date or datetime.now(),
+        ))
+    catalog.invalidate(catalog.CUSTOMERS)
+    return result.inserted_primary_key[0]
+
+
+def remove_customer(engine, customer_id):
+    """Delete a customer who has no sales; raises ``CustomerHasSalesError`` otherwise"""
+    customer_id = int(customer_id)
+    with engine.begin() as conn:
+        sales_lines = conn.execute(
+            sa.select(sa.func.count()).select_from(sales).where(sales.c.CustomerID == customer_id)
+        ).scalar_one()
+        if sales_lines:
+            raise CustomerHasSalesError(customer_id, sales_lines)
+        conn.execute(customers.delete().where(customers.c.CustomerID == customer_id))
+    catalog.invalidate(catalog.CUSTOMERS)
@@ -0,0 +1,65 @@
+"""Process-wide pooled SQLAlchemy engine."""
+from functools import lru_cache
+
+import sqlalchemy as sa
+
+from autoparts import metrics, migrate
+from autoparts.config import get_settings
+
+# errors that mean the database could not be reached, rather than that a statement was refused
+UNREACHABLE = (sa.exc.OperationalError, sa.exc.InterfaceError, sa.exc.TimeoutError)
+
+
+def _sqlite_on_connect(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def build_engine(settings, upgrade=True):
+    """Create a new engine for ``settings``; most callers want ``get_engine()``.
+
+    Pending schema migrations are applied first unless ``upgrade`` is false.
+    """
+    url = sa.engine.make_url(settings.database_url)
+    kwargs = dict(
+        pool_pre_ping=settings.pool_pre_ping,
+        pool_recycle=settings.pool_recycle,
+    )
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            kwargs["poolclass"] = sa.pool.StaticPool
+        else:
+            kwargs.update(
+                poolclass=sa.pool.QueuePool,
+                pool_size=settings.pool_size,
+                max_overflow=settings.max_overflow,
+                pool_timeout=settings.pool_timeout,
+            )
+        kwargs["connect_args"] = {"check_same_thread": False}
+        engine = sa.create_engine(url, **kwargs)
+        sa.event.listen(engine, "connect", _sqlite_on_connect)
+    else:
+        kwargs.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+        )
+        if url.get_backend_name() == "mssql":
+            kwargs["fast_executemany"] = True
+        engine = sa.create_engine(url, **kwargs)
+
+    metrics.instrument(engine)
+    if upgrade:
+        migrate.upgrade(engine)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """The shared engine, built once per process and reused across Streamlit reruns"""
+    return build_engine(get_settings())
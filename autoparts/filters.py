@@ -0,0 +1,47 @@
+"""WHERE-clause builders shared by the listing, history and report queries.
+
+Every value is a bound parameter, so SQL Server reuses one plan per query
+shape rather than compiling one per search term or date. Date filters are
+half-open ranges on the bare column (``col >= :start AND col < :end``), never
+``CAST``/``MONTH()``/``YEAR()`` of it, so an index on the column can seek.
+"""
+from datetime import date, datetime, time, timedelta
+
+import sqlalchemy as sa
+
+LIKE_ESCAPE = "\\"
+
+
+def _bound(column, value):
+    # a calendar day on a DATETIME column means midnight at its start
+    if isinstance(column.type, sa.DateTime) and isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.min)
+    return value
+
+
+def between(column, start=None, end=None):
+    """Conditions for ``start <= column < end``; a missing bound is left open"""
+    conditions = []
+    if start is not None:
+        conditions.append(column >= _bound(column, start))
+    if end is not None:
+        conditions.append(column < _bound(column, end))
+    return conditions
+
+
+def on_days(column, first_day=None, last_day=None):
+    """Conditions for ``column`` falling on ``first_day`` through ``last_day``, both included; ``None`` is open"""
+    return between(column, first_day, None if last_day is None else last_day + timedelta(days=1))
+
+
+def escape_like(term):
+    """``term`` with LIKE wildcards (``%``, ``_`` and SQL Server's ``[``) matched literally"""
+    for char in (LIKE_ESCAPE, "%", "_", "["):
+        term = term.replace(char, LIKE_ESCAPE + char)
+    return term
+
+
+def contains(term, *columns):
+    """Case-insensitive substring match of ``term`` against any of ``columns``, as one OR"""
+    pattern = f"%{escape_like(term)}%"
+    return sa.or_(*(column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns))
@@ -0,0 +1,119 @@
+"""Short-lived stock holds for carts that have not been checked out yet.
+
+Adding a line to a cart places a hold on its units under the cart's token.
+A hold counts against the part's available stock for every other cart
+until the cart is checked out or cleared, or until it expires
+``AUTOPARTS_HOLD_TTL`` seconds after the cart last changed. Two tills
+therefore cannot both put the last unit in a cart, and an abandoned cart
+frees its stock on its own.
+
+Placing a hold takes no lock while it checks. It reads the part's stock,
+its StockVersion and the units other carts hold. Then it bumps
+StockVersion only if that is unchanged, and writes the hold. If a sale,
+restock or another hold got in between, the check is retried on fresh
+figures. Checkout commits a cart's holds in its own transaction: its
+guarded stock UPDATE must leave at least the units other carts still
+hold, and it deletes the cart's holds.
+
+What other carts hold is shown to the till from ``catalog.holds_snapshot()``,
+so reruns do not query it. This process's own holds refresh it at once;
+other processes' holds show up within ``AUTOPARTS_SNAPSHOT_TTL`` seconds,
+and ``place()`` always checks against the database.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from autoparts import catalog
+from autoparts.config import get_settings
+from autoparts.schema import parts, stock_holds
+
+# attempts at placing a hold while other tills keep changing the same part
+HOLD_RETRIES = 5
+
+
+class HoldError(Exception):
+    """The units asked for are not available to hold"""
+
+
+def new_token():
+    """A fresh cart token"""
+    return uuid.uuid4().hex
+
+
+def _active(now):
+    return stock_holds.c.ExpiresAt > now
+
+
+def held_by_others(token, now):
+    """Units of each part held by carts other than ``token``, as a correlated expression on Parts"""
+    held = sa.select(sa.func.coalesce(sa.func.sum(stock_holds.c.Qty), 0)).where(
+        stock_holds.c.PartID == parts.c.PartID, _active(now),
+    )
+    if token is not None:
+        held = held.where(stock_holds.c.HoldToken != token)
+    return held.scalar_subquery()
+
+
+def place(engine, token, part_id, qty, ttl=None):
+    """Hold ``qty`` more units of ``part_id`` for cart ``token``; returns the units the cart now holds.
+
+    Every hold of the cart is extended to expire ``ttl`` seconds from now
+    (default ``AUTOPARTS_HOLD_TTL``). Raises ``HoldError`` if fewer units
+    are free than the cart would then hold.
+    """
+    part_id, qty = int(part_id), int(qty)
+    ttl = get_settings().hold_ttl if ttl is None else ttl
+    for _attempt in range(HOLD_RETRIES):
+        now = datetime.now()
+        mine = (stock_holds.c.HoldToken == token) & (stock_holds.c.PartID == part_id)
+        with engine.begin() as conn:
+            row = conn.execute(
+                sa.select(parts.c.PartName, parts.c.StockQTY, parts.c.StockVersion,
+                          held_by_others(token, now).label("Held"))
+                .where(parts.c.PartID == part_id)
+            ).one_or_none()
+            if row is None:
+                raise HoldError(f"No part with PartID {part_id}")
+            holding = conn.execute(sa.select(stock_holds.c.Qty).where(mine, _active(now))).scalar() or 0
+            available = row.StockQTY - row.Held
+            if holding + qty > available:
+                raise HoldError(
+                    f"Only {max(available - holding, 0)} more units of {row.PartName} are available "
+                    f"({row.StockQTY} in stock, {row.Held} held for other carts)"
+                )
+
+            claimed = conn.execute(
+                parts.update()
+                .where(parts.c.PartID == part_id, parts.c.StockVersion == row.StockVersion)
+                .values(StockVersion=parts.c.StockVersion + 1)
+            ).rowcount
+            if not claimed:
+                continue
+
+            expires = now + timedelta(seconds=ttl)
+            conn.execute(stock_holds.delete().where(mine | (stock_holds.c.ExpiresAt <= now)))
+            conn.execute(stock_holds.insert().values(HoldToken=token, PartID=part_id, Qty=holding + qty,
+                                                     ExpiresAt=expires))
+            conn.execute(stock_holds.update().where(stock_holds.c.HoldToken == token).values(ExpiresAt=expires))
+        catalog.invalidate(catalog.HOLDS)
+        return holding + qty
+    raise HoldError("Other tills are busy with this part; try again")
+
+
+def release(engine, token, part_id=None):
+    """Drop the holds of cart ``token`` (only on ``part_id`` if given)"""
+    condition = stock_holds.c.HoldToken == token
+    if part_id is not None:
+        condition &= stock_holds.c.PartID == int(part_id)
+    with engine.begin() as conn:
+        conn.execute(stock_holds.delete().where(condition))
+    catalog.invalidate(catalog.HOLDS)
+
+
+def held_elsewhere(engine, token=None):
+    """Units held by carts other than ``token``, as a Series indexed by PartID (parts with holds only)"""
+    held = catalog.holds_snapshot(engine)
+    active = held[(held["ExpiresAt"] > datetime.now()) & (held["HoldToken"] != token)]
+    return active.groupby("PartID")["Qty"].sum().astype("int64")
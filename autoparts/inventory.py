@@ -0,0 +1,234 @@
+"""Parts listing queries and stock movements."""
+import re
+from collections import Counter
+
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts import catalog, search
+from autoparts.metrics import read_frame
+from autoparts.pagination import PAGE_SIZES, fetch_page
+from autoparts.schema import parts
+
+# lines per UPDATE; each line binds five parameters and SQL Server allows 2100
+STOCK_BATCH = 400
+
+PAGE_KEYS = [(parts.c.StockQTY, False), (parts.c.PartID, False)]
+
+# the columns the listings and exports show
+LISTED = [column for column in parts.c if column.name != "StockVersion"]
+
+
+def part_filters(part_ids=None, reorder_ids=None):
+    """WHERE conditions for the Inventory View filters.
+
+    ``reorder_ids`` (from ``reorder.reorder_ids()``) keeps only the parts due
+    for reordering. It can run to thousands of parts, so it is written into
+    the statement rather than bound one parameter per part.
+    """
+    conditions = []
+    if part_ids is not None:
+        conditions.append(parts.c.PartID.in_(part_ids))
+    if reorder_ids is not None:
+        conditions.append(parts.c.PartID.in_(sa.bindparam("reorder_ids", list(reorder_ids), literal_execute=True)))
+    return conditions
+
+
+def parts_page(engine, conditions, after=None, page_size=PAGE_SIZES[1]):
+    """One page of Parts, lowest stock first"""
+    with engine.connect() as conn:
+        return fetch_page(conn, sa.select(*LISTED).where(*conditions), PAGE_KEYS, after, page_size)
+
+
+def parts_kpis(engine, conditions):
+    """TotalItems, TotalQty and TotalValue over every matching part, in one aggregate row"""
+    stmt = sa.select(
+        sa.func.count().label("TotalItems"),
+        sa.func.coalesce(sa.func.sum(parts.c.StockQTY), 0).label("TotalQty"),
+        sa.func.coalesce(sa.func.sum(parts.c.StockQTY * parts.c.Price), 0).label("TotalValue"),
+    ).where(*conditions)
+    with engine.connect() as conn:
+        return dict(conn.execute(stmt).one()._mapping)
+
+
+def matched_kpis(engine, part_ids):
+    """``parts_kpis()`` over ``part_ids``, from the cached parts snapshot.
+
+    For search results, whose full match set can run to the whole catalog
+    while the grid shows only the top hits.
+    """
+    snapshot = catalog.parts_snapshot(engine)
+    matched = snapshot[snapshot["PartID"].isin(list(part_ids))]
+    return {
+        "TotalItems": len(matched),
+        "TotalQty": int(matched["StockQTY"].sum()),
+        "TotalValue": round(float((matched["StockQTY"] * matched["Price"]).sum()), 2),
+    }
+
+
+def parts_export(conditions):
+    """Select of every matching part (for exports), lowest stock first"""
+    return sa.select(*LISTED).where(*conditions).order_by(parts.c.StockQTY, parts.c.PartID)
+
+
+def parts_frame(engine, conditions):
+    """Every matching part, lowest stock first"""
+    with engine.connect() as conn:
+        return read_frame(parts_export(conditions), conn)
+
+
+def selling_price(cost_price, markup_pct):
+    """Selling price for a part bought at ``cost_price`` with ``markup_pct`` percent added"""
+    return cost_price * (1 + markup_pct / 100)
+
+
+def add_part(engine, part_name, car_model, price, cost_price, stock_qty=0, supplier=None):
+    """Insert one part and refresh the cached catalog and search index; returns the new PartID.
+
+    A blank ``supplier`` is stored as NULL, as the price-list import stores it.
+    """
+    supplier = (supplier or "").strip() or None
+    with engine.begin() as conn:
+        result = conn.execute(parts.insert().values(
+            PartName=part_name, CarModel=car_model, Price=price, CostPrice=cost_price,
+            StockQTY=stock_qty, Supplier=supplier,
+        ))
+    part_id = result.inserted_primary_key[0]
+    catalog.invalidate(catalog.PARTS)
+    search.part_added(part_id, part_name, car_model, stock_qty)
+    return part_id
+
+
+class InsufficientStockError(Exception):
+    """A stock movement would have driven StockQTY negative (or hit a missing part)"""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        details = ", ".join(
+            f"PartID {part_id} (not found)" if name is None
+            else f"{name} (requested {requested}, available {available})"
+            for part_id, name, requested, available in shortages
+        )
+        super().__init__(f"Not enough stock: {details}")
+
+
+def apply_stock_deltas(conn, deltas, floor=0):
+    """Add ``deltas`` ({PartID: change}) to StockQTY with one set-based UPDATE per batch.
+
+    Runs inside the caller's transaction. If any part is missing or would end
+    up below ``floor`` (a number, or an expression per part such as the units
+    other carts hold), nothing is changed for it and ``InsufficientStockError``
+    is raised so the caller's transaction rolls back as a whole. Every updated
+    part's StockVersion is bumped. Returns {PartID: CostPrice} for the updated
+    parts.
+    """
+    part_ids = sorted(deltas)
+    costs = {}
+    for start in range(0, len(part_ids), STOCK_BATCH):
+        batch = part_ids[start:start + STOCK_BATCH]
+        delta = sa.case({part_id: deltas[part_id] for part_id in batch}, value=parts.c.PartID)
+        updated = dict(conn.execute(
+            parts.update()
+            .where(parts.c.PartID.in_(batch), parts.c.StockQTY + delta >= floor)
+            .values(StockQTY=parts.c.StockQTY + delta, StockVersion=parts.c.StockVersion + 1)
+            .returning(parts.c.PartID, parts.c.CostPrice)
+        ).all())
+        if len(updated) != len(batch):
+            raise InsufficientStockError(_shortages(conn, [p for p in batch if p not in updated], deltas, floor))
+        costs.update(updated)
+    return costs
+
+
+def _shortages(conn, part_ids, deltas, floor=0):
+    # only called for rows the UPDATE skipped, so StockQTY is still the pre-sale value
+    found = {
+        row.PartID: row
+        for row in conn.execute(
+            sa.select(parts.c.PartID, parts.c.PartName, (parts.c.StockQTY - floor).label("StockQTY"))
+            .where(parts.c.PartID.in_(part_ids))
+        )
+    }
+    shortages = []
+    for part_id in part_ids:
+        row = found.get(part_id)
+        if row is None:
+            shortages.append((part_id, None, -deltas[part_id], 0))
+        else:
+            shortages.append((part_id, row.PartName, -deltas[part_id], row.StockQTY))
+    return shortages
+
+
+class DeliveryError(Exception):
+    """A delivery cannot be received as given (bad lines or unknown parts); nothing was booked"""
+
+
+def _delivery_problems(shortages):
+    # a delivery only adds stock, so a skipped part is either missing or still below zero afterwards
+    unknown = [str(part_id) for part_id, name, *_ in shortages if name is None]
+    short = [
+        f"{name} (PartID {part_id}) would still be below zero: {available} in stock, {-requested} received"
+        for part_id, name, requested, available in shortages if name is not None
+    ]
+    problems = ([f"No part with PartID {', '.join(unknown)}"] if unknown else []) + short
+    return "; ".join(problems)
+
+
+# delivery-note headers we accept, compared ignoring case, spaces and underscores
+DELIVERY_COLUMNS = {
+    "PartID": ["partid", "partsid", "id"],
+    "Qty": ["qty", "quantity", "qtyreceived", "quantityreceived", "received"],
+}
+
+
+def read_delivery_note(fileobj, fmt):
+    """PartID and Qty lines from a CSV, gzip CSV or Parquet delivery note.
+
+    Raises ``DeliveryError`` if a column is missing or a line's PartID or
+    Qty is not a whole number above zero.
+    """
+    from autoparts import pricelist
+
+    frames = list(pricelist.read_chunks(fileobj, fmt))
+    note = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    keys = {re.sub(r"[\s_]", "", str(header)).lower(): header for header in note.columns}
+    lines = {}
+    for name, aliases in DELIVERY_COLUMNS.items():
+        header = next((keys[alias] for alias in aliases if alias in keys), None)
+        if header is None:
+            raise DeliveryError(f"The delivery note has no {name} column")
+        lines[name] = pd.to_numeric(note[header], errors="coerce")
+    lines = pd.DataFrame(lines)
+    bad = lines.isna().any(axis=1) | (lines % 1 != 0).any(axis=1) | (lines <= 0).any(axis=1)
+    if bad.any():
+        rows = ", ".join(str(row + 1) for row in lines.index[bad][:10])
+        raise DeliveryError(f"{int(bad.sum())} lines need a whole PartID and a quantity above zero (rows {rows})")
+    return lines.astype("int64")
+
+
+def receive_goods(engine, lines):
+    """Book a delivery of ``lines`` ((PartID, Qty) pairs) into stock in one transaction.
+
+    Lines for the same part are added together, and every part is updated
+    by PartID through ``apply_stock_deltas``, a few hundred lines per
+    statement. Raises ``DeliveryError`` and books nothing if a quantity is
+    not positive, a PartID does not exist or a part's stock would still be
+    below zero; the message names each of them. Returns {PartID: units added}.
+    """
+    received = Counter()
+    for part_id, qty in lines:
+        if int(qty) <= 0:
+            raise DeliveryError(f"PartID {int(part_id)}: quantity must be above zero (got {qty})")
+        received[int(part_id)] += int(qty)
+    if not received:
+        raise DeliveryError("The delivery has no lines")
+
+    try:
+        with engine.begin() as conn:
+            apply_stock_deltas(conn, received)
+    except InsufficientStockError as e:
+        raise DeliveryError(_delivery_problems(e.shortages)) from e
+
+    catalog.invalidate(catalog.PARTS)
+    for part_id, qty in received.items():
+        search.stock_changed(part_id, qty)
+    return dict(received)
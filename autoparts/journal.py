@@ -0,0 +1,403 @@
+"""Local write-ahead journal of checkouts, replicated to the central database in batches.
+
+With ``AUTOPARTS_JOURNAL_PATH`` set, Complete Sale appends the sale to a
+SQLite file on the till (WAL mode, synced to disk on commit) and returns
+once that commits. A sale no longer waits on a remote commit, and it does
+not fail when the link to the central database drops. A replicator thread
+drains the journal oldest first, up to ``AUTOPARTS_JOURNAL_BATCH`` sales
+per central transaction. It runs as soon as a sale is appended, and every
+``AUTOPARTS_JOURNAL_INTERVAL`` seconds while sales are waiting.
+
+Entries are never changed once written; what became of each is recorded in
+JournalOutcomes. Replication is keyed by receipt number. A sale whose
+receipt is already in SalesOrders is marked replicated without being
+applied again, so a batch that committed centrally before its outcomes
+were written locally is not applied twice.
+
+The central database can refuse a sale, for example because a part ran
+short or the customer was deleted in the meantime. That sale is set aside
+as failed and the rest of its batch still goes through. ``status`` lists
+failed sales, and ``retry`` queues them again once the stock is put right.
+A cart's stock holds stay in place until its sale replicates, or until
+they expire.
+
+The rest of a sale degrades to the till's own data while the link is down.
+The catalog serves its last snapshots, and ``hold()`` checks a cart line
+against that stock less this till's unreplicated sales
+(``pending_units()``) instead of placing a central hold. Receipt numbers
+come from blocks reserved ahead (``AUTOPARTS_RECEIPT_BLOCKS_AHEAD``).
+
+    python -m autoparts.journal status
+    python -m autoparts.journal drain
+    python -m autoparts.journal retry
+    python -m autoparts.journal prune --days 30
+"""
+import argparse
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from autoparts import holds, metrics, sales
+from autoparts.config import get_settings
+from autoparts.db import UNREACHABLE
+from autoparts.inventory import InsufficientStockError
+from autoparts.schema import sales_orders
+
+REPLICATED = "replicated"
+FAILED = "failed"
+PENDING = "pending"
+
+# errors that are down to the sale itself; anything else leaves the batch pending for the next run
+_REFUSED = (InsufficientStockError, sa.exc.IntegrityError)
+
+_metadata = sa.MetaData()
+
+journal_entries = sa.Table(
+    "JournalEntries", _metadata,
+    sa.Column("EntryID", sa.Integer, primary_key=True),
+    sa.Column("ReceiptNumber", sa.String(32), nullable=False, unique=True),
+    sa.Column("CustomerID", sa.Integer, nullable=False),
+    sa.Column("SaleDate", sa.DateTime, nullable=False),
+    sa.Column("HoldToken", sa.String(32)),
+    # JSON list of the cart's lines: PartID, Qty, Total
+    sa.Column("Cart", sa.Text, nullable=False),
+)
+
+journal_outcomes = sa.Table(
+    "JournalOutcomes", _metadata,
+    sa.Column("EntryID", sa.Integer, sa.ForeignKey("JournalEntries.EntryID"), primary_key=True),
+    sa.Column("State", sa.String(16), nullable=False),
+    sa.Column("OrderID", sa.Integer),
+    sa.Column("Error", sa.Text),
+    sa.Column("DecidedAt", sa.DateTime, nullable=False),
+    sa.Index("IX_JournalOutcomes_State", "State", "DecidedAt"),
+)
+
+
+def _on_connect(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # a sale is reported complete only once it is on disk
+    cursor.execute("PRAGMA synchronous=FULL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def journal_engine(path):
+    """Engine for the journal file at ``path``, created on first use (by one thread only)"""
+    with _engines_lock:
+        engine = _engines.get(path)
+        if engine is None:
+            engine = sa.create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+            sa.event.listen(engine, "connect", _on_connect)
+            _metadata.create_all(engine)
+            engine = _engines[path] = metrics.instrument(engine)
+        return engine
+
+
+def enabled():
+    return bool(get_settings().journal_path)
+
+
+def _local(path):
+    return journal_engine(path or get_settings().journal_path)
+
+
+def append(customer_id, cart, sale_date, receipt_number, hold_token=None, path=None):
+    """Write a sale to the journal; returns its EntryID once it is on disk"""
+    lines = [{"PartID": int(item['PartID']), "Qty": int(item['Qty']), "Total": float(item['Total'])}
+             for item in cart]
+    with _local(path).begin() as conn:
+        return conn.execute(
+            journal_entries.insert().values(
+                ReceiptNumber=receipt_number, CustomerID=int(customer_id), SaleDate=sale_date,
+                HoldToken=hold_token, Cart=json.dumps(lines),
+            )
+        ).inserted_primary_key[0]
+
+
+def checkout(engine, customer_id, cart, sale_date, receipt_number, hold_token=None):
+    """Complete a sale: into the journal when one is configured, otherwise straight into ``engine``.
+
+    Returns True if the sale was journaled; the replicator then applies it
+    to ``engine`` with ``sales.record_checkout()``.
+    """
+    path = get_settings().journal_path
+    if not path:
+        sales.checkout(engine, customer_id, cart, sale_date, receipt_number, hold_token)
+        return False
+    append(customer_id, cart, sale_date, receipt_number, hold_token, path)
+    replicator(engine, path).wake()
+    return True
+
+
+def hold(engine, token, part_id, qty, available):
+    """Hold ``qty`` units of ``part_id`` for cart ``token``; returns True if the hold is in the central database.
+
+    With a journal, while the central database cannot be reached, the line
+    is checked against ``available`` (the till's own figure) instead and
+    False is returned. Raises ``holds.HoldError`` if the units are not free.
+    """
+    try:
+        holds.place(engine, token, part_id, qty)
+        return True
+    except UNREACHABLE:
+        if not enabled():
+            raise
+    if qty > available:
+        raise holds.HoldError(f"Only {max(available, 0)} units are available")
+    return False
+
+
+def release(engine, token):
+    """Drop the holds of cart ``token``; with a journal, an unreachable central database leaves them to expire"""
+    try:
+        holds.release(engine, token)
+    except UNREACHABLE:
+        if not enabled():
+            raise
+
+
+def pending_units(path=None):
+    """Units sold on this till but not yet replicated, as a Series indexed by PartID"""
+    with _local(path).connect() as conn:
+        carts = [json.loads(entry.Cart) for entry in _pending(conn)]
+    units = Counter()
+    for cart in carts:
+        for item in cart:
+            units[item["PartID"]] += item["Qty"]
+    return pd.Series(units, dtype="int64")
+
+
+def _pending(conn, limit=None):
+    stmt = (
+        sa.select(journal_entries)
+        .outerjoin(journal_outcomes, journal_outcomes.c.EntryID == journal_entries.c.EntryID)
+        .where(journal_outcomes.c.EntryID.is_(None))
+        .order_by(journal_entries.c.EntryID)
+    )
+    return conn.execute(stmt.limit(limit) if limit else stmt).all()
+
+
+def _apply(engine, entries):
+    """Apply ``entries`` to the central database in one transaction; returns ``{EntryID: (OrderID, error)}``"""
+    outcomes = {}
+    committed = []
+    with engine.begin() as conn:
+        existing = dict(conn.execute(
+            sa.select(sales_orders.c.ReceiptNumber, sales_orders.c.OrderID)
+            .where(sales_orders.c.ReceiptNumber.in_([entry.ReceiptNumber for entry in entries]))
+        ).all())
+        for entry in entries:
+            if entry.ReceiptNumber in existing:
+                outcomes[entry.EntryID] = (existing[entry.ReceiptNumber], None)
+                continue
+            order_id, sold = sales.record_checkout(conn, entry.CustomerID, json.loads(entry.Cart), entry.SaleDate,
+                                                   entry.ReceiptNumber, entry.HoldToken)
+            outcomes[entry.EntryID] = (order_id, None)
+            committed.append((entry.SaleDate, sold))
+    for sale_date, sold in committed:
+        sales.checkout_committed(sale_date, sold)
+    return outcomes
+
+
+_drain_locks = {}
+_drain_locks_lock = threading.Lock()
+
+
+def _drain_lock(path):
+    with _drain_locks_lock:
+        return _drain_locks.setdefault(path, threading.Lock())
+
+
+def replicate_batch(engine, path=None, batch_size=None):
+    """Replicate the oldest pending sales, up to ``batch_size``; returns a Counter of outcomes by state"""
+    local = _local(path)
+    batch_size = batch_size or get_settings().journal_batch
+    with local.connect() as conn:
+        entries = _pending(conn, batch_size)
+    if not entries:
+        return Counter()
+
+    try:
+        outcomes = _apply(engine, entries)
+    except _REFUSED:
+        # something in the batch was refused: apply the sales one by one to set aside only those at fault
+        outcomes = {}
+        for entry in entries:
+            try:
+                outcomes.update(_apply(engine, [entry]))
+            except _REFUSED as e:
+                outcomes[entry.EntryID] = (None, str(e).splitlines()[0])
+
+    now = datetime.now()
+    with local.begin() as conn:
+        conn.execute(sqlite_insert(journal_outcomes).on_conflict_do_nothing(), [
+            {"EntryID": entry_id, "State": FAILED if error else REPLICATED, "OrderID": order_id,
+             "Error": error, "DecidedAt": now}
+            for entry_id, (order_id, error) in outcomes.items()
+        ])
+    return Counter(FAILED if error else REPLICATED for _order_id, error in outcomes.values())
+
+
+def drain(engine, path=None, batch_size=None):
+    """Replicate pending sales batch by batch until none are left; returns a Counter of outcomes by state"""
+    path = path or get_settings().journal_path
+    totals = Counter()
+    with _drain_lock(path):
+        while True:
+            done = replicate_batch(engine, path, batch_size)
+            if not done:
+                return totals
+            totals.update(done)
+
+
+class Replicator:
+    """Daemon thread that drains a journal into the central database"""
+
+    def __init__(self, engine, path, interval):
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        # the error that stopped the last run (the central database was unreachable, say), if any
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="journal-replicator", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Run now rather than at the next interval"""
+        self._wake.set()
+
+    def stop(self):
+        """Finish the current run, if any, and stop"""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.clear()
+            try:
+                drain(self.engine, self.path)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self._wake.wait(self.interval)
+
+
+_replicators = {}
+_replicators_lock = threading.Lock()
+
+
+def replicator(engine, path=None):
+    """The process-wide replicator for ``engine`` and the journal at ``path``, started on first use"""
+    key = (engine, path or get_settings().journal_path)
+    with _replicators_lock:
+        if key not in _replicators:
+            _replicators[key] = Replicator(engine, key[1], get_settings().journal_interval)
+        return _replicators[key]
+
+
+def stop_replicators():
+    """Stop every replicator started in this process"""
+    with _replicators_lock:
+        stopping = list(_replicators.values())
+        _replicators.clear()
+    for running in stopping:
+        running.stop()
+
+
+def counts(path=None):
+    """Number of sales in the journal by state (pending, replicated, failed)"""
+    with _local(path).connect() as conn:
+        total = conn.execute(sa.select(sa.func.count()).select_from(journal_entries)).scalar_one()
+        decided = dict(conn.execute(
+            sa.select(journal_outcomes.c.State, sa.func.count()).group_by(journal_outcomes.c.State)
+        ).all())
+    return {PENDING: total - sum(decided.values()), REPLICATED: decided.get(REPLICATED, 0),
+            FAILED: decided.get(FAILED, 0)}
+
+
+def failures(path=None):
+    """The sales the central database refused, oldest first"""
+    stmt = (
+        sa.select(journal_entries.c.EntryID, journal_entries.c.ReceiptNumber, journal_entries.c.SaleDate,
+                  journal_outcomes.c.Error)
+        .join(journal_outcomes, journal_outcomes.c.EntryID == journal_entries.c.EntryID)
+        .where(journal_outcomes.c.State == FAILED)
+        .order_by(journal_entries.c.EntryID)
+    )
+    with _local(path).connect() as conn:
+        return conn.execute(stmt).all()
+
+
+def retry(path=None):
+    """Queue the failed sales for replication again; returns how many"""
+    with _local(path).begin() as conn:
+        return conn.execute(journal_outcomes.delete().where(journal_outcomes.c.State == FAILED)).rowcount
+
+
+def prune(days, path=None):
+    """Delete sales replicated more than ``days`` days ago; returns how many"""
+    replicated = (
+        sa.select(journal_outcomes.c.EntryID)
+        .where(journal_outcomes.c.State == REPLICATED,
+               journal_outcomes.c.DecidedAt < datetime.now() - timedelta(days=days))
+    )
+    with _local(path).begin() as conn:
+        entry_ids = conn.execute(replicated).scalars().all()
+        for start in range(0, len(entry_ids), 500):
+            chunk = entry_ids[start:start + 500]
+            conn.execute(journal_outcomes.delete().where(journal_outcomes.c.EntryID.in_(chunk)))
+            conn.execute(journal_entries.delete().where(journal_entries.c.EntryID.in_(chunk)))
+    return len(entry_ids)
+
+
+def main(argv=None):
+    from autoparts.db import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.journal",
+                                     description="Inspect and drain a till's local sales journal")
+    parser.add_argument("--path", help="journal file (default: AUTOPARTS_JOURNAL_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="count the sales by state and list the failed ones")
+    commands.add_parser("drain", help="replicate every pending sale now")
+    commands.add_parser("retry", help="queue the failed sales again")
+    prune_cmd = commands.add_parser("prune", help="delete sales replicated a while ago")
+    prune_cmd.add_argument("--days", type=int, default=30, help="keep sales replicated this recently (default: 30)")
+    args = parser.parse_args(argv)
+
+    path = args.path or get_settings().journal_path
+    if not path:
+        parser.error("set AUTOPARTS_JOURNAL_PATH or pass --path")
+
+    if args.command == "status":
+        print(", ".join(f"{state}: {count}" for state, count in counts(path).items()))
+        for failure in failures(path):
+            print(f"  {failure.ReceiptNumber}  {failure.SaleDate:%Y-%m-%d %H:%M}  {failure.Error}")
+    elif args.command == "drain":
+        try:
+            done = drain(get_engine(), path)
+        except sa.exc.SQLAlchemyError as e:
+            parser.exit(1, f"Could not reach the central database: {e}\n")
+        print(f"Replicated {done[REPLICATED]} sales, {done[FAILED]} failed")
+    elif args.command == "retry":
+        print(f"Queued {retry(path)} failed sales again")
+    else:
+        print(f"Pruned {prune(args.days, path)} replicated sales")
+
+
+if __name__ == "__main__":
+    main()
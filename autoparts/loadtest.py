@@ -0,0 +1,319 @@
+"""Concurrent-till load test for the write path.
+
+Runs ``--tills`` cashiers as threads in one process, sharing one engine and
+one receipt allocator the way the Streamlit sessions of one app server do.
+Each till loops over a mix of checkouts (realistic carts of popular parts),
+restocks and report reads until ``--duration`` runs out:
+
+    python -m autoparts.loadtest --scratch --tills 8 --duration 60
+    python -m autoparts.loadtest --scratch --tills 16 --restock 0.1 --reads 0.2 --json run.json
+
+It writes real sales and stock movements, so point it at a scratch copy
+(``python -m autoparts.synth`` fills one) and pass ``--scratch`` to confirm.
+The report gives sales/sec, latency percentiles per operation, deadlocks,
+lock timeouts and lock waits, and checks afterwards that no part went below
+zero and that every part's stock moved by exactly what the tills committed.
+
+A lock wait is a write statement that took longer than ``LOCK_WAIT_MS``;
+uncontended writes finish in well under a millisecond, so the rest of that
+time was spent waiting for another till's lock. On SQL Server the server's
+own LCK_M_* wait counters are reported as well.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import sqlalchemy as sa
+
+from autoparts import catalog, reports, sales
+from autoparts.inventory import InsufficientStockError, apply_stock_deltas
+from autoparts.numbering import RECEIPT, HiLoAllocator, format_receipt_number
+from autoparts.schema import customers, parts
+
+SALE, RESTOCK, READ = "sale", "restock", "read"
+# write statements slower than this are counted as lock waits
+LOCK_WAIT_MS = 50
+# parts the tills sell from, most popular first
+HOT_PARTS = 2000
+MAX_CART_LINES = 5
+
+_MSSQL_LOCK_WAITS = sa.text(
+    "SELECT COALESCE(SUM(waiting_tasks_count), 0), COALESCE(SUM(wait_time_ms), 0) "
+    "FROM sys.dm_os_wait_stats WHERE wait_type LIKE 'LCK_M_%'"
+)
+
+
+def classify(error):
+    """``deadlock``, ``lock_timeout``, ``short_stock`` or ``error`` for an exception raised by an operation"""
+    if isinstance(error, InsufficientStockError):
+        return "short_stock"
+    message = str(getattr(error, "orig", error)).lower()
+    if "deadlock" in message or "1205" in message:
+        return "deadlock"
+    if "database is locked" in message or "lock request time out" in message or "1222" in message:
+        return "lock_timeout"
+    return "error"
+
+
+class Stats:
+    """Counters shared by the tills"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = Counter()
+        self.lines = 0
+        self.lock_waits = 0
+        self.lock_wait_ms = 0.0
+        # committed stock movement per part, to check the database against
+        self.moved = Counter()
+        self.errors = Counter()
+
+    def record(self, op, seconds, outcome, deltas=None, lines=0):
+        with self._lock:
+            self.latencies[op].append(seconds)
+            self.outcomes[op, outcome] += 1
+            if deltas:
+                self.moved.update(deltas)
+            self.lines += lines
+
+    def record_error(self, error):
+        with self._lock:
+            self.errors[f"{type(error).__name__}: {str(error).splitlines()[0][:120]}"] += 1
+
+    def record_write(self, milliseconds):
+        if milliseconds > LOCK_WAIT_MS:
+            with self._lock:
+                self.lock_waits += 1
+                self.lock_wait_ms += milliseconds
+
+
+def _watch_writes(engine, stats):
+    def before(conn, _cursor, statement, *_args):
+        conn.info["loadtest_started"] = time.perf_counter()
+
+    def after(conn, _cursor, statement, *_args):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            stats.record_write((time.perf_counter() - conn.info.pop("loadtest_started")) * 1000)
+
+    sa.event.listen(engine, "before_cursor_execute", before)
+    sa.event.listen(engine, "after_cursor_execute", after)
+
+
+class Till:
+    def __init__(self, number, engine, allocator, part_ids, part_weights, prices, customer_ids, stats, args):
+        self.rng = random.Random(args.seed * 1000 + number)
+        self.engine = engine
+        self.allocator = allocator
+        self.part_ids = part_ids
+        self.part_weights = part_weights
+        self.prices = prices
+        self.customer_ids = customer_ids
+        self.stats = stats
+        self.args = args
+
+    def _cart(self):
+        positions = self.rng.choices(range(len(self.part_ids)), weights=self.part_weights,
+                                     k=self.rng.randint(1, MAX_CART_LINES))
+        cart = []
+        for pos in positions:
+            qty = self.rng.randint(1, 3)
+            cart.append({"PartID": self.part_ids[pos], "Qty": qty, "Total": round(self.prices[pos] * qty, 2)})
+        return cart
+
+    def sale(self):
+        cart = self._cart()
+        receipt = format_receipt_number(self.allocator.next())
+        sales.checkout(self.engine, self.rng.choice(self.customer_ids), cart, datetime.now(), receipt)
+        deltas = Counter()
+        for item in cart:
+            deltas[item["PartID"]] -= item["Qty"]
+        return deltas, len(cart)
+
+    def restock(self):
+        part_id = self.rng.choices(self.part_ids, weights=self.part_weights)[0]
+        qty = self.rng.randint(20, 100)
+        with self.engine.begin() as conn:
+            apply_stock_deltas(conn, {part_id: qty})
+        catalog.invalidate(catalog.PARTS)
+        return {part_id: qty}, 0
+
+    def read(self):
+        today = date.today()
+        if self.rng.random() < 0.5:
+            sales.history_kpis(self.engine, sales.history_filters(today - timedelta(days=30), today))
+        else:
+            reports.profit_report(self.engine, *reports.period_range("Current Month"))
+        return None, 0
+
+    def run(self, deadline):
+        operations = [(self.sale, SALE), (self.restock, RESTOCK), (self.read, READ)]
+        weights = [1 - self.args.restock - self.args.reads, self.args.restock, self.args.reads]
+        while time.monotonic() < deadline:
+            operation, op = self.rng.choices(operations, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                deltas, lines = operation()
+            except Exception as e:
+                outcome = classify(e)
+                if outcome == "error":
+                    self.stats.record_error(e)
+                self.stats.record(op, time.perf_counter() - started, outcome)
+            else:
+                self.stats.record(op, time.perf_counter() - started, "ok", deltas, lines)
+            if self.args.think_ms:
+                time.sleep(self.rng.uniform(0, 2 * self.args.think_ms) / 1000)
+
+
+def _stock(engine, part_ids):
+    stock = {}
+    with engine.connect() as conn:
+        for start in range(0, len(part_ids), 1000):
+            batch = part_ids[start:start + 1000]
+            stock.update(conn.execute(
+                sa.select(parts.c.PartID, parts.c.StockQTY).where(parts.c.PartID.in_(batch))
+            ).all())
+    return stock
+
+
+def _server_lock_waits(engine):
+    if engine.dialect.name != "mssql":
+        return None
+    with engine.connect() as conn:
+        return tuple(conn.execute(_MSSQL_LOCK_WAITS).one())
+
+
+def _percentiles(seconds):
+    if not seconds:
+        return {}
+    ms = np.asarray(seconds) * 1000
+    return {f"p{q}_ms": round(float(np.percentile(ms, q)), 1) for q in (50, 95, 99)} | {"max_ms": round(float(ms.max()), 1)}
+
+
+def run(engine, tills=8, duration=60, restock=0.05, reads=0.1, think_ms=0, seed=1):
+    """Run the load test against ``engine``'s database; returns the report as a dict"""
+    args = argparse.Namespace(restock=restock, reads=reads, think_ms=think_ms, seed=seed)
+    with engine.connect() as conn:
+        hot = conn.execute(
+            sa.select(parts.c.PartID, parts.c.Price).order_by(parts.c.PartID).limit(HOT_PARTS)
+        ).all()
+        customer_ids = conn.execute(sa.select(customers.c.CustomerID).limit(10_000)).scalars().all()
+    if not hot or not customer_ids:
+        raise SystemExit("No parts or customers to sell; fill the database with python -m autoparts.synth first")
+    part_ids = [row.PartID for row in hot]
+    prices = [float(row.Price) for row in hot]
+    # a few parts take most of the sales, so tills contend for the same rows as at month end
+    part_weights = list(1.0 / np.arange(1, len(part_ids) + 1))
+    random.Random(seed).shuffle(part_weights)
+
+    stats = Stats()
+    _watch_writes(engine, stats)
+    allocator = HiLoAllocator(engine, RECEIPT, 50)
+    stock_before = _stock(engine, part_ids)
+    lock_waits_before = _server_lock_waits(engine)
+
+    workers = [
+        Till(number, engine, allocator, part_ids, part_weights, prices, customer_ids, stats, args)
+        for number in range(tills)
+    ]
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    threads = [threading.Thread(target=till.run, args=(deadline,), name=f"till-{i}") for i, till in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stock_after = _stock(engine, part_ids)
+    drift = {
+        part_id: {"expected": stock_before[part_id] + stats.moved[part_id], "actual": stock_after[part_id]}
+        for part_id in part_ids
+        if stock_after[part_id] != stock_before[part_id] + stats.moved[part_id]
+    }
+    with engine.connect() as conn:
+        negative = conn.execute(sa.select(sa.func.count()).select_from(parts).where(parts.c.StockQTY < 0)).scalar_one()
+
+    outcomes = {op: {outcome: count for (kind, outcome), count in stats.outcomes.items() if kind == op}
+                for op in (SALE, RESTOCK, READ)}
+    report = {
+        "tills": tills,
+        "seconds": round(elapsed, 1),
+        "backend": engine.dialect.name,
+        "sales_per_sec": round(outcomes[SALE].get("ok", 0) / elapsed, 1),
+        "lines_per_sec": round(stats.lines / elapsed, 1),
+        "outcomes": outcomes,
+        "latency": {op: _percentiles(stats.latencies[op]) for op in (SALE, RESTOCK, READ)},
+        "deadlocks": sum(counts.get("deadlock", 0) for counts in outcomes.values()),
+        "lock_timeouts": sum(counts.get("lock_timeout", 0) for counts in outcomes.values()),
+        "lock_waits": stats.lock_waits,
+        "lock_wait_ms": round(stats.lock_wait_ms),
+        "negative_stock_parts": negative,
+        "stock_drift": drift,
+        "errors": dict(stats.errors),
+    }
+    lock_waits_after = _server_lock_waits(engine)
+    if lock_waits_before is not None:
+        report["server_lock_waits"] = lock_waits_after[0] - lock_waits_before[0]
+        report["server_lock_wait_ms"] = lock_waits_after[1] - lock_waits_before[1]
+    return report
+
+
+def _print(report):
+    print(f"{report['tills']} tills for {report['seconds']}s on {report['backend']}: "
+          f"{report['sales_per_sec']} sales/sec, {report['lines_per_sec']} lines/sec")
+    print(f"{'operation':<10} {'ok':>7} {'short':>7} {'failed':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for op, counts in report["outcomes"].items():
+        latency = report["latency"][op]
+        failed = sum(count for outcome, count in counts.items() if outcome not in ("ok", "short_stock"))
+        timings = " ".join(f"{latency.get(key, 0):>9.1f}" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        print(f"{op:<10} {counts.get('ok', 0):>7} {counts.get('short_stock', 0):>7} {failed:>7} {timings}")
+    print(f"deadlocks: {report['deadlocks']}, lock timeouts: {report['lock_timeouts']}, "
+          f"lock waits: {report['lock_waits']} ({report['lock_wait_ms']} ms)")
+    if "server_lock_waits" in report:
+        print(f"server LCK_M waits: {report['server_lock_waits']} ({report['server_lock_wait_ms']} ms)")
+    print(f"parts below zero: {report['negative_stock_parts']}, parts whose stock drifted: {len(report['stock_drift'])}")
+    for error, count in report["errors"].items():
+        print(f"  {count} x {error}")
+
+
+def main(argv=None):
+    from autoparts.config import get_settings
+    from autoparts.db import build_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.loadtest",
+                                     description="Simulate concurrent tills against a scratch database")
+    parser.add_argument("--scratch", action="store_true", help="confirm the database is a scratch copy")
+    parser.add_argument("--tills", type=int, default=8, help="concurrent cashiers (default: 8)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run (default: 60)")
+    parser.add_argument("--restock", type=float, default=0.05, help="share of operations that restock (default: 0.05)")
+    parser.add_argument("--reads", type=float, default=0.1, help="share of operations that read a report (default: 0.1)")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a till's operations")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+    if not args.scratch:
+        parser.error("the load test records real sales and restocks; pass --scratch to confirm the database is a copy")
+    if args.restock + args.reads >= 1:
+        parser.error("--restock and --reads must leave room for sales")
+
+    # one connection per till, as if every till had its own session
+    settings = get_settings()
+    engine = build_engine(replace(settings, pool_size=max(settings.pool_size, args.tills)))
+    report = run(engine, args.tills, args.duration, args.restock, args.reads, args.think_ms, args.seed)
+    _print(report)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(report, out, indent=2, default=str)
+    if report["negative_stock_parts"] or report["stock_drift"]:
+        parser.exit(1, "Stock anomalies found\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Statement, section and rerun timings for diagnosing slow pages.
+
+``instrument(engine)`` hooks the engine's cursor events. From then on every
+statement run inside a ``trace()`` block is recorded with its latency and
+row count, and ``read_frame()`` (the package's ``pd.read_sql``) adds the
+rows and bytes of the frame it returns. ``section()`` times a named part of
+a page, and ``record_error()`` keeps an exception a page handled itself.
+
+When a trace ends it is appended to ``AUTOPARTS_METRICS_LOG`` as one JSON
+line, and running totals are written to ``AUTOPARTS_METRICS_TEXTFILE`` in
+the Prometheus textfile-collector format. Give each process its own
+textfile. With neither set and the debug panel off, nothing is hooked and
+``trace()`` only measures the total.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts.config import get_settings
+
+# SQL text kept per statement
+SQL_CHARS = 500
+# rerun-time histogram buckets, in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_trace = ContextVar("autoparts_trace", default=None)
+_section = ContextVar("autoparts_section", default=None)
+
+
+@dataclass
+class Statement:
+    sql: str
+    ms: float
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    section: Optional[str] = None
+
+
+@dataclass
+class Trace:
+    name: str
+    started: float = field(default_factory=time.perf_counter)
+    at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="milliseconds"))
+    total_ms: float = 0.0
+    statements: list = field(default_factory=list)
+    sections: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+    outcome: str = "ok"
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def add_statement(self, statement):
+        with self._lock:
+            self.statements.append(statement)
+
+    def add_section(self, name, ms):
+        with self._lock:
+            self.sections[name] = self.sections.get(name, 0.0) + ms
+
+    @property
+    def sql_ms(self):
+        return sum(statement.ms for statement in self.statements)
+
+    @property
+    def rows(self):
+        return sum(statement.rows or 0 for statement in self.statements)
+
+    @property
+    def bytes(self):
+        return sum(statement.bytes or 0 for statement in self.statements)
+
+    def summary(self):
+        """The trace as plain data, for the JSON log"""
+        data = {key: value for key, value in asdict(self).items() if key != "started"}
+        data.update(sql_ms=round(self.sql_ms, 2), rows=self.rows, bytes=self.bytes)
+        return data
+
+
+def enabled():
+    """Whether statements are recorded (the debug panel or a sink is configured)"""
+    settings = get_settings()
+    return bool(settings.debug_panel or settings.metrics_log or settings.metrics_textfile)
+
+
+def current():
+    """The trace being recorded in this context, or ``None``"""
+    return _trace.get()
+
+
+def instrument(engine):
+    """Record ``engine``'s statements into the current trace; a no-op unless ``enabled()``"""
+    if not enabled():
+        return engine
+
+    def before(conn, _cursor, _statement, _parameters, context, _executemany):
+        if _trace.get() is not None:
+            context._metrics_started = time.perf_counter()
+
+    def after(conn, cursor, statement, _parameters, context, _executemany):
+        trace = _trace.get()
+        started = getattr(context, "_metrics_started", None)
+        if trace is None or started is None:
+            return
+        rowcount = cursor.rowcount
+        recorded = Statement(
+            sql=" ".join(statement.split())[:SQL_CHARS],
+            ms=round((time.perf_counter() - started) * 1000, 3),
+            rows=rowcount if rowcount is not None and rowcount >= 0 else None,
+            section=_section.get(),
+        )
+        trace.add_statement(recorded)
+        conn.info["metrics_last"] = recorded
+
+    sa.event.listen(engine, "before_cursor_execute", before)
+    sa.event.listen(engine, "after_cursor_execute", after)
+    return engine
+
+
+def read_frame(stmt, conn, **kwargs):
+    """``pd.read_sql(stmt, conn)``, noting the frame's rows and bytes on its statement.
+
+    The statement's time then includes fetching the rows into the frame.
+    """
+    started = time.perf_counter()
+    df = pd.read_sql(stmt, conn, **kwargs)
+    if _trace.get() is not None:
+        recorded = conn.info.pop("metrics_last", None)
+        if recorded is not None:
+            recorded.ms = round((time.perf_counter() - started) * 1000, 3)
+            recorded.rows = len(df)
+            recorded.bytes = int(df.memory_usage(index=False, deep=True).sum())
+    return df
+
+
+@contextmanager
+def section(name):
+    """Time a named part of a page; statements run inside it are tagged with ``name``"""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    token = _section.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _section.reset(token)
+        trace.add_section(name, round((time.perf_counter() - started) * 1000, 3))
+
+
+def record_error(error):
+    """Keep an exception that was handled (shown to the user) in the current trace"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.errors.append("".join(traceback.format_exception_only(type(error), error)).strip())
+
+
+@contextmanager
+def trace(name):
+    """Record everything run inside the block as one trace (a page rerun, a job) and emit it at the end"""
+    recorded = Trace(name)
+    token = _trace.set(recorded)
+    try:
+        yield recorded
+    except BaseException as e:
+        # Streamlit ends a rerun early with control-flow exceptions (st.rerun, st.stop)
+        recorded.outcome = type(e).__name__
+        raise
+    finally:
+        _trace.reset(token)
+        recorded.total_ms = round((time.perf_counter() - recorded.started) * 1000, 3)
+        _emit(recorded)
+
+
+def _emit(recorded):
+    settings = get_settings()
+    if settings.metrics_log:
+        _write_log(settings.metrics_log, recorded)
+    if settings.metrics_textfile:
+        _totals.add(recorded)
+        _totals.write(settings.metrics_textfile)
+
+
+_log_lock = threading.Lock()
+
+
+def _write_log(path, recorded):
+    line = json.dumps(recorded.summary(), default=str)
+    with _log_lock, open(path, "a", encoding="utf-8") as log:
+        log.write(line + "\n")
+
+
+class _Totals:
+    """Running totals per trace name, rendered as Prometheus counters and a histogram"""
+
+    COUNTERS = [
+        ("autoparts_reruns_total", "Reruns (or jobs) traced, by outcome"),
+        ("autoparts_sql_statements_total", "SQL statements run"),
+        ("autoparts_sql_seconds_total", "Time spent executing SQL"),
+        ("autoparts_sql_rows_total", "Rows read into frames or changed"),
+        ("autoparts_sql_bytes_total", "Bytes of the frames read"),
+        ("autoparts_section_seconds_total", "Time spent in each page section"),
+        ("autoparts_errors_total", "Exceptions a page handled and showed"),
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.buckets = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self.seconds = defaultdict(float)
+
+    def add(self, recorded):
+        page = (("page", recorded.name),)
+        with self._lock:
+            self.counters["autoparts_reruns_total", page + (("outcome", recorded.outcome),)] += 1
+            self.counters["autoparts_sql_statements_total", page] += len(recorded.statements)
+            self.counters["autoparts_sql_seconds_total", page] += recorded.sql_ms / 1000
+            self.counters["autoparts_sql_rows_total", page] += recorded.rows
+            self.counters["autoparts_sql_bytes_total", page] += recorded.bytes
+            self.counters["autoparts_errors_total", page] += len(recorded.errors)
+            for name, ms in recorded.sections.items():
+                self.counters["autoparts_section_seconds_total", page + (("section", name),)] += ms / 1000
+            seconds = recorded.total_ms / 1000
+            self.buckets[recorded.name][bisect_left(BUCKETS, seconds)] += 1
+            self.seconds[recorded.name] += seconds
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for metric, help in self.COUNTERS:
+                lines += [f"# HELP {metric} {help}", f"# TYPE {metric} counter"]
+                lines += [
+                    f"{metric}{_labels(pairs)} {value:g}"
+                    for (name, pairs), value in sorted(self.counters.items()) if name == metric
+                ]
+            metric = "autoparts_rerun_seconds"
+            lines += [f"# HELP {metric} Wall time of a rerun (or job)", f"# TYPE {metric} histogram"]
+            for page, counts in sorted(self.buckets.items()):
+                running = 0
+                for bound, count in zip([*map(str, BUCKETS), "+Inf"], counts):
+                    running += count
+                    lines.append(f"{metric}_bucket{_labels([('page', page), ('le', bound)])} {running}")
+                lines.append(f"{metric}_sum{_labels([('page', page)])} {self.seconds[page]:g}")
+                lines.append(f"{metric}_count{_labels([('page', page)])} {running}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "w", encoding="utf-8") as out:
+            out.write(self.render())
+        os.replace(partial, path)
+
+
+def _labels(pairs):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_totals = _Totals()
@@ -0,0 +1,376 @@
+"""Versioned schema migrations for SQL Server and SQLite.
+
+Each migration runs in its own transaction and is recorded in SchemaVersion.
+Every step checks what already exists, so databases created by hand or by
+an earlier release upgrade in place. The app applies pending migrations when
+its engine is built; deployments can run them (and inspect the result) first:
+
+    python -m autoparts.migrate upgrade
+    python -m autoparts.migrate status
+    python -m autoparts.migrate explain
+"""
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+import sqlalchemy as sa
+
+from autoparts import rollup
+from autoparts.schema import sales_daily_rollup, schema_version
+
+
+class MigrationError(Exception):
+    """A migration cannot be applied to the data as it stands"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable
+
+
+# Each migration creates the tables, columns and indexes as they stood when
+# it was written, from its own MetaData, so a fresh database goes through
+# the same steps as an old one. schema.py is what the last one leaves.
+_Money = sa.Numeric(12, 2, asdecimal=False)
+
+# 1: the baseline tables
+_v1 = sa.MetaData()
+sa.Table(
+    "Parts", _v1,
+    sa.Column("PartID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("PartName", sa.String(200), nullable=False),
+    sa.Column("CarModel", sa.String(100), nullable=False),
+    sa.Column("Price", _Money, nullable=False),
+    sa.Column("CostPrice", _Money, nullable=False),
+    sa.Column("StockQTY", sa.Integer, nullable=False),
+    sa.Column("Supplier", sa.String(200)),
+)
+sa.Table(
+    "Customers", _v1,
+    sa.Column("CustomerID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("FullName", sa.String(200), nullable=False),
+    sa.Column("Email", sa.String(200)),
+    sa.Column("Phone", sa.String(50)),
+    sa.Column("CreatedDate", sa.DateTime),
+)
+sa.Table(
+    "SalesOrders", _v1,
+    sa.Column("OrderID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("ReceiptNumber", sa.String(32), nullable=False, unique=True),
+    sa.Column("CustomerID", sa.Integer, sa.ForeignKey("Customers.CustomerID"), nullable=False),
+    sa.Column("OrderDate", sa.DateTime, nullable=False),
+    sa.Column("TotalAmount", _Money, nullable=False),
+    sa.Index("IX_SalesOrders_OrderDate", "OrderDate"),
+)
+sa.Table(
+    "Sales", _v1,
+    sa.Column("SalesId", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("CustomerID", sa.Integer, sa.ForeignKey("Customers.CustomerID"), nullable=False),
+    sa.Column("PartsID", sa.Integer, sa.ForeignKey("Parts.PartID"), nullable=False),
+    sa.Column("QuantitySold", sa.Integer, nullable=False),
+    sa.Column("TotalAmount", _Money, nullable=False),
+    sa.Column("SaleDate", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "ReceiptCounters", _v1,
+    sa.Column("Name", sa.String(50), primary_key=True),
+    sa.Column("NextValue", sa.BigInteger, nullable=False),
+)
+sa.Table(
+    "SalesDailyRollup", _v1,
+    sa.Column("SaleDay", sa.Date, primary_key=True),
+    sa.Column("PartID", sa.Integer, primary_key=True),
+    sa.Column("CustomerID", sa.Integer, primary_key=True),
+    sa.Column("Lines", sa.Integer, nullable=False),
+    sa.Column("Units", sa.Integer, nullable=False),
+    sa.Column("Revenue", _Money, nullable=False),
+    sa.Column("Cost", _Money, nullable=False),
+    sa.Index("IX_SalesDailyRollup_CustomerID", "CustomerID"),
+)
+
+# 2: Sales.OrderID
+_v2 = sa.MetaData()
+sa.Table("SalesOrders", _v2, sa.Column("OrderID", sa.Integer, primary_key=True))
+_v2_sales = sa.Table(
+    "Sales", _v2,
+    sa.Column("SalesId", sa.Integer, primary_key=True),
+    sa.Column("OrderID", sa.Integer, sa.ForeignKey("SalesOrders.OrderID", name="FK_Sales_OrderID")),
+    sa.Index("IX_Sales_OrderID", "OrderID"),
+)
+
+# 4: indexes for the hot queries
+_v4 = sa.MetaData()
+_v4_parts = sa.Table(
+    "Parts", _v4,
+    sa.Column("PartName", sa.String(200)),
+    sa.Column("CarModel", sa.String(100)),
+    sa.Column("StockQTY", sa.Integer),
+    sa.Index("IX_Parts_StockQTY", "StockQTY"),
+    sa.Index("UQ_Parts_PartName_CarModel", "PartName", "CarModel", unique=True),
+)
+sa.Table(
+    "Customers", _v4,
+    sa.Column("FullName", sa.String(200)),
+    sa.Index("IX_Customers_FullName", "FullName"),
+)
+sa.Table(
+    "Sales", _v4,
+    sa.Column("SaleDate", sa.DateTime),
+    sa.Column("CustomerID", sa.Integer),
+    sa.Column("PartsID", sa.Integer),
+    sa.Index("IX_Sales_SaleDate", "SaleDate"),
+    sa.Index("IX_Sales_CustomerID", "CustomerID"),
+    sa.Index("IX_Sales_PartsID", "PartsID"),
+)
+
+# 5: staging table for price-list imports
+_v5 = sa.MetaData()
+sa.Table(
+    "PartsStaging", _v5,
+    sa.Column("BatchID", sa.String(32), primary_key=True),
+    sa.Column("RowNo", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("PartName", sa.String(200), nullable=False),
+    sa.Column("CarModel", sa.String(100), nullable=False),
+    sa.Column("Supplier", sa.String(200)),
+    sa.Column("CostPrice", _Money, nullable=False),
+    sa.Column("Price", _Money),
+    sa.Column("MarkupPct", sa.Numeric(7, 2, asdecimal=False), nullable=False),
+    sa.Index("IX_PartsStaging_Part", "BatchID", "PartName", "CarModel", "RowNo"),
+)
+
+# 6: stock holds and Parts.StockVersion
+_v6 = sa.MetaData()
+_v6_parts = sa.Table(
+    "Parts", _v6,
+    sa.Column("PartID", sa.Integer, primary_key=True),
+    sa.Column("StockVersion", sa.Integer, nullable=False, server_default="0"),
+)
+_v6_holds = sa.Table(
+    "StockHolds", _v6,
+    sa.Column("HoldID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("HoldToken", sa.String(32), nullable=False),
+    sa.Column("PartID", sa.Integer, sa.ForeignKey("Parts.PartID"), nullable=False),
+    sa.Column("Qty", sa.Integer, nullable=False),
+    sa.Column("ExpiresAt", sa.DateTime, nullable=False),
+    sa.Index("IX_StockHolds_PartID", "PartID", "ExpiresAt"),
+    sa.Index("UQ_StockHolds_HoldToken_PartID", "HoldToken", "PartID", unique=True),
+)
+
+
+# 7: log of rollup rebuilds
+_v7 = sa.MetaData()
+sa.Table(
+    "RollupRebuilds", _v7,
+    sa.Column("RebuildID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("StartDay", sa.Date),
+    sa.Column("EndDay", sa.Date),
+    sa.Column("RebuiltAt", sa.DateTime, nullable=False),
+)
+
+
+# 8: one part per supplier
+_v8 = sa.MetaData()
+_v8_parts = sa.Table(
+    "Parts", _v8,
+    sa.Column("PartName", sa.String(200)),
+    sa.Column("CarModel", sa.String(100)),
+    sa.Column("Supplier", sa.String(200)),
+    sa.Index("UQ_Parts_PartName_CarModel_Supplier", "PartName", "CarModel", "Supplier", unique=True),
+)
+
+
+# 9: blank suppliers stored as NULL
+_v9 = sa.MetaData()
+_v9_parts = sa.Table(
+    "Parts", _v9,
+    sa.Column("PartName", sa.String(200)),
+    sa.Column("CarModel", sa.String(100)),
+    sa.Column("Supplier", sa.String(200)),
+)
+
+
+def _add_column(conn, table, name):
+    column = table.c[name]
+    existing = {info["name"].lower() for info in sa.inspect(conn).get_columns(table.name)}
+    if name.lower() not in existing:
+        preparer = conn.dialect.identifier_preparer
+        spec = sa.schema.CreateColumn(column).compile(dialect=conn.dialect)
+        conn.execute(sa.text(f"ALTER TABLE {preparer.format_table(table)} ADD {spec}"))
+        return True
+    return False
+
+
+def _create_indexes(conn, indexes):
+    inspector = sa.inspect(conn)
+    for index in sorted(indexes, key=lambda index: index.name):
+        if index.name in {existing["name"] for existing in inspector.get_indexes(index.table.name)}:
+            continue
+        if index.table is _v4_parts and index.unique:
+            duplicates = _duplicate_parts(conn)
+            if duplicates:
+                listed = ", ".join(f"{name} ({model})" for name, model in duplicates[:10])
+                raise MigrationError(
+                    f"Cannot add {index.name}; more than one part is listed as: {listed}. "
+                    f"Merge or rename them, then run the upgrade again."
+                )
+        index.create(conn)
+
+
+def _create_baseline(conn):
+    _v1.create_all(conn, checkfirst=True)
+
+
+def _link_sales_to_orders(conn):
+    if _add_column(conn, _v2_sales, "OrderID") and conn.dialect.name != "sqlite":
+        # SQLite cannot add a constraint to an existing table
+        conn.execute(sa.schema.AddConstraint(next(iter(_v2_sales.c.OrderID.foreign_keys)).constraint))
+    _create_indexes(conn, _v2_sales.indexes)
+
+
+def _backfill_rollup(conn):
+    if conn.execute(sa.select(sa.func.count()).select_from(sales_daily_rollup)).scalar_one() == 0:
+        # RollupRebuilds comes in version 7; a replica's first sync copies the whole rollup anyway
+        rollup.rebuild(conn, record=False)
+
+
+def _duplicate_parts(conn):
+    part = _v4_parts.c
+    return conn.execute(
+        sa.select(part.PartName, part.CarModel)
+        .group_by(part.PartName, part.CarModel)
+        .having(sa.func.count() > 1)
+    ).all()
+
+
+def _add_hot_indexes(conn):
+    _create_indexes(conn, [index for table in _v4.sorted_tables for index in table.indexes])
+
+
+def _add_staging(conn):
+    _v5.create_all(conn, checkfirst=True)
+
+
+def _add_stock_holds(conn):
+    _add_column(conn, _v6_parts, "StockVersion")
+    _v6_holds.create(conn, checkfirst=True)
+
+
+def _add_rollup_rebuilds(conn):
+    _v7.create_all(conn, checkfirst=True)
+
+
+def _key_parts_by_supplier(conn):
+    # the wider index first, so Parts is never without one
+    _create_indexes(conn, _v8_parts.indexes)
+    narrow = next(index for index in _v4_parts.indexes if index.unique)
+    if narrow.name in {existing["name"] for existing in sa.inspect(conn).get_indexes(narrow.table.name)}:
+        narrow.drop(conn)
+
+
+
+def _null_blank_suppliers(conn):
+    part, other = _v9_parts.c, _v9_parts.alias("other").c
+    # LTRIM(RTRIM()) rather than TRIM, which SQL Server only has from 2017
+    blank = sa.func.ltrim(sa.func.rtrim(part.Supplier)) == ""
+    clashes = conn.execute(
+        sa.select(part.PartName, part.CarModel)
+        .where(blank, sa.exists().where(
+            other.PartName == part.PartName, other.CarModel == part.CarModel, other.Supplier.is_(None),
+        ))
+        .order_by(part.PartName, part.CarModel)
+    ).all()
+    if clashes:
+        listed = ", ".join(f"{name} ({model})" for name, model in clashes[:10])
+        raise MigrationError(
+            f"Cannot clear blank suppliers; these parts are also listed with no supplier: {listed}. "
+            f"Merge them, then run the upgrade again."
+        )
+    conn.execute(_v9_parts.update().where(blank).values(Supplier=None))
+
+
+MIGRATIONS = [
+    Migration(1, "Create the application tables", _create_baseline),
+    Migration(2, "Link Sales lines to SalesOrders", _link_sales_to_orders),
+    Migration(3, "Backfill SalesDailyRollup from Sales", _backfill_rollup),
+    Migration(4, "Indexes for the hot queries", _add_hot_indexes),
+    Migration(5, "Staging table for price-list imports", _add_staging),
+    Migration(6, "Stock holds and Parts.StockVersion", _add_stock_holds),
+    Migration(7, "Log of rollup rebuilds for the reporting replica", _add_rollup_rebuilds),
+    Migration(8, "Parts unique per (PartName, CarModel, Supplier)", _key_parts_by_supplier),
+    Migration(9, "Blank Parts.Supplier stored as NULL", _null_blank_suppliers),
+]
+
+
+def applied_versions(engine):
+    """{version: AppliedAt} for every migration recorded in SchemaVersion"""
+    if not sa.inspect(engine).has_table(schema_version.name):
+        return {}
+    with engine.connect() as conn:
+        return dict(conn.execute(sa.select(schema_version.c.Version, schema_version.c.AppliedAt)).all())
+
+
+def upgrade(engine, target=None):
+    """Apply every pending migration up to ``target`` (default: all); returns the versions applied"""
+    schema_version.create(engine, checkfirst=True)
+    done = applied_versions(engine)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version in done or (target is not None and migration.version > target):
+            continue
+        try:
+            with engine.begin() as conn:
+                migration.apply(conn)
+                conn.execute(schema_version.insert().values(
+                    Version=migration.version, Description=migration.description, AppliedAt=datetime.now(),
+                ))
+        except sa.exc.IntegrityError:
+            # another process applied this version first
+            if migration.version not in applied_versions(engine):
+                raise
+            continue
+        applied.append(migration.version)
+    return applied
+
+
+def main(argv=None):
+    from autoparts import plans
+    from autoparts.config import get_settings
+    from autoparts.db import build_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.migrate", description="Manage the database schema")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_cmd = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_cmd.add_argument("--to", type=int, dest="target", help="stop after this version")
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    commands.add_parser("explain", help="show which page queries still scan a table")
+    args = parser.parse_args(argv)
+
+    engine = build_engine(get_settings(), upgrade=False)
+    if args.command == "upgrade":
+        try:
+            versions = upgrade(engine, args.target)
+        except MigrationError as e:
+            parser.exit(1, f"{e}\n")
+        print(f"Applied {', '.join(map(str, versions))}" if versions else "Already up to date")
+    elif args.command == "status":
+        done = applied_versions(engine)
+        for migration in MIGRATIONS:
+            applied_at = done.get(migration.version)
+            state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+            print(f"{migration.version:>4}  {state:<22}  {migration.description}")
+    else:
+        scans = 0
+        for page, label, plan in plans.page_plans(engine):
+            flagged = [step for step in plan if step.scan]
+            scans += bool(flagged)
+            print(f"[{'SCAN' if flagged else ' ok '}] {page}: {label}")
+            for step in flagged:
+                print(f"         {step.detail}")
+        print(f"{scans} page queries scan a table")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Receipt numbers, allocated from the database in blocks (hi/lo).
+
+Each process reserves ``AUTOPARTS_RECEIPT_BLOCK`` numbers at a time by
+bumping a row in ReceiptCounters, then hands them out from memory. Numbers
+are unique across tills and restarts; a restart skips the unused remainder
+of its block, so the sequence can have gaps.
+
+``AUTOPARTS_RECEIPT_BLOCKS_AHEAD`` more blocks are reserved in the
+background before they are needed, so a till keeps issuing numbers for a
+while when the database cannot be reached (see ``autoparts.journal``).
+"""
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+import sqlalchemy as sa
+
+from autoparts.config import get_settings
+from autoparts.db import get_engine
+from autoparts.schema import receipt_counters
+
+RECEIPT = "receipt"
+
+
+class HiLoAllocator:
+    def __init__(self, engine, name=RECEIPT, block_size=50, ahead=0):
+        self.engine = engine
+        self.name = name
+        self.block_size = block_size
+        self.ahead = ahead
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0
+        self._spares = []
+        self._refilling = False
+
+    def _reserve_block(self):
+        counter = receipt_counters.c
+        for _ in range(2):
+            with self.engine.begin() as conn:
+                limit = conn.execute(
+                    receipt_counters.update()
+                    .where(counter.Name == self.name)
+                    .values(NextValue=counter.NextValue + self.block_size)
+                    .returning(counter.NextValue)
+                ).scalar()
+                if limit is not None:
+                    return limit - self.block_size, limit
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(receipt_counters.insert().values(Name=self.name, NextValue=1 + self.block_size))
+                return 1, 1 + self.block_size
+            except sa.exc.IntegrityError:
+                # another process created the counter first; take a block from it
+                continue
+        raise RuntimeError(f"Could not reserve a block from counter {self.name!r}")
+
+    def _refill(self):
+        try:
+            block = self._reserve_block()
+        except sa.exc.SQLAlchemyError:
+            # the database is unreachable; the next call to next() tries again
+            block = None
+        with self._lock:
+            if block is not None:
+                self._spares.append(block)
+            self._refilling = False
+
+    def next(self):
+        with self._lock:
+            if self._next >= self._limit:
+                if self._spares:
+                    self._next, self._limit = self._spares.pop(0)
+                else:
+                    self._next, self._limit = self._reserve_block()
+            value = self._next
+            self._next += 1
+            if len(self._spares) < self.ahead and not self._refilling:
+                self._refilling = True
+                threading.Thread(target=self._refill, name=f"reserve-{self.name}", daemon=True).start()
+            return value
+
+
+@lru_cache(maxsize=None)
+def get_allocator():
+    settings = get_settings()
+    return HiLoAllocator(get_engine(), RECEIPT, settings.receipt_block, settings.receipt_blocks_ahead)
+
+
+def reserve_receipt_numbers(engine, count):
+    """Reserve ``count`` consecutive receipt values in one round trip; returns the first"""
+    return HiLoAllocator(engine, RECEIPT, count)._reserve_block()[0]
+
+
+def format_receipt_number(value, when=None):
+    return f"{(when or datetime.now()):%Y%m%d}-{value:06d}"
+
+
+def next_receipt_number():
+    """A new, never-issued receipt number such as ``20260117-000042``"""
+    return format_receipt_number(get_allocator().next())
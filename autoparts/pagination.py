@@ -0,0 +1,62 @@
+"""Keyset (seek) pagination for Core selects.
+
+A page is fetched with ``WHERE key > last_key ORDER BY key LIMIT n`` instead of
+OFFSET, so every page costs one index range scan of ``n`` rows however deep
+it is, and inserts elsewhere in the table never shift rows between pages.
+The key columns must be unique together (end them with the primary key).
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts.metrics import read_frame
+
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+@dataclass
+class Page:
+    rows: pd.DataFrame
+    has_next: bool
+    last_key: Optional[tuple]
+
+
+def _py(value):
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def seek_after(keys, values):
+    """Condition selecting the rows that sort after ``values``.
+
+    ``keys`` is a list of ``(column, descending)`` pairs. Expanded into
+    ``a > x OR (a = x AND b > y)`` because SQL Server has no row-value
+    comparison.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        step = column < values[i] if descending else column > values[i]
+        ties = [key == value for (key, _), value in zip(keys[:i], values[:i])]
+        clauses.append(sa.and_(*ties, step))
+    return sa.or_(*clauses)
+
+
+def fetch_page(conn, stmt, keys, after=None, page_size=PAGE_SIZES[1]):
+    """Run ``stmt`` for the ``page_size`` rows after key ``after`` (``None`` = first page)"""
+    if after is not None:
+        stmt = stmt.where(seek_after(keys, after))
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    df = read_frame(stmt.limit(page_size + 1), conn)
+
+    has_next = len(df) > page_size
+    df = df.iloc[:page_size]
+    last_key = None
+    if not df.empty:
+        last = df.iloc[-1]
+        last_key = tuple(_py(last[column.name]) for column, _ in keys)
+    return Page(df, has_next, last_key)
@@ -0,0 +1,34 @@
+"""Run a page's independent reads at the same time.
+
+``submit()`` starts a read on a process-wide thread pool and returns a
+``Future``; the page calls ``.result()`` where it renders the data, so its
+latency approaches the slowest read rather than the sum of them. Each read
+checks its own connection out of the engine's pool. Reads run in a copy of
+the caller's context, so their statements land in the caller's metrics
+trace. Only data access belongs here; Streamlit calls stay on the script
+thread.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from autoparts import metrics
+from autoparts.config import get_settings
+
+
+@lru_cache(maxsize=None)
+def _executor():
+    return ThreadPoolExecutor(max_workers=get_settings().fetch_workers, thread_name_prefix="autoparts-fetch")
+
+
+def _run(section, fn, args, kwargs):
+    if section is None:
+        return fn(*args, **kwargs)
+    with metrics.section(section):
+        return fn(*args, **kwargs)
+
+
+def submit(fn, *args, section=None, **kwargs):
+    """Start ``fn(*args, **kwargs)`` in the background, timed as ``section`` if given; returns a ``Future``"""
+    context = contextvars.copy_context()
+    return _executor().submit(context.run, _run, section, fn, args, kwargs)
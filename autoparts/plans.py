@@ -0,0 +1,116 @@
+"""Execution plans of the queries each page runs, to spot table scans.
+
+``page_plans()`` runs the package's page queries once with typical filters,
+captures the SQL they send, and asks the database how it executes each
+statement: ``EXPLAIN QUERY PLAN`` on SQLite, ``SET SHOWPLAN_XML`` on SQL
+Server. A step is flagged as a scan when it reads a whole table or index
+rather than seeking into one.
+"""
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+
+from autoparts import crm, inventory, reorder, reports, sales
+from autoparts.schema import customers, metadata, sales_orders
+
+_SHOWPLAN = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+_MSSQL_SCANS = {"Table Scan", "Clustered Index Scan", "Index Scan"}
+_SQLITE_SCAN = re.compile(r"SCAN (\w+)")
+
+
+@dataclass
+class PlanStep:
+    detail: str
+    scan: bool
+
+
+def _sqlite_plan(conn, statement, parameters):
+    steps = []
+    for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+        detail = row[-1]
+        match = _SQLITE_SCAN.match(detail)
+        steps.append(PlanStep(detail, bool(match) and match.group(1) in metadata.tables))
+    return steps
+
+
+def _mssql_plan(conn, statement, parameters):
+    cursor = conn.connection.dbapi_connection.cursor()
+    cursor.execute("SET SHOWPLAN_XML ON")
+    try:
+        cursor.execute(statement, parameters)
+        plan = ET.fromstring(cursor.fetchone()[0])
+    finally:
+        cursor.execute("SET SHOWPLAN_XML OFF")
+        cursor.close()
+
+    steps = []
+    for op in plan.iter(f"{_SHOWPLAN}RelOp"):
+        physical = op.get("PhysicalOp")
+        target = op.find(f"*/{_SHOWPLAN}Object")
+        if target is None:
+            continue
+        name = ".".join(filter(None, (target.get("Table"), target.get("Index"))))
+        steps.append(PlanStep(f"{physical} {name}", physical in _MSSQL_SCANS))
+    return steps
+
+
+def explain(conn, statement, parameters):
+    """Plan steps for one captured DBAPI statement"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        return _sqlite_plan(conn, statement, parameters)
+    if dialect == "mssql":
+        return _mssql_plan(conn, statement, parameters)
+    raise ValueError(f"No query plan support for {dialect!r}")
+
+
+def _capture(engine, run):
+    statements = []
+
+    def record(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sa.event.listen(engine, "before_cursor_execute", record)
+    try:
+        run()
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _page_queries(engine):
+    today = date.today()
+    recent = sales.history_filters(today - timedelta(days=30), today)
+    searched = sales.history_filters(today - timedelta(days=30), today, "brake")
+    month_start, month_end = reports.period_range("Current Month", today=today)
+    with engine.connect() as conn:
+        customer_id = conn.execute(sa.select(sa.func.min(customers.c.CustomerID))).scalar() or 0
+        receipt = conn.execute(sa.select(sa.func.max(sales_orders.c.ReceiptNumber))).scalar() or ""
+
+    return [
+        ("Inventory View", "Due for reorder",
+         lambda: inventory.parts_page(engine, inventory.part_filters(reorder_ids=reorder.reorder_ids(engine)))),
+        ("Inventory View", "Stock KPIs", lambda: inventory.parts_kpis(engine, [])),
+        ("Transaction History", "Last 30 days, first page", lambda: sales.history_page(engine, recent)),
+        ("Transaction History", "Last 30 days, KPIs", lambda: sales.history_kpis(engine, recent)),
+        ("Transaction History", "Search by name", lambda: sales.history_page(engine, searched)),
+        ("Transaction History", "Find receipt", lambda: sales.find_order(engine, receipt)),
+        ("Customer Management", "Directory search",
+         lambda: crm.directory_frame(engine, crm.directory_filters("smith"))),
+        ("Customer Management", "Sales count before delete", lambda: crm.sales_count(engine, customer_id)),
+        ("Customer Management", "Customer analytics", lambda: reports.customer_analytics(engine)),
+        ("Monthly Report", "Current month", lambda: reports.profit_report(engine, month_start, month_end)),
+    ]
+
+
+def page_plans(engine):
+    """Yield ``(page, label, [PlanStep, ...])`` for each query the pages run"""
+    for page, label, run in _page_queries(engine):
+        statements = _capture(engine, run)
+        with engine.connect() as conn:
+            steps = [step for statement, parameters in statements for step in explain(conn, statement, parameters)]
+        yield page, label, steps
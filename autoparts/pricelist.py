@@ -0,0 +1,338 @@
+"""Bulk imports of supplier price lists into Parts.
+
+A price list (CSV, gzip CSV or Parquet) is read ``IMPORT_CHUNK`` rows at a
+time. Each chunk is checked and its valid rows are bulk-inserted into
+PartsStaging under a batch id, so memory stays flat however long the list
+is. The batch is then merged into Parts in one transaction with set-based
+statements (a single MERGE on SQL Server), matching on the supplier part
+key (PartName, CarModel, Supplier):
+
+* a later row for the same part supersedes an earlier one;
+* existing parts take the new CostPrice, and a Price of CostPrice plus the
+  markup unless the list gives one; new parts (including a part another
+  supplier already lists) are added with no stock.
+
+    python -m autoparts.pricelist prices.csv.gz --supplier Goldwagen --markup 40
+
+A list needs PartName, CarModel and CostPrice columns, and may add
+Supplier, Price and MarkupPct (headers are matched ignoring case, spaces
+and underscores).
+"""
+import argparse
+import re
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts import catalog, search
+from autoparts.schema import parts, parts_staging
+
+IMPORT_CHUNK = 20_000
+DEFAULT_MARKUP = 50
+# rejected rows kept (with their reasons) for showing; the counts cover all of them
+MAX_REJECTS = 1000
+
+CSV = "csv"
+CSV_GZ = "csv.gz"
+PARQUET = "parquet"
+FORMATS = [CSV, CSV_GZ, PARQUET]
+
+REQUIRED = ["PartName", "CarModel", "CostPrice"]
+OPTIONAL = ["Supplier", "Price", "MarkupPct"]
+
+
+class PriceListError(Exception):
+    """The price list cannot be imported at all (unknown format, missing columns)"""
+
+
+@dataclass
+class ImportResult:
+    rows: int
+    inserted: int
+    updated: int
+    unchanged: int
+    # rows left out because a later row lists the same part
+    superseded: int
+    rejected: int
+    # Row, PartName, CarModel, Reason for the first MAX_REJECTS rejected rows
+    rejects: pd.DataFrame
+
+
+def format_of(name):
+    """The price-list format implied by a file name"""
+    lowered = name.lower()
+    for fmt in sorted(FORMATS, key=len, reverse=True):
+        if lowered.endswith(f".{fmt}"):
+            return fmt
+    raise PriceListError(f"Cannot tell the format of {name!r}; expected a .csv, .csv.gz or .parquet file")
+
+
+def read_chunks(fileobj, fmt, chunksize=IMPORT_CHUNK):
+    """The rows of a price list as DataFrames of at most ``chunksize`` rows"""
+    if fmt == PARQUET:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif fmt in (CSV, CSV_GZ):
+        yield from pd.read_csv(fileobj, chunksize=chunksize, dtype=str, keep_default_na=False,
+                               compression="gzip" if fmt == CSV_GZ else None)
+    else:
+        raise PriceListError(f"Unknown price-list format {fmt!r} (expected one of {FORMATS})")
+
+
+def _key(header):
+    return re.sub(r"[\s_]", "", str(header)).lower()
+
+
+def _columns(frame):
+    """Map the price list's headers onto ours; raises ``PriceListError`` if a required one is missing"""
+    wanted = {_key(name): name for name in REQUIRED + OPTIONAL}
+    renamed = {header: wanted[_key(header)] for header in frame.columns if _key(header) in wanted}
+    missing = [name for name in REQUIRED if name not in renamed.values()]
+    if missing:
+        raise PriceListError(f"The price list has no {', '.join(missing)} column")
+    return renamed
+
+
+def _text(frame, name):
+    if name not in frame:
+        return pd.Series("", index=frame.index)
+    return frame[name].fillna("").astype(str).str.strip()
+
+
+def _number(frame, name):
+    if name not in frame:
+        return pd.Series(np.nan, index=frame.index), pd.Series(False, index=frame.index)
+    given = _text(frame, name) != ""
+    return pd.to_numeric(frame[name], errors="coerce"), given
+
+
+def check_chunk(chunk, first_row, supplier=None, markup_pct=DEFAULT_MARKUP):
+    """Split one chunk into staging rows and rejects.
+
+    ``first_row`` is the number of the chunk's first data row. Returns
+    ``(rows, rejects)``: the valid rows as PartsStaging columns (without
+    BatchID), and Row/PartName/CarModel/Reason for the rest.
+    """
+    frame = chunk.rename(columns=_columns(chunk))
+    name, model = _text(frame, "PartName"), _text(frame, "CarModel")
+    listed_supplier = _text(frame, "Supplier")
+    listed_supplier = listed_supplier.where(listed_supplier != "", supplier or "")
+    cost, _ = _number(frame, "CostPrice")
+    price, price_given = _number(frame, "Price")
+    markup, markup_given = _number(frame, "MarkupPct")
+
+    reason = np.select(
+        [
+            name == "",
+            model == "",
+            name.str.len() > parts.c.PartName.type.length,
+            model.str.len() > parts.c.CarModel.type.length,
+            listed_supplier.str.len() > parts.c.Supplier.type.length,
+            ~(cost >= 0),
+            price_given & ~(price >= 0),
+            markup_given & ~(markup > -100),
+        ],
+        [
+            "no part name",
+            "no car model",
+            "part name too long",
+            "car model too long",
+            "supplier name too long",
+            "cost price missing or negative",
+            "price is not a number of zero or more",
+            "markup is not a percentage above -100",
+        ],
+        "",
+    )
+    row_numbers = np.arange(first_row, first_row + len(frame))
+    ok = reason == ""
+
+    rows = pd.DataFrame({
+        "RowNo": row_numbers[ok],
+        "PartName": name[ok].to_numpy(),
+        "CarModel": model[ok].to_numpy(),
+        "Supplier": listed_supplier[ok].replace("", None).to_numpy(),
+        "CostPrice": cost[ok].round(2).to_numpy(),
+        "Price": price[ok].round(2).to_numpy(),
+        "MarkupPct": markup[ok].fillna(markup_pct).to_numpy(),
+    })
+    rejects = pd.DataFrame({
+        "Row": row_numbers[~ok],
+        "PartName": name[~ok].to_numpy(),
+        "CarModel": model[~ok].to_numpy(),
+        "Reason": reason[~ok],
+    })
+    return rows, rejects
+
+
+def _records(rows, batch_id):
+    records = rows.astype(object).where(rows.notna(), None).to_dict("records")
+    for record in records:
+        record["BatchID"] = batch_id
+    return records
+
+
+def _staged(batch_id):
+    return parts_staging.c.BatchID == batch_id
+
+
+def _same_supplier(left, right):
+    # rows that name no supplier match parts that have none
+    return sa.or_(left == right, sa.and_(left.is_(None), right.is_(None)))
+
+
+def _same_part(staged):
+    return sa.and_(
+        parts.c.PartName == staged.c.PartName,
+        parts.c.CarModel == staged.c.CarModel,
+        _same_supplier(parts.c.Supplier, staged.c.Supplier),
+    )
+
+
+def _drop_superseded(conn, batch_id):
+    """Delete the rows a later row for the same part supersedes; returns how many there were"""
+    later = parts_staging.alias("later")
+    superseded = sa.exists().where(
+        later.c.BatchID == parts_staging.c.BatchID,
+        later.c.PartName == parts_staging.c.PartName,
+        later.c.CarModel == parts_staging.c.CarModel,
+        _same_supplier(later.c.Supplier, parts_staging.c.Supplier),
+        later.c.RowNo > parts_staging.c.RowNo,
+    )
+    return conn.execute(parts_staging.delete().where(_staged(batch_id), superseded)).rowcount
+
+
+def _price(staged):
+    """The markup rule: the listed Price, or CostPrice plus MarkupPct percent"""
+    return sa.func.coalesce(staged.c.Price, sa.func.round(staged.c.CostPrice * (100 + staged.c.MarkupPct) / 100, 2))
+
+
+_MSSQL_MERGE = sa.text("""
+    MERGE Parts WITH (HOLDLOCK) AS t
+    USING (SELECT PartName, CarModel, Supplier, CostPrice,
+                  COALESCE(Price, ROUND(CostPrice * (100 + MarkupPct) / 100, 2)) AS Price
+           FROM PartsStaging WHERE BatchID = :batch_id) AS s
+    ON t.PartName = s.PartName AND t.CarModel = s.CarModel
+       AND (t.Supplier = s.Supplier OR (t.Supplier IS NULL AND s.Supplier IS NULL))
+    WHEN MATCHED AND (t.CostPrice <> s.CostPrice OR t.Price <> s.Price) THEN
+        UPDATE SET CostPrice = s.CostPrice, Price = s.Price
+    WHEN NOT MATCHED THEN INSERT (PartName, CarModel, Price, CostPrice, StockQTY, Supplier)
+        VALUES (s.PartName, s.CarModel, s.Price, s.CostPrice, 0, s.Supplier)
+    OUTPUT $action;
+""")
+
+
+def _merge(conn, batch_id):
+    """Upsert the staged batch into Parts; returns ``(inserted, updated)``"""
+    if conn.dialect.name == "mssql":
+        actions = Counter(conn.execute(_MSSQL_MERGE, {"batch_id": batch_id}).scalars())
+        return actions["INSERT"], actions["UPDATE"]
+
+    source = sa.select(
+        parts_staging.c.PartName, parts_staging.c.CarModel, parts_staging.c.Supplier,
+        parts_staging.c.CostPrice, _price(parts_staging).label("Price"),
+    ).where(_staged(batch_id)).subquery("s")
+    changed = sa.or_(parts.c.CostPrice != source.c.CostPrice, parts.c.Price != source.c.Price)
+    updated = conn.execute(
+        parts.update()
+        .where(_same_part(source), changed)
+        .values(CostPrice=source.c.CostPrice, Price=source.c.Price)
+    ).rowcount
+    new_parts = sa.select(
+        source.c.PartName, source.c.CarModel, source.c.Price, source.c.CostPrice, sa.literal(0), source.c.Supplier,
+    ).where(~sa.exists().where(_same_part(source)))
+    inserted = conn.execute(
+        parts.insert().from_select(["PartName", "CarModel", "Price", "CostPrice", "StockQTY", "Supplier"], new_parts)
+    ).rowcount
+    return inserted, updated
+
+
+def import_price_list(engine, fileobj, fmt, supplier=None, markup_pct=DEFAULT_MARKUP, chunksize=IMPORT_CHUNK):
+    """Stage and merge one price list into Parts; returns an ``ImportResult``.
+
+    ``supplier`` fills in rows that name none, and ``markup_pct`` prices
+    rows that give neither a Price nor a MarkupPct. Raises
+    ``PriceListError`` (and changes nothing) if the list cannot be read.
+    """
+    batch_id = uuid.uuid4().hex
+    rows = staged = 0
+    samples = []
+    rejected = 0
+    try:
+        for chunk in read_chunks(fileobj, fmt, chunksize):
+            valid, rejects = check_chunk(chunk, rows + 1, supplier, markup_pct)
+            rows += len(chunk)
+            rejected += len(rejects)
+            room = MAX_REJECTS - sum(len(sample) for sample in samples)
+            if room > 0 and len(rejects):
+                samples.append(rejects.head(room))
+            if len(valid):
+                with engine.begin() as conn:
+                    conn.execute(parts_staging.insert(), _records(valid, batch_id))
+                staged += len(valid)
+
+        with engine.begin() as conn:
+            superseded = _drop_superseded(conn, batch_id)
+            inserted, updated = _merge(conn, batch_id)
+    except ValueError as e:
+        raise PriceListError(f"Cannot read the price list: {e}") from e
+    finally:
+        with engine.begin() as conn:
+            conn.execute(parts_staging.delete().where(_staged(batch_id)))
+
+    if inserted or updated:
+        catalog.invalidate(catalog.PARTS)
+        search.invalidate()
+    return ImportResult(
+        rows=rows,
+        inserted=inserted,
+        updated=updated,
+        unchanged=staged - superseded - inserted - updated,
+        superseded=superseded,
+        rejected=rejected,
+        rejects=pd.concat(samples, ignore_index=True) if samples else
+        pd.DataFrame(columns=["Row", "PartName", "CarModel", "Reason"]),
+    )
+
+
+def main(argv=None):
+    import sys
+
+    from autoparts.db import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.pricelist",
+                                     description="Import a supplier price list into Parts")
+    parser.add_argument("path", help="price list: .csv, .csv.gz or .parquet")
+    parser.add_argument("--format", choices=FORMATS, help="file format (default: from the file name)")
+    parser.add_argument("--supplier", help="supplier for rows that name none")
+    parser.add_argument("--markup", type=float, default=DEFAULT_MARKUP,
+                        help="percent added to CostPrice for rows with no Price or MarkupPct (default: %(default)s)")
+    parser.add_argument("--rejects", help="write the rejected rows (up to %d) to this CSV file" % MAX_REJECTS)
+    args = parser.parse_args(argv)
+
+    try:
+        fmt = args.format or format_of(args.path)
+        with open(args.path, "rb") as fileobj:
+            result = import_price_list(get_engine(), fileobj, fmt, args.supplier, args.markup)
+    except (OSError, PriceListError) as e:
+        parser.exit(1, f"{e}\n")
+
+    print(f"{result.rows} rows: {result.inserted} inserted, {result.updated} updated, "
+          f"{result.unchanged} unchanged, {result.superseded} superseded, {result.rejected} rejected")
+    if result.rejected:
+        shown = "" if len(result.rejects) == result.rejected else f" (first {len(result.rejects)})"
+        print(f"Rejected rows by reason{shown}:", file=sys.stderr)
+        for reason, count in result.rejects["Reason"].value_counts().items():
+            print(f"  {reason}: {count}", file=sys.stderr)
+    if args.rejects:
+        result.rejects.to_csv(args.rejects, index=False)
+
+
+if __name__ == "__main__":
+    main()
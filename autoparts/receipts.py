@@ -0,0 +1,124 @@
+"""HTML receipts rendered in memory from precompiled templates."""
+import html
+import zipfile
+from string import Template
+
+from autoparts import sales
+
+_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>AutoParts Pro - Receipt #$receipt_number</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .receipt { max-width: 600px; margin: 0 auto; border: 1px solid #ddd; padding: 20px; }
+        .header { text-align: center; border-bottom: 2px solid #333; padding-bottom: 10px; margin-bottom: 20px; }
+        .header h1 { color: #333; }
+        .details { margin-bottom: 20px; }
+        .details p { margin: 5px 0; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th { background-color: #f2f2f2; text-align: left; padding: 10px; border-bottom: 1px solid #ddd; }
+        td { padding: 10px; border-bottom: 1px solid #ddd; }
+        .total { text-align: right; font-size: 18px; font-weight: bold; margin-top: 20px; }
+        .footer { text-align: center; margin-top: 30px; color: #666; font-style: italic; }
+        @media print {
+            body { margin: 0; }
+            .no-print { display: none; }
+        }
+    </style>
+</head>
+<body>
+    <div class="receipt">
+        <div class="header">
+            <h1>🚗 AutoParts Pro</h1>
+            <h2>SALES RECEIPT</h2>
+        </div>
+
+        <div class="details">
+            <p><strong>Receipt No:</strong> $receipt_number</p>
+            <p><strong>Date:</strong> $sale_date</p>
+            <p><strong>Customer:</strong> $customer</p>
+        </div>
+
+        <table>
+            <thead>
+                <tr>
+                    <th>Item</th>
+                    <th>Model</th>
+                    <th>Qty</th>
+                    <th>Price</th>
+                    <th>Total</th>
+                </tr>
+            </thead>
+            <tbody>
+$rows
+            </tbody>
+        </table>
+
+        <div class="total">
+            <p>GRAND TOTAL: <span style="color: green;">R$grand_total</span></p>
+        </div>
+
+        <div class="footer">
+            <p>Thank you for your business!</p>
+            <p>AutoParts Pro - Quality Auto Parts</p>
+            <p>Contact: info@autopartspro.co.za | Tel: +27 123 456 789</p>
+        </div>
+
+        <div class="no-print" style="margin-top: 20px; text-align: center;">
+            <p><em>Print this page (Ctrl+P) or save as PDF</em></p>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+_ROW = Template("""                <tr>
+                    <td>$name</td>
+                    <td>$model</td>
+                    <td>$qty</td>
+                    <td>R$price</td>
+                    <td>R$total</td>
+                </tr>""")
+
+
+def render_receipt(customer_name, items, grand_total, sale_date, receipt_number):
+    """Receipt for ``items`` (dicts with PartName, CarModel, Qty, Price, Total) as UTF-8 HTML bytes"""
+    rows = "\n".join(
+        _ROW.substitute(
+            name=html.escape(str(item['PartName'])),
+            model=html.escape(str(item['CarModel'])),
+            qty=int(item['Qty']),
+            price=f"{item['Price']:.2f}",
+            total=f"{item['Total']:.2f}",
+        )
+        for item in items
+    )
+    return _PAGE.substitute(
+        receipt_number=html.escape(str(receipt_number)),
+        sale_date=sale_date.strftime('%Y-%m-%d %H:%M:%S'),
+        customer=html.escape(str(customer_name)),
+        rows=rows,
+        grand_total=f"{grand_total:,.2f}",
+    ).encode('utf-8')
+
+
+def render_order(order):
+    """Reprint a stored ``sales.Order``"""
+    return render_receipt(order.customer, order.lines.to_dict('records'), order.total, order.order_date,
+                          order.receipt_number)
+
+
+def write_receipts_zip(engine, start_date, end_date, fileobj):
+    """Write one HTML receipt per order placed on ``start_date`` through ``end_date`` into a zip on ``fileobj``.
+
+    Orders are read and rendered a batch at a time, so memory stays bounded
+    however many receipts the range holds. Returns the number written.
+    """
+    count = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for order in sales.iter_orders(engine, start_date, end_date):
+            archive.writestr(f"receipt_{order.receipt_number}.html", render_order(order))
+            count += 1
+    return count
@@ -0,0 +1,256 @@
+"""Reorder points from each part's sales velocity.
+
+A part's velocity is the units it sold per day over the last
+``AUTOPARTS_REORDER_WINDOW`` days of the daily rollup. Its reorder point
+covers the demand expected over the supplier lead time, plus safety stock
+for the day-to-day swing in that demand:
+
+    reorder point = velocity * lead + z * stdev(daily units) * sqrt(lead)
+
+A part needs reordering once its stock is at or below that point, and is
+on watch while its days of cover are shorter than the lead time plus the
+review period. Parts that have not sold in the window have no reorder
+point and are never flagged, however little stock they hold.
+
+The window's units per part per day are kept in memory with running
+totals. A refresh re-reads only the days since the last one (normally
+just today) from the rollup, plus any days a ``rollup.rebuild()`` logged
+in RollupRebuilds since then, and the app's own checkouts add their lines
+through ``sale_recorded()`` as they commit, so sales made and rollups
+rebuilt by other processes show up within ``AUTOPARTS_REORDER_REFRESH``
+seconds.
+``plan()`` lines the totals up with the cached parts snapshot and works
+out every part at once with numpy; the result is cached until either
+changes.
+"""
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts import catalog
+from autoparts.config import get_settings
+from autoparts.db import get_engine
+from autoparts.metrics import read_frame
+from autoparts.schema import rollup_rebuilds, sales_daily_rollup
+
+REORDER = "reorder"
+WATCH = "watch"
+OK = "ok"
+NO_SALES = "no sales"
+
+_STATUSES = np.array([NO_SALES, REORDER, WATCH, OK], dtype=object)
+_EMPTY = pd.Series(dtype="float64")
+
+
+class Velocity:
+    """Units sold per part on each day of a rolling window, with running totals per part"""
+
+    def __init__(self, window, refresh):
+        self.window = window
+        self.refresh_every = refresh
+        self.version = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._days = {}
+        self._units = _EMPTY
+        self._squares = _EMPTY
+        self._loaded_through = None
+        self._rebuilt_through = 0
+        self._refreshed = None
+
+    def _replace_days(self, days):
+        """Swap the units per part of each of ``days`` (``{day: Series}``), adjusting the totals by the difference"""
+        old = [self._days.pop(day) for day in days if day in self._days]
+        new = [units for units in days.values() if len(units)]
+        self._days.update((day, units) for day, units in days.items() if len(units))
+        for values in (old, new):
+            if not values:
+                continue
+            stacked = pd.concat(values)
+            units = stacked.groupby(level=0).sum()
+            squares = (stacked ** 2).groupby(level=0).sum()
+            if values is old:
+                units, squares = -units, -squares
+            self._units = self._units.add(units, fill_value=0)
+            self._squares = self._squares.add(squares, fill_value=0)
+        self._units = self._units[self._units != 0]
+        self._squares = self._squares[self._squares != 0]
+
+    def refresh(self, engine, today=None):
+        """Drop days that left the window and re-read the days since the last refresh or rebuilt since then"""
+        today = today or date.today()
+        start = today - timedelta(days=self.window - 1)
+        with self._lock:
+            loaded_through, rebuilt_through = self._loaded_through, self._rebuilt_through
+        first = start if loaded_through is None else max(loaded_through, start)
+
+        log = rollup_rebuilds.c
+        with engine.connect() as conn:
+            rebuilds = conn.execute(
+                sa.select(log.RebuildID, log.StartDay, log.EndDay)
+                .where(log.RebuildID > rebuilt_through)
+                .order_by(log.RebuildID)
+            ).all()
+            if loaded_through is not None:
+                # rebuilds cover [StartDay, EndDay), or all time where either is NULL
+                first = min([first] + [
+                    max(r.StartDay or start, start) for r in rebuilds if r.EndDay is None or r.EndDay > start
+                ])
+            stmt = (
+                sa.select(sales_daily_rollup.c.SaleDay, sales_daily_rollup.c.PartID,
+                          sa.func.sum(sales_daily_rollup.c.Units).label("Units"))
+                .where(sales_daily_rollup.c.SaleDay >= first, sales_daily_rollup.c.SaleDay <= today)
+                .group_by(sales_daily_rollup.c.SaleDay, sales_daily_rollup.c.PartID)
+            )
+            fresh = read_frame(stmt, conn)
+        fresh["SaleDay"] = pd.to_datetime(fresh["SaleDay"]).dt.date
+        by_day = {
+            day: group.set_index("PartID")["Units"].astype("float64")
+            for day, group in fresh.groupby("SaleDay")
+        }
+
+        with self._lock:
+            days = {day: _EMPTY for day in self._days if day < start}
+            days.update(
+                (first + timedelta(days=n), by_day.get(first + timedelta(days=n), _EMPTY))
+                for n in range((today - first).days + 1)
+            )
+            self._replace_days(days)
+            self._loaded_through = today
+            self._rebuilt_through = rebuilds[-1].RebuildID if rebuilds else rebuilt_through
+            self._refreshed = time.monotonic()
+            self.version += 1
+
+    def current(self, engine):
+        """Refresh if the last refresh is older than ``refresh_every`` seconds; returns self"""
+        if self._refreshed is not None and time.monotonic() - self._refreshed < self.refresh_every:
+            return self
+        with self._refresh_lock:
+            if self._refreshed is None or time.monotonic() - self._refreshed >= self.refresh_every:
+                self.refresh(engine)
+        return self
+
+    def add(self, day, units):
+        """Count committed sales (``{PartID: units}``) on ``day``, if that day has been loaded"""
+        with self._lock:
+            if self._loaded_through is None or day > self._loaded_through:
+                return
+            if day <= self._loaded_through - timedelta(days=self.window):
+                return
+            sold = pd.Series(units, dtype="float64")
+            self._replace_days({day: self._days.get(day, _EMPTY).add(sold, fill_value=0)})
+            self.version += 1
+
+    def totals(self):
+        """``(version, units, squares)``: each part's units and sum of squared daily units in the window"""
+        with self._lock:
+            return self.version, self._units, self._squares
+
+
+_states = {}
+_states_lock = threading.Lock()
+_plans = {}
+
+
+def velocity(engine=None):
+    """The process-wide ``Velocity`` for ``engine``, refreshed if it is due"""
+    engine = engine or get_engine()
+    settings = get_settings()
+    with _states_lock:
+        state = _states.get(engine)
+        if state is None:
+            state = _states[engine] = Velocity(settings.reorder_window, settings.reorder_refresh)
+    return state.current(engine)
+
+
+def sale_recorded(sale_date, units):
+    """Record a committed sale (``{PartID: units}``) in every loaded velocity window"""
+    with _states_lock:
+        states = list(_states.values())
+    for state in states:
+        state.add(sale_date.date(), {int(part_id): qty for part_id, qty in units.items()})
+
+
+def invalidate():
+    """Forget the loaded windows, so the next ``plan()`` reads the whole window again"""
+    with _states_lock:
+        _states.clear()
+        _plans.clear()
+
+
+def compute(snapshot, units, squares, window, lead, review, z):
+    """Velocity, cover, reorder point and suggested order for every part in ``snapshot``.
+
+    ``units`` and ``squares`` are each part's units sold and sum of squared
+    daily units over the last ``window`` days, indexed by PartID.
+    """
+    part_ids = snapshot["PartID"].to_numpy()
+    stock = snapshot["StockQTY"].to_numpy(dtype="float64")
+    sold = units.reindex(part_ids, fill_value=0).to_numpy(dtype="float64")
+    sold_squared = squares.reindex(part_ids, fill_value=0).to_numpy(dtype="float64")
+
+    rate = sold / window
+    stdev = np.sqrt(np.maximum(sold_squared / window - rate ** 2, 0))
+    reorder_point = np.ceil(rate * lead + z * stdev * np.sqrt(lead))
+    # stock to hold after ordering: enough to last until the order after next arrives
+    target = np.ceil(rate * (lead + review) + z * stdev * np.sqrt(lead + review))
+    selling = rate > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(selling, stock / rate, np.inf)
+    needs = selling & (stock <= reorder_point)
+    order_qty = np.where(needs, np.maximum(target - stock, 0), 0)
+
+    frame = snapshot[["PartID", "PartName", "CarModel", "Supplier", "StockQTY"]].reset_index(drop=True)
+    frame["Velocity"] = rate.round(3)
+    frame["DaysOfCover"] = cover.round(1)
+    frame["ReorderPoint"] = np.where(selling, reorder_point, 0).astype("int64")
+    frame["OrderQty"] = order_qty.astype("int64")
+    frame["OrderCost"] = (order_qty * snapshot["CostPrice"].to_numpy(dtype="float64")).round(2)
+    status = np.select([~selling, needs, cover < lead + review], [0, 1, 2], 3)
+    frame["Status"] = _STATUSES[status]
+    return frame
+
+
+def plan(engine=None):
+    """One row per part with its velocity, cover, reorder point and status (treat as read-only)"""
+    engine = engine or get_engine()
+    settings = get_settings()
+    version, units, squares = velocity(engine).totals()
+    snapshot = catalog.parts_snapshot(engine)
+    cached = _plans.get(engine)
+    if cached is not None and cached[0] == version and cached[1] is snapshot:
+        return cached[2]
+    frame = compute(snapshot, units, squares, settings.reorder_window, settings.reorder_lead_days,
+                    settings.reorder_review_days, settings.reorder_service_z)
+    _plans[engine] = (version, snapshot, frame)
+    return frame
+
+
+def reorder_count(engine=None):
+    """Number of parts at or below their reorder point"""
+    return int((plan(engine)["Status"] == REORDER).sum())
+
+
+def reorder_ids(engine=None):
+    """PartIDs of the parts at or below their reorder point"""
+    frame = plan(engine)
+    return frame.loc[frame["Status"] == REORDER, "PartID"].astype(int).tolist()
+
+
+def reorder_list(engine=None, include_watch=False):
+    """Parts to reorder (and, with ``include_watch``, those on watch), fewest days of cover first"""
+    frame = plan(engine)
+    wanted = [REORDER, WATCH] if include_watch else [REORDER]
+    return frame[frame["Status"].isin(wanted)].sort_values(
+        ["DaysOfCover", "Velocity"], ascending=[True, False], kind="stable"
+    ).reset_index(drop=True)
+
+
+def statuses(engine, part_ids):
+    """Status of each of ``part_ids``, as a Series indexed by PartID"""
+    frame = plan(engine)
+    return frame.loc[frame["PartID"].isin(list(part_ids)), ["PartID", "Status"]].set_index("PartID")["Status"]
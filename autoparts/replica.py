@@ -0,0 +1,348 @@
+"""Columnar reporting replica: Parquet files queried through DuckDB.
+
+``sync()`` appends the Sales and SalesOrders rows past the highest SalesId
+and OrderID already copied as new Parquet chunks. It rewrites the
+SalesDailyRollup months those rows fall in, and those of every rollup
+rebuild logged in RollupRebuilds past the last one copied, and refreshes
+Parts and Customers. ``manifest.json`` lists the files of the current snapshot and is
+replaced atomically, so readers never see a half-written sync; files it no
+longer lists are deleted once they are ``GRACE`` seconds old.
+
+The replica engine exposes every dataset as a view named after its table,
+so the query functions in ``sales`` and ``reports`` run on it unchanged and
+reporting never takes locks on the tables the tills write to. Rows younger
+than ``AUTOPARTS_REPLICA_LAG`` seconds wait for the next sync, so the high
+water mark cannot move past a checkout that has not committed yet.
+
+    python -m autoparts.replica sync [--full]
+
+Needs the optional ``duckdb-engine`` and ``pyarrow`` packages.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts import metrics
+from autoparts.config import get_settings
+from autoparts.exports import arrow_schema
+from autoparts.schema import customers, parts, rollup_rebuilds, sales, sales_daily_rollup, sales_orders
+
+MANIFEST = "manifest.json"
+LOCK = "sync.lock"
+
+# rows per Parquet chunk written by one sync
+CHUNK_ROWS = 200_000
+# chunks a dataset may grow to before a sync merges them into one file
+COMPACT_AT = 32
+# seconds a superseded file is kept for queries that are still reading it
+GRACE = 600
+# seconds after which a sync lock is considered abandoned
+STALE_LOCK = 3600
+
+# append-only tables: (table, high-water key, timestamp column)
+_APPENDED = {
+    "sales": (sales, sales.c.SalesId, sales.c.SaleDate),
+    "orders": (sales_orders, sales_orders.c.OrderID, sales_orders.c.OrderDate),
+}
+_REFRESHED = {"parts": parts, "customers": customers}
+_TABLES = {"rollup": sales_daily_rollup, **_REFRESHED, **{name: spec[0] for name, spec in _APPENDED.items()}}
+
+
+class ReplicaBusy(Exception):
+    """Another process is already syncing the replica"""
+
+
+def _write(root, path, frame, table):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + ".tmp")
+    pq.write_table(pa.Table.from_pandas(frame, schema=arrow_schema(table.columns), preserve_index=False), partial)
+    os.replace(partial, target)
+    return path
+
+
+def _read_manifest(root):
+    try:
+        return json.loads((root / MANIFEST).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(root, manifest):
+    partial = root / f"{MANIFEST}.tmp"
+    partial.write_text(json.dumps(manifest, indent=1))
+    os.replace(partial, root / MANIFEST)
+
+
+def _paths(manifest, name):
+    files = manifest["files"].get(name, [])
+    return sorted(files.values()) if isinstance(files, dict) else list(files)
+
+
+@contextmanager
+def _sync_lock(root):
+    lock = root / LOCK
+    try:
+        if time.time() - lock.stat().st_mtime > STALE_LOCK:
+            lock.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        raise ReplicaBusy(f"{lock} exists; another sync is running") from None
+    try:
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+def _append(conn, root, name, high_water, cutoff, generation):
+    table, key, stamp = _APPENDED[name]
+    pending = key > high_water
+    # stop short of the first row that is too recent: an earlier key may still be uncommitted
+    upper = conn.execute(sa.select(sa.func.min(key)).where(pending, stamp >= cutoff)).scalar()
+    if upper is not None:
+        pending = sa.and_(pending, key < upper)
+
+    written, rows, span = [], 0, None
+    for frame in pd.read_sql(sa.select(table).where(pending).order_by(key), conn, chunksize=CHUNK_ROWS):
+        if frame.empty:
+            continue
+        first, last = int(frame[key.name].iloc[0]), int(frame[key.name].iloc[-1])
+        written.append(_write(root, f"{name}/{first:012d}-{last:012d}.g{generation}.parquet", frame, table))
+        high_water = last
+        rows += len(frame)
+        earliest, latest = frame[stamp.name].min(), frame[stamp.name].max()
+        span = (earliest, latest) if span is None else (min(span[0], earliest), max(span[1], latest))
+    return written, rows, high_water, span
+
+
+def _compact(root, name, chunks, generation):
+    if len(chunks) < COMPACT_AT:
+        return chunks
+    import duckdb
+
+    first = Path(chunks[0]).name.split("-")[0]
+    last = Path(chunks[-1]).name.split("-")[1].split(".")[0]
+    merged = f"{name}/{first}-{last}.g{generation}.parquet"
+    partial = root / f"{merged}.tmp"
+    key = _APPENDED[name][1].name
+    listing = ", ".join(_quote(root / path) for path in chunks)
+    with duckdb.connect() as con:
+        con.execute(f"COPY (SELECT * FROM read_parquet([{listing}]) ORDER BY {key}) TO {_quote(partial)} (FORMAT parquet)")
+    os.replace(partial, root / merged)
+    return [merged]
+
+
+def _months(first, last):
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        following = (month + timedelta(days=32)).replace(day=1)
+        yield month, following
+        month = following
+
+
+def _refresh_rollup(conn, root, rollup_files, span, rebuilt_through, generation):
+    """Rewrite the rollup months of ``span`` and of the rebuilds past ``rebuilt_through``.
+
+    A replica that has no rollup yet, has not tracked rebuilds before
+    (``rebuilt_through`` is ``None``) or follows a rebuild of all time gets
+    every month again. Returns the files by month and the last RebuildID seen.
+    """
+    day = sales_daily_rollup.c.SaleDay
+    log = rollup_rebuilds.c
+    rebuilds = conn.execute(
+        sa.select(log.RebuildID, log.StartDay, log.EndDay)
+        .where(log.RebuildID > (rebuilt_through or 0))
+        .order_by(log.RebuildID)
+    ).all()
+    last_rebuild = rebuilds[-1].RebuildID if rebuilds else rebuilt_through or 0
+
+    spans = [] if span is None else [tuple(pd.Timestamp(value).date() for value in span)]
+    if not rollup_files or rebuilt_through is None or any(r.StartDay is None or r.EndDay is None for r in rebuilds):
+        rollup_files = {}
+        spans = [conn.execute(sa.select(sa.func.min(day), sa.func.max(day))).one()]
+        if spans[0][0] is None:
+            return rollup_files, last_rebuild
+    else:
+        rollup_files = dict(rollup_files)
+        # rebuilds cover [StartDay, EndDay)
+        spans += [(r.StartDay, r.EndDay - timedelta(days=1)) for r in rebuilds if r.EndDay > r.StartDay]
+
+    months = sorted({month for first, last in spans for month in _months(first, last)})
+    for start, end in months:
+        frame = pd.read_sql(sa.select(sales_daily_rollup).where(day >= start, day < end), conn)
+        month = f"{start:%Y-%m}"
+        if frame.empty:
+            rollup_files.pop(month, None)
+        else:
+            rollup_files[month] = _write(root, f"rollup/{month}.g{generation}.parquet", frame, sales_daily_rollup)
+    return rollup_files, last_rebuild
+
+
+def _write_schemas(root):
+    # zero-row files that stand in for datasets with nothing copied yet
+    for table in _TABLES.values():
+        if not (root / _schema_path(table)).exists():
+            _write(root, _schema_path(table), pd.DataFrame(columns=table.columns.keys()), table)
+
+
+def _schema_path(table):
+    return f"_schema/{table.name}.parquet"
+
+
+def _remove_superseded(root, manifest):
+    current = {path for name in _TABLES for path in _paths(manifest, name)}
+    cutoff = time.time() - GRACE
+    for name in _TABLES:
+        for file in (root / name).glob("*"):
+            if file.relative_to(root).as_posix() not in current and file.stat().st_mtime < cutoff:
+                file.unlink(missing_ok=True)
+
+
+def sync(engine, root=None, full=False):
+    """Bring the replica in ``root`` (default ``AUTOPARTS_REPLICA_DIR``) up to date with ``engine``.
+
+    ``full`` discards the current snapshot and copies everything again.
+    Raises ``ReplicaBusy`` if another process is syncing the same directory.
+    Returns ``{dataset: rows copied}``.
+    """
+    settings = get_settings()
+    root = Path(root or settings.replica_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    with _sync_lock(root):
+        previous = None if full else _read_manifest(root)
+        manifest = previous or {"generation": 0, "high_water": {name: 0 for name in _APPENDED},
+                                "files": {name: [] for name in _APPENDED}}
+        generation = manifest["generation"] + 1
+        cutoff = datetime.now() - timedelta(seconds=settings.replica_lag)
+        copied = {}
+        with engine.connect() as conn:
+            spans = {}
+            for name in _APPENDED:
+                written, copied[name], manifest["high_water"][name], spans[name] = _append(
+                    conn, root, name, manifest["high_water"][name], cutoff, generation,
+                )
+                manifest["files"][name] = _compact(root, name, manifest["files"][name] + written, generation)
+
+            manifest["files"]["rollup"], manifest["high_water"]["rollup"] = _refresh_rollup(
+                conn, root, manifest["files"].get("rollup", {}), spans["sales"],
+                manifest["high_water"].get("rollup"), generation,
+            )
+            for name, table in _REFRESHED.items():
+                frame = pd.read_sql(sa.select(table), conn)
+                manifest["files"][name] = [_write(root, f"{name}/g{generation}.parquet", frame, table)]
+                copied[name] = len(frame)
+
+        _write_schemas(root)
+        manifest["generation"] = generation
+        manifest["synced_at"] = datetime.now().isoformat(timespec="seconds")
+        _write_manifest(root, manifest)
+        _remove_superseded(root, manifest)
+    return copied
+
+
+def _quote(path):
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+@lru_cache(maxsize=None)
+def replica_engine(root):
+    """DuckDB engine over the replica in ``root``, with one view per replicated table.
+
+    Each connection builds its views from the manifest current at the time,
+    so a query always sees one complete snapshot.
+    """
+    root = Path(root)
+
+    def create_views(dbapi_conn, _record):
+        manifest = _read_manifest(root)
+        cursor = dbapi_conn.cursor()
+        for name, table in _TABLES.items():
+            paths = _paths(manifest, name) or [_schema_path(table)]
+            listing = ", ".join(_quote(root / path) for path in paths)
+            cursor.execute(f'CREATE VIEW "{table.name}" AS SELECT * FROM read_parquet([{listing}])')
+        cursor.close()
+
+    engine = sa.create_engine("duckdb:///:memory:", poolclass=sa.pool.NullPool)
+    sa.event.listen(engine, "connect", create_views)
+    return metrics.instrument(engine)
+
+
+_refreshing = threading.Lock()
+
+
+def _refresh_in_background(engine, root):
+    if not _refreshing.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            sync(engine, root)
+        except ReplicaBusy:
+            pass
+        finally:
+            _refreshing.release()
+
+    threading.Thread(target=run, name="replica-sync", daemon=True).start()
+
+
+def synced_at(root=None):
+    """When the replica was last synced, or ``None`` if it never has been"""
+    manifest = _read_manifest(Path(root or get_settings().replica_dir))
+    return datetime.fromisoformat(manifest["synced_at"]) if manifest else None
+
+
+def reporting_engine(engine):
+    """The engine the reporting pages should query.
+
+    That is the replica when ``AUTOPARTS_REPLICA_DIR`` is set and has been
+    synced, otherwise ``engine`` itself. A replica older than
+    ``AUTOPARTS_REPLICA_REFRESH`` seconds is synced again in the background.
+    """
+    settings = get_settings()
+    if not settings.replica_dir:
+        return engine
+    last_sync = synced_at(settings.replica_dir)
+    if last_sync is None or datetime.now() - last_sync > timedelta(seconds=settings.replica_refresh):
+        _refresh_in_background(engine, settings.replica_dir)
+    if last_sync is None:
+        return engine
+    return replica_engine(str(Path(settings.replica_dir).resolve()))
+
+
+def main(argv=None):
+    from autoparts.db import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.replica", description="Maintain the reporting replica")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_cmd = commands.add_parser("sync", help="copy new rows into the replica")
+    sync_cmd.add_argument("--dir", help="replica directory (default: AUTOPARTS_REPLICA_DIR)")
+    sync_cmd.add_argument("--full", action="store_true", help="copy everything again instead of only new rows")
+    args = parser.parse_args(argv)
+
+    root = args.dir or get_settings().replica_dir
+    if not root:
+        parser.error("set AUTOPARTS_REPLICA_DIR or pass --dir")
+    try:
+        copied = sync(get_engine(), root, full=args.full)
+    except ReplicaBusy as e:
+        parser.exit(1, f"{e}\n")
+    print(", ".join(f"{name}: {rows}" for name, rows in copied.items()))
+
+
+if __name__ == "__main__":
+    main()
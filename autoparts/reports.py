@@ -0,0 +1,95 @@
+"""Monthly Report and Customer Analytics, read from the daily sales rollup."""
+from datetime import date, timedelta
+
+import numpy as np
+import sqlalchemy as sa
+
+from autoparts import filters
+from autoparts.metrics import read_frame
+from autoparts.schema import customers, parts, sales_daily_rollup
+
+PERIODS = ["Current Month", "Last Month", "Last 30 Days", "All Time", "Custom Range"]
+MONTHS = [f"{m:02d}" for m in range(1, 13)]
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def period_range(period, year=None, custom_start=None, custom_end=None, today=None):
+    """Half-open ``(start, end)`` days for a report period; ``(None, None)`` is all time.
+
+    ``period`` is one of ``PERIODS`` or a month number from ``MONTHS`` (of
+    ``year``). A custom range includes both of its end days.
+    """
+    today = today or date.today()
+    if period == "Current Month":
+        return _month_start(today), _next_month(today)
+    if period == "Last Month":
+        last_month = _month_start(today) - timedelta(days=1)
+        return _month_start(last_month), _month_start(today)
+    if period == "Last 30 Days":
+        # today and the 29 days before it
+        return today - timedelta(days=29), today + timedelta(days=1)
+    if period == "Custom Range":
+        return custom_start, custom_end + timedelta(days=1)
+    if period in MONTHS:
+        first = date(year or today.year, int(period), 1)
+        return first, _next_month(first)
+    return None, None
+
+
+def profit_export(start=None, end=None):
+    """Select of units, revenue and cost per part for [start, end); ``add_margins`` completes each chunk"""
+    r = sales_daily_rollup.c
+    return (
+        sa.select(
+            parts.c.PartName,
+            parts.c.CarModel,
+            sa.func.sum(r.Units).label("Units_Sold"),
+            sa.func.sum(r.Revenue).label("Total_Revenue"),
+            sa.func.sum(r.Cost).label("Total_Cost"),
+        )
+        .join_from(sales_daily_rollup, parts, r.PartID == parts.c.PartID)
+        .where(*filters.between(r.SaleDay, start, end))
+        .group_by(parts.c.PartName, parts.c.CarModel)
+        .order_by(sa.desc("Total_Revenue"))
+    )
+
+
+def add_margins(df):
+    """Add Gross_Profit and Margin_% to profit report rows, in place; returns ``df``"""
+    df['Gross_Profit'] = df['Total_Revenue'] - df['Total_Cost']
+    revenue = df['Total_Revenue'].to_numpy(dtype=float)
+    profit = df['Gross_Profit'].to_numpy(dtype=float)
+    df['Margin_%'] = np.divide(profit * 100, revenue, out=np.zeros_like(revenue), where=revenue > 0)
+    return df
+
+
+def profit_report(engine, start=None, end=None):
+    """Units, revenue, cost, gross profit and margin per part for [start, end)"""
+    with engine.connect() as conn:
+        return add_margins(read_frame(profit_export(start, end), conn))
+
+
+def customer_analytics(engine):
+    """Purchase count, total and average spend per customer, biggest spenders first"""
+    r = sales_daily_rollup.c
+    total_spent = sa.func.sum(r.Revenue)
+    stmt = (
+        sa.select(
+            customers.c.FullName,
+            sa.func.coalesce(sa.func.sum(r.Lines), 0).label("PurchaseCount"),
+            total_spent.label("TotalSpent"),
+            (total_spent / sa.func.sum(r.Lines)).label("AvgPurchase"),
+        )
+        .join_from(customers, sales_daily_rollup, customers.c.CustomerID == r.CustomerID, isouter=True)
+        .group_by(customers.c.CustomerID, customers.c.FullName)
+        .order_by(sa.desc("TotalSpent"))
+    )
+    with engine.connect() as conn:
+        return read_frame(stmt, conn)
@@ -0,0 +1,145 @@
+"""Daily sales rollup keyed by (SaleDay, PartID, CustomerID).
+
+Checkout adds each sale to the rollup inside its own transaction, so the
+reports can aggregate days instead of every Sales row. ``rebuild()``
+recomputes a date range (or everything) from Sales; the schema migrations
+backfill an empty rollup, so run it by hand only after editing Sales:
+
+    python -m autoparts.rollup rebuild [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+import argparse
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from autoparts import filters
+from autoparts.schema import parts, rollup_rebuilds, sales, sales_daily_rollup
+
+_KEY = ["SaleDay", "PartID", "CustomerID"]
+_MEASURES = ["Lines", "Units", "Revenue", "Cost"]
+
+
+class sale_day(FunctionElement):
+    """The calendar day of a DATETIME expression"""
+    type = sa.Date()
+    inherit_cache = True
+
+
+@compiles(sale_day)
+def _sale_day_default(element, compiler, **kw):
+    return f"CAST({compiler.process(element.clauses, **kw)} AS DATE)"
+
+
+@compiles(sale_day, "sqlite")
+def _sale_day_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)})"
+
+
+_MSSQL_MERGE = sa.text("""
+    MERGE SalesDailyRollup WITH (HOLDLOCK) AS t
+    USING (SELECT :SaleDay AS SaleDay, :PartID AS PartID, :CustomerID AS CustomerID,
+                  :Lines AS Lines, :Units AS Units, :Revenue AS Revenue, :Cost AS Cost) AS s
+    ON t.SaleDay = s.SaleDay AND t.PartID = s.PartID AND t.CustomerID = s.CustomerID
+    WHEN MATCHED THEN UPDATE SET
+        Lines = t.Lines + s.Lines, Units = t.Units + s.Units,
+        Revenue = t.Revenue + s.Revenue, Cost = t.Cost + s.Cost
+    WHEN NOT MATCHED THEN INSERT (SaleDay, PartID, CustomerID, Lines, Units, Revenue, Cost)
+        VALUES (s.SaleDay, s.PartID, s.CustomerID, s.Lines, s.Units, s.Revenue, s.Cost);
+""")
+
+
+def _upsert(conn, rows):
+    dialect = conn.dialect.name
+    if dialect == "mssql":
+        conn.execute(_MSSQL_MERGE, rows)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(sales_daily_rollup)
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=_KEY,
+                set_={name: sales_daily_rollup.c[name] + stmt.excluded[name] for name in _MEASURES},
+            ),
+            rows,
+        )
+    else:
+        for row in rows:
+            key = [sales_daily_rollup.c[name] == row[name] for name in _KEY]
+            updated = conn.execute(
+                sales_daily_rollup.update().where(*key).values(
+                    {name: sales_daily_rollup.c[name] + row[name] for name in _MEASURES}
+                )
+            )
+            if updated.rowcount == 0:
+                conn.execute(sales_daily_rollup.insert(), row)
+
+
+def record_sale(conn, sale_date, customer_id, lines):
+    """Add one sale to the rollup, inside the checkout transaction.
+
+    ``lines`` maps PartID to a ``(lines, units, revenue, cost)`` tuple.
+    """
+    rows = [
+        {
+            "SaleDay": sale_date.date(), "PartID": part_id, "CustomerID": int(customer_id),
+            "Lines": n_lines, "Units": units, "Revenue": round(revenue, 2), "Cost": round(cost, 2),
+        }
+        for part_id, (n_lines, units, revenue, cost) in sorted(lines.items())
+    ]
+    _upsert(conn, rows)
+
+
+def rebuild(conn, start_date=None, end_date=None, record=True):
+    """Recompute the rollup from Sales for [start_date, end_date), or for all time.
+
+    Runs inside the caller's transaction. Cost is valued at the parts'
+    current CostPrice, since Sales does not keep the cost at the time of
+    sale. With ``record``, the range is logged in RollupRebuilds so the
+    reporting replica copies those days again. Returns the number of rollup
+    rows written.
+    """
+    day = sale_day(sales.c.SaleDate)
+    in_range = filters.between(sales.c.SaleDate, start_date, end_date)
+
+    summary = (
+        sa.select(
+            day,
+            sales.c.PartsID,
+            sales.c.CustomerID,
+            sa.func.count(),
+            sa.func.sum(sales.c.QuantitySold),
+            sa.func.sum(sales.c.TotalAmount),
+            sa.func.sum(sales.c.QuantitySold * parts.c.CostPrice),
+        )
+        .join_from(sales, parts, sales.c.PartsID == parts.c.PartID)
+        .where(*in_range)
+        .group_by(day, sales.c.PartsID, sales.c.CustomerID)
+    )
+    clear = filters.between(sales_daily_rollup.c.SaleDay, start_date, end_date)
+
+    conn.execute(sales_daily_rollup.delete().where(*clear))
+    if record:
+        conn.execute(rollup_rebuilds.insert().values(StartDay=start_date, EndDay=end_date, RebuiltAt=datetime.now()))
+    return conn.execute(sales_daily_rollup.insert().from_select(_KEY + _MEASURES, summary)).rowcount
+
+
+def main(argv=None):
+    from autoparts.db import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.rollup", description="Maintain the daily sales rollup")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = commands.add_parser("rebuild", help="recompute the rollup from Sales")
+    rebuild_cmd.add_argument("--start", type=date.fromisoformat, help="first day to rebuild (default: all time)")
+    rebuild_cmd.add_argument("--end", type=date.fromisoformat, help="day after the last one to rebuild")
+    args = parser.parse_args(argv)
+
+    with get_engine().begin() as conn:
+        rows = rebuild(conn, args.start, args.end)
+    print(f"Rebuilt {rows} rollup rows")
+
+
+if __name__ == "__main__":
+    main()
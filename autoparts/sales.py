@@ -0,0 +1,225 @@
+"""Checkout, orders and the Transaction History queries."""
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts import catalog, filters, holds, reorder, rollup, search
+from autoparts.inventory import apply_stock_deltas
+from autoparts.metrics import read_frame
+from autoparts.pagination import PAGE_SIZES, fetch_page
+from autoparts.schema import customers, parts, sales, sales_orders, stock_holds
+
+HISTORY_KEYS = [(sales.c.SaleDate, True), (sales.c.SalesId, True)]
+
+
+def _history_select(*columns, with_receipts=False):
+    source = (
+        sales
+        .join(customers, sales.c.CustomerID == customers.c.CustomerID)
+        .join(parts, sales.c.PartsID == parts.c.PartID)
+    )
+    if with_receipts:
+        source = source.outerjoin(sales_orders, sales.c.OrderID == sales_orders.c.OrderID)
+    return sa.select(*columns).select_from(source)
+
+
+def history_filters(start_date, end_date, search_term=""):
+    """WHERE conditions for sales made on ``start_date`` through ``end_date``"""
+    conditions = filters.on_days(sales.c.SaleDate, start_date, end_date)
+    if search_term:
+        conditions.append(filters.contains(search_term, customers.c.FullName, parts.c.PartName))
+    return conditions
+
+
+def _history_columns():
+    return [
+        sales.c.SalesId,
+        sales.c.SaleDate,
+        sales_orders.c.ReceiptNumber,
+        customers.c.FullName.label("Customer"),
+        parts.c.PartName,
+        parts.c.CarModel,
+        sales.c.QuantitySold,
+        sales.c.TotalAmount,
+    ]
+
+
+def history_page(engine, conditions, after=None, page_size=PAGE_SIZES[1]):
+    """One page of sales lines, newest first"""
+    with engine.connect() as conn:
+        stmt = _history_select(*_history_columns(), with_receipts=True).where(*conditions)
+        return fetch_page(conn, stmt, HISTORY_KEYS, after, page_size)
+
+
+def history_kpis(engine, conditions):
+    """TotalSales, Transactions and AverageSale over every matching sales line, in one aggregate row"""
+    stmt = _history_select(
+        sa.func.coalesce(sa.func.sum(sales.c.TotalAmount), 0).label("TotalSales"),
+        sa.func.count().label("Transactions"),
+    ).where(*conditions)
+    with engine.connect() as conn:
+        kpis = dict(conn.execute(stmt).one()._mapping)
+    kpis["AverageSale"] = kpis["TotalSales"] / kpis["Transactions"] if kpis["Transactions"] else 0
+    return kpis
+
+
+def history_export(conditions):
+    """Select of every matching sales line (for exports), newest first"""
+    return (
+        _history_select(*_history_columns(), with_receipts=True)
+        .where(*conditions)
+        .order_by(sales.c.SaleDate.desc(), sales.c.SalesId.desc())
+    )
+
+
+def history_frame(engine, conditions):
+    """Every matching sales line, newest first"""
+    with engine.connect() as conn:
+        return read_frame(history_export(conditions), conn)
+
+
+def record_checkout(conn, customer_id, cart, sale_date, receipt_number, hold_token=None):
+    """Write a sale of ``cart`` lines (PartID, Qty, Total) on ``conn``; returns ``(order_id, units sold per PartID)``.
+
+    Writes a SalesOrders header for ``receipt_number``, decrements stock for
+    every part with a single guarded UPDATE, inserts the Sales lines as one
+    batch and adds the sale to the daily rollup, so the round trips (and the
+    time row locks are held) do not grow with the cart. The guard leaves the
+    units other carts hold, and the holds of ``hold_token`` (the cart's own)
+    are released with the sale. Raises ``InsufficientStockError`` if any
+    part is short. The caller commits, then calls ``checkout_committed()``.
+    """
+    sold = Counter()
+    line_counts = Counter()
+    revenue = Counter()
+    for item in cart:
+        part_id = int(item['PartID'])
+        sold[part_id] += int(item['Qty'])
+        line_counts[part_id] += 1
+        revenue[part_id] += float(item['Total'])
+    total = round(sum(revenue.values()), 2)
+
+    order_id = conn.execute(
+        sales_orders.insert().values(
+            ReceiptNumber=receipt_number, CustomerID=int(customer_id), OrderDate=sale_date, TotalAmount=total,
+        )
+    ).inserted_primary_key[0]
+    costs = apply_stock_deltas(conn, {part_id: -qty for part_id, qty in sold.items()},
+                               floor=holds.held_by_others(hold_token, datetime.now()))
+    conn.execute(sales.insert(), [
+        {
+            "OrderID": order_id,
+            "CustomerID": int(customer_id),
+            "PartsID": int(item['PartID']),
+            "QuantitySold": int(item['Qty']),
+            "TotalAmount": float(item['Total']),
+            "SaleDate": sale_date,
+        }
+        for item in cart
+    ])
+    rollup.record_sale(conn, sale_date, customer_id, {
+        part_id: (line_counts[part_id], qty, revenue[part_id], qty * float(costs[part_id]))
+        for part_id, qty in sold.items()
+    })
+    if hold_token is not None:
+        conn.execute(stock_holds.delete().where(stock_holds.c.HoldToken == hold_token))
+    return order_id, sold
+
+
+def checkout_committed(sale_date, sold):
+    """Bring the in-process caches up to date with a committed sale (``sold``: units per PartID)"""
+    catalog.invalidate(catalog.PARTS, catalog.HOLDS)
+    for part_id, qty in sold.items():
+        search.stock_changed(part_id, -qty)
+    reorder.sale_recorded(sale_date, sold)
+
+
+def checkout(engine, customer_id, cart, sale_date, receipt_number, hold_token=None):
+    """Record a sale of ``cart`` lines (PartID, Qty, Total) in one short transaction.
+
+    See ``record_checkout()``. Raises ``InsufficientStockError`` and changes
+    nothing if any part is short. Returns the new OrderID.
+    """
+    with engine.begin() as conn:
+        order_id, sold = record_checkout(conn, customer_id, cart, sale_date, receipt_number, hold_token)
+    checkout_committed(sale_date, sold)
+    return order_id
+
+
+@dataclass
+class Order:
+    order_id: int
+    receipt_number: str
+    customer: str
+    order_date: datetime
+    total: float
+    lines: pd.DataFrame
+
+
+ORDER_BATCH = 500
+
+
+def _order_lines(conn, order_ids):
+    stmt = (
+        sa.select(
+            sales.c.OrderID,
+            parts.c.PartName,
+            parts.c.CarModel,
+            sales.c.QuantitySold.label("Qty"),
+            (sales.c.TotalAmount / sales.c.QuantitySold).label("Price"),
+            sales.c.TotalAmount.label("Total"),
+        )
+        .join_from(sales, parts, sales.c.PartsID == parts.c.PartID)
+        .where(sales.c.OrderID.in_(order_ids))
+        .order_by(sales.c.OrderID, sales.c.SalesId)
+    )
+    lines = read_frame(stmt, conn)
+    return {order_id: group.drop(columns="OrderID") for order_id, group in lines.groupby("OrderID")}
+
+
+def _order_select():
+    return sa.select(sales_orders, customers.c.FullName).join_from(
+        sales_orders, customers, sales_orders.c.CustomerID == customers.c.CustomerID
+    )
+
+
+def _order(header, lines):
+    return Order(header.OrderID, header.ReceiptNumber, header.FullName, header.OrderDate, header.TotalAmount,
+                 lines.reset_index(drop=True))
+
+
+def find_order(engine, receipt_number):
+    """The order issued under ``receipt_number`` with its lines, or ``None``"""
+    with engine.connect() as conn:
+        header = conn.execute(_order_select().where(sales_orders.c.ReceiptNumber == receipt_number)).one_or_none()
+        if header is None:
+            return None
+        lines = _order_lines(conn, [header.OrderID])
+    return _order(header, lines.get(header.OrderID, pd.DataFrame()))
+
+
+def iter_orders(engine, start_date, end_date, batch_size=ORDER_BATCH):
+    """Orders placed on ``start_date`` through ``end_date``, oldest first.
+
+    Headers and their lines are fetched ``batch_size`` orders at a time
+    (two queries per batch), so callers can stream any range.
+    """
+    in_range = filters.on_days(sales_orders.c.OrderDate, start_date, end_date)
+    last_id = 0
+    while True:
+        with engine.connect() as conn:
+            headers = conn.execute(
+                _order_select()
+                .where(*in_range, sales_orders.c.OrderID > last_id)
+                .order_by(sales_orders.c.OrderID)
+                .limit(batch_size)
+            ).all()
+            if not headers:
+                return
+            lines = _order_lines(conn, [header.OrderID for header in headers])
+        for header in headers:
+            yield _order(header, lines.get(header.OrderID, pd.DataFrame()))
+        last_id = headers[-1].OrderID
@@ -0,0 +1,114 @@
+"""Table definitions shared by the app and the SQLite stand-in."""
+import sqlalchemy as sa
+
+metadata = sa.MetaData()
+
+Money = sa.Numeric(12, 2, asdecimal=False)
+
+parts = sa.Table(
+    "Parts", metadata,
+    sa.Column("PartID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("PartName", sa.String(200), nullable=False),
+    sa.Column("CarModel", sa.String(100), nullable=False),
+    sa.Column("Price", Money, nullable=False),
+    sa.Column("CostPrice", Money, nullable=False),
+    sa.Column("StockQTY", sa.Integer, nullable=False, default=0),
+    sa.Column("Supplier", sa.String(200)),
+    # bumped by every stock movement and hold, for optimistic checks
+    sa.Column("StockVersion", sa.Integer, nullable=False, server_default="0"),
+    sa.Index("IX_Parts_StockQTY", "StockQTY"),
+    sa.Index("UQ_Parts_PartName_CarModel_Supplier", "PartName", "CarModel", "Supplier", unique=True),
+)
+
+customers = sa.Table(
+    "Customers", metadata,
+    sa.Column("CustomerID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("FullName", sa.String(200), nullable=False),
+    sa.Column("Email", sa.String(200)),
+    sa.Column("Phone", sa.String(50)),
+    sa.Column("CreatedDate", sa.DateTime),
+    sa.Index("IX_Customers_FullName", "FullName"),
+)
+
+sales_orders = sa.Table(
+    "SalesOrders", metadata,
+    sa.Column("OrderID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("ReceiptNumber", sa.String(32), nullable=False, unique=True),
+    sa.Column("CustomerID", sa.Integer, sa.ForeignKey("Customers.CustomerID"), nullable=False),
+    sa.Column("OrderDate", sa.DateTime, nullable=False),
+    sa.Column("TotalAmount", Money, nullable=False),
+    sa.Index("IX_SalesOrders_OrderDate", "OrderDate"),
+)
+
+sales = sa.Table(
+    "Sales", metadata,
+    sa.Column("SalesId", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("CustomerID", sa.Integer, sa.ForeignKey("Customers.CustomerID"), nullable=False),
+    sa.Column("PartsID", sa.Integer, sa.ForeignKey("Parts.PartID"), nullable=False),
+    sa.Column("QuantitySold", sa.Integer, nullable=False),
+    sa.Column("TotalAmount", Money, nullable=False),
+    sa.Column("SaleDate", sa.DateTime, nullable=False),
+    sa.Column("OrderID", sa.Integer, sa.ForeignKey("SalesOrders.OrderID")),
+    sa.Index("IX_Sales_OrderID", "OrderID"),
+    sa.Index("IX_Sales_SaleDate", "SaleDate"),
+    sa.Index("IX_Sales_CustomerID", "CustomerID"),
+    sa.Index("IX_Sales_PartsID", "PartsID"),
+)
+
+receipt_counters = sa.Table(
+    "ReceiptCounters", metadata,
+    sa.Column("Name", sa.String(50), primary_key=True),
+    sa.Column("NextValue", sa.BigInteger, nullable=False),
+)
+
+sales_daily_rollup = sa.Table(
+    "SalesDailyRollup", metadata,
+    sa.Column("SaleDay", sa.Date, primary_key=True),
+    sa.Column("PartID", sa.Integer, primary_key=True),
+    sa.Column("CustomerID", sa.Integer, primary_key=True),
+    sa.Column("Lines", sa.Integer, nullable=False),
+    sa.Column("Units", sa.Integer, nullable=False),
+    sa.Column("Revenue", Money, nullable=False),
+    sa.Column("Cost", Money, nullable=False),
+    sa.Index("IX_SalesDailyRollup_CustomerID", "CustomerID"),
+)
+
+# one row per rollup.rebuild(), so the reporting replica knows which months to copy again
+rollup_rebuilds = sa.Table(
+    "RollupRebuilds", metadata,
+    sa.Column("RebuildID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("StartDay", sa.Date),
+    sa.Column("EndDay", sa.Date),
+    sa.Column("RebuiltAt", sa.DateTime, nullable=False),
+)
+
+stock_holds = sa.Table(
+    "StockHolds", metadata,
+    sa.Column("HoldID", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("HoldToken", sa.String(32), nullable=False),
+    sa.Column("PartID", sa.Integer, sa.ForeignKey("Parts.PartID"), nullable=False),
+    sa.Column("Qty", sa.Integer, nullable=False),
+    sa.Column("ExpiresAt", sa.DateTime, nullable=False),
+    sa.Index("IX_StockHolds_PartID", "PartID", "ExpiresAt"),
+    sa.Index("UQ_StockHolds_HoldToken_PartID", "HoldToken", "PartID", unique=True),
+)
+
+parts_staging = sa.Table(
+    "PartsStaging", metadata,
+    sa.Column("BatchID", sa.String(32), primary_key=True),
+    sa.Column("RowNo", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("PartName", sa.String(200), nullable=False),
+    sa.Column("CarModel", sa.String(100), nullable=False),
+    sa.Column("Supplier", sa.String(200)),
+    sa.Column("CostPrice", Money, nullable=False),
+    sa.Column("Price", Money),
+    sa.Column("MarkupPct", sa.Numeric(7, 2, asdecimal=False), nullable=False),
+    sa.Index("IX_PartsStaging_Part", "BatchID", "PartName", "CarModel", "RowNo"),
+)
+
+schema_version = sa.Table(
+    "SchemaVersion", metadata,
+    sa.Column("Version", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("Description", sa.String(200), nullable=False),
+    sa.Column("AppliedAt", sa.DateTime, nullable=False),
+)
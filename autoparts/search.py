@@ -0,0 +1,225 @@
+"""In-memory part search over PartName and CarModel.
+
+Every word of a query must be the start of a word in the part name (or car
+model), so "brak pol" finds "Brake Pad" for "VW Polo". Words are kept in one
+sorted array, so each query word is a binary search plus a slice, and
+ranking is vectorised over the catalog with numpy.
+
+The index is built from the cached parts snapshot and kept current by the
+app's own writes through ``part_added()`` and ``stock_changed()``. It is
+rebuilt from the database every ``AUTOPARTS_SEARCH_INDEX_TTL`` seconds to
+pick up writes made by other processes.
+"""
+import bisect
+import re
+import sys
+import threading
+
+import numpy as np
+
+from autoparts import catalog
+from autoparts.cache import TTLCache
+from autoparts.config import get_settings
+from autoparts.db import get_engine
+
+DEFAULT_LIMIT = 200
+
+NAME = "name"
+NAME_AND_MODEL = "name_and_model"
+
+_WORD = re.compile(r"\w+")
+_NAME, _MODEL = 0, 1
+# score for a query word matching a whole word / the start of a word
+_WEIGHTS = {(_NAME, True): 6, (_NAME, False): 4, (_MODEL, True): 3, (_MODEL, False): 2}
+
+
+def _words(text):
+    return [sys.intern(word) for word in _WORD.findall(str(text).lower())]
+
+
+def _prefix_end(term):
+    return term[:-1] + chr(ord(term[-1]) + 1)
+
+
+class PartSearchIndex:
+    def __init__(self, part_ids=(), names=(), models=(), stock=()):
+        self._lock = threading.RLock()
+        self._part_ids = np.asarray(part_ids, dtype=np.int64)
+        self._stock = np.asarray(stock, dtype=np.int64)
+        self._name_len = np.array([len(str(name)) for name in names], dtype=np.int64)
+        self._alive = np.ones(len(self._part_ids), dtype=bool)
+        self._model_codes = {}
+        self._model = np.array([self._model_code(model) for model in models], dtype=np.int64)
+        self._pos = {int(part_id): pos for pos, part_id in enumerate(self._part_ids)}
+        self._doc_words = []
+
+        entries = []
+        for pos, (name, model) in enumerate(zip(names, models)):
+            name_words, model_words = _words(name), _words(model)
+            self._doc_words.append((name_words, model_words))
+            entries.extend((word, _NAME, pos) for word in name_words)
+            entries.extend((word, _MODEL, pos) for word in model_words)
+        entries.sort()
+        self._words = [word for word, _, _ in entries]
+        self._fields = np.array([field for _, field, _ in entries], dtype=np.int8)
+        self._docs = np.array([pos for _, _, pos in entries], dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a frame with PartID, PartName, CarModel and StockQTY columns"""
+        return cls(df['PartID'].tolist(), df['PartName'].tolist(), df['CarModel'].tolist(), df['StockQTY'].tolist())
+
+    def __len__(self):
+        return int(self._alive.sum())
+
+    def _model_code(self, model):
+        return self._model_codes.setdefault(model, len(self._model_codes))
+
+    def _insert_word(self, word, field, pos):
+        at = bisect.bisect_right(self._words, word)
+        self._words.insert(at, word)
+        self._fields = np.insert(self._fields, at, field)
+        self._docs = np.insert(self._docs, at, pos)
+
+    def _delete_words(self, pos):
+        for field, words in zip((_NAME, _MODEL), self._doc_words[pos]):
+            for word in words:
+                lo = bisect.bisect_left(self._words, word)
+                hi = bisect.bisect_right(self._words, word, lo)
+                match = np.flatnonzero((self._docs[lo:hi] == pos) & (self._fields[lo:hi] == field))
+                if match.size:
+                    at = lo + int(match[0])
+                    del self._words[at]
+                    self._fields = np.delete(self._fields, at)
+                    self._docs = np.delete(self._docs, at)
+
+    def upsert(self, part_id, name, model, stock):
+        with self._lock:
+            pos = self._pos.get(part_id)
+            if pos is None:
+                pos = len(self._part_ids)
+                self._pos[part_id] = pos
+                self._part_ids = np.append(self._part_ids, part_id)
+                self._stock = np.append(self._stock, stock)
+                self._name_len = np.append(self._name_len, len(str(name)))
+                self._alive = np.append(self._alive, True)
+                self._model = np.append(self._model, self._model_code(model))
+                self._doc_words.append(([], []))
+            else:
+                self._delete_words(pos)
+                self._stock[pos] = stock
+                self._name_len[pos] = len(str(name))
+                self._model[pos] = self._model_code(model)
+
+            name_words, model_words = _words(name), _words(model)
+            self._doc_words[pos] = (name_words, model_words)
+            for word in name_words:
+                self._insert_word(word, _NAME, pos)
+            for word in model_words:
+                self._insert_word(word, _MODEL, pos)
+
+    def remove(self, part_id):
+        with self._lock:
+            pos = self._pos.pop(part_id, None)
+            if pos is not None:
+                self._delete_words(pos)
+                self._doc_words[pos] = ([], [])
+                self._alive[pos] = False
+
+    def adjust_stock(self, part_id, delta):
+        with self._lock:
+            pos = self._pos.get(part_id)
+            if pos is not None:
+                self._stock[pos] += delta
+
+    def _term_scores(self, term, fields):
+        lo = bisect.bisect_left(self._words, term)
+        exact_hi = bisect.bisect_right(self._words, term, lo)
+        hi = bisect.bisect_left(self._words, _prefix_end(term), exact_hi)
+
+        docs, doc_fields = self._docs[lo:hi], self._fields[lo:hi]
+        exact = np.arange(lo, hi) < exact_hi
+        if fields == NAME:
+            keep = doc_fields == _NAME
+            docs, doc_fields, exact = docs[keep], doc_fields[keep], exact[keep]
+
+        weights = np.select(
+            [(doc_fields == field) & (exact == is_exact) for field, is_exact in _WEIGHTS],
+            list(_WEIGHTS.values()),
+        )
+        # write in ascending weight order so each doc keeps its best match
+        order = np.argsort(weights, kind='stable')
+        scores = np.zeros(len(self._part_ids), dtype=np.int64)
+        scores[docs[order]] = weights[order]
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT, fields=NAME_AND_MODEL, car_model=None, part_ids=None):
+        """PartIDs matching every word of ``query``, best match first.
+
+        ``car_model`` keeps only that exact model and ``part_ids`` only those
+        parts; both apply before the ``limit`` cut-off. ``limit=None`` returns
+        every match.
+        """
+        terms = _words(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            total = np.zeros(len(self._part_ids), dtype=np.int64)
+            matched = self._alive.copy()
+            for term in terms:
+                scores = self._term_scores(term, fields)
+                matched &= scores > 0
+                total += scores
+            if car_model is not None:
+                matched &= self._model == self._model_codes.get(car_model, -1)
+            if part_ids is not None:
+                matched &= np.isin(self._part_ids, np.asarray(list(part_ids), dtype=self._part_ids.dtype))
+
+            hits = np.flatnonzero(matched)
+            if hits.size == 0:
+                return []
+            # best score first, then in-stock parts, then shorter names
+            keys = np.lexsort((hits, self._name_len[hits], self._stock[hits] <= 0, -total[hits]))
+            if limit is not None and hits.size > limit:
+                keys = keys[:limit]
+            return self._part_ids[hits[keys]].tolist()
+
+
+_indexes = TTLCache(ttl=get_settings().search_index_ttl)
+
+
+def get_index(engine=None):
+    """The process-wide index of ``engine``'s database, built from its parts snapshot on first use"""
+    engine = engine or get_engine()
+    return _indexes.get(engine.url, lambda: PartSearchIndex.from_frame(catalog.parts_snapshot(engine)))
+
+
+def search(query, engine=None, **kwargs):
+    return get_index(engine).search(query, **kwargs)
+
+
+def select_ranked(df, part_ids):
+    """Rows of ``df`` whose PartID is in ``part_ids``, in that order"""
+    order = {part_id: pos for pos, part_id in enumerate(part_ids)}
+    hits = df[df['PartID'].isin(list(order))]
+    return hits.iloc[hits['PartID'].map(order).argsort(kind='stable')]
+
+
+def invalidate():
+    """Drop the index, so the next search rebuilds it from the parts snapshot"""
+    _indexes.invalidate()
+
+
+def part_added(part_id, name, model, stock, engine=None):
+    """Record a newly inserted (or renamed) part in the live index"""
+    index = _indexes.peek((engine or get_engine()).url)
+    if index is not None:
+        index.upsert(int(part_id), name, model, int(stock))
+
+
+def stock_changed(part_id, delta, engine=None):
+    """Record a committed StockQTY change in the live index"""
+    index = _indexes.peek((engine or get_engine()).url)
+    if index is not None:
+        index.adjust_stock(int(part_id), int(delta))
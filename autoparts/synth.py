@@ -0,0 +1,230 @@
+"""Seeded synthetic data for sizing and benchmarking.
+
+Adds parts, customers and sales orders to the configured database (SQLite
+stand-in or SQL Server), then rebuilds the daily rollup. The same seed and
+sizes always produce the same rows, so benchmark runs are comparable:
+
+    python -m autoparts.synth --size large            # 100k parts, 50k customers, 5M sales lines
+    python -m autoparts.synth --parts 5000 --customers 2000 --sales 200000 --seed 7
+
+Part popularity and customer spend are skewed (a few parts and customers
+account for most sales), and a few percent of the catalog is down to its
+last few units, roughly as in a real shop.
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import sqlalchemy as sa
+
+from autoparts import catalog, reorder, rollup
+from autoparts.numbering import format_receipt_number, reserve_receipt_numbers
+from autoparts.schema import customers, parts, sales, sales_orders
+
+# parts below this stock are nearly out
+SCARCE = 10
+
+# (parts, customers, sales lines)
+SIZES = {
+    "small": (1_000, 500, 50_000),
+    "medium": (20_000, 10_000, 1_000_000),
+    "large": (100_000, 50_000, 5_000_000),
+}
+# rows per INSERT batch (and per transaction)
+BATCH = 50_000
+
+PART_TYPES = [
+    "Brake Pad", "Brake Disc", "Oil Filter", "Air Filter", "Fuel Filter", "Cabin Filter", "Spark Plug",
+    "Glow Plug", "Shock Absorber", "Control Arm", "Tie Rod End", "Ball Joint", "CV Joint", "Wheel Bearing",
+    "Water Pump", "Thermostat", "Radiator", "Timing Belt", "Fan Belt", "Clutch Kit", "Alternator",
+    "Starter Motor", "Headlight", "Tail Light", "Wiper Blade", "Battery", "Exhaust Muffler", "Oxygen Sensor",
+]
+POSITIONS = ["Front", "Rear", "Left", "Right", "Upper", "Lower", "Inner", "Outer"]
+BRANDS = ["Bosch", "Ferodo", "Monroe", "NGK", "Gates", "Valeo", "Denso", "Mann", "Lemforder", "SKF"]
+CAR_MODELS = [
+    "VW Polo", "VW Golf", "Toyota Corolla", "Toyota Hilux", "Ford Fiesta", "Ford Ranger", "Nissan NP200",
+    "Hyundai i20", "Kia Picanto", "Renault Clio", "BMW 3 Series", "Mercedes C-Class", "Isuzu D-Max",
+    "Suzuki Swift", "Honda Jazz", "Mazda 2", "Opel Corsa", "Audi A3", "Chevrolet Spark", "Datsun Go",
+]
+SUPPLIERS = ["AutoZone Wholesale", "Midas Supply", "Goldwagen", "Parts Direct", "Motus Distribution", "Supa Quick"]
+FIRST_NAMES = [
+    "Thabo", "Sipho", "Lerato", "Naledi", "Johan", "Pieter", "Anele", "Zanele", "Ayesha", "Priya", "David",
+    "Sarah", "Michael", "Nomsa", "Kagiso", "Lindiwe", "Ruan", "Chantal", "Mohammed", "Fatima", "Themba", "Grace",
+]
+LAST_NAMES = [
+    "Nkosi", "Dlamini", "Botha", "van der Merwe", "Naidoo", "Pillay", "Mokoena", "Khumalo", "Smith", "Jacobs",
+    "Ndlovu", "Pretorius", "Mahlangu", "Adams", "Govender", "Sithole", "Coetzee", "Molefe", "Williams", "Zulu",
+]
+
+
+def _records(columns):
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*(np.asarray(values).tolist() for values in columns.values()))]
+
+
+def _insert(engine, table, columns):
+    rows = len(next(iter(columns.values())))
+    for start in range(0, rows, BATCH):
+        batch = {name: values[start:start + BATCH] for name, values in columns.items()}
+        with engine.begin() as conn:
+            conn.execute(table.insert(), _records(batch))
+
+
+def _max_id(engine, column):
+    with engine.connect() as conn:
+        return conn.execute(sa.select(sa.func.max(column))).scalar() or 0
+
+
+def _popularity(rng, n, skew):
+    # Zipf-like weights in a random order, so popular ids are spread over the table
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return rng.permutation(weights / weights.sum())
+
+
+def generate_parts(engine, rng, n):
+    """Insert ``n`` parts; returns their (PartID, Price, CostPrice) as arrays"""
+    first_id = _max_id(engine, parts.c.PartID) + 1
+    serial = first_id + np.arange(n)
+    kind = rng.integers(len(PART_TYPES), size=n)
+    names = [
+        f"{BRANDS[b]} {POSITIONS[p]} {PART_TYPES[k]} {s:06d}"
+        for b, p, k, s in zip(rng.integers(len(BRANDS), size=n), rng.integers(len(POSITIONS), size=n), kind, serial)
+    ]
+    cost = np.round(rng.lognormal(mean=5.5, sigma=0.8, size=n), 2)
+    price = np.round(cost * rng.uniform(1.2, 1.8, size=n), 2)
+    # most parts comfortably stocked, a few percent nearly out
+    stock = np.where(rng.random(n) < 0.05, rng.integers(0, SCARCE, size=n), rng.integers(SCARCE, 150, size=n))
+    _insert(engine, parts, {
+        "PartName": names,
+        "CarModel": np.array(CAR_MODELS)[rng.integers(len(CAR_MODELS), size=n)],
+        "Price": price,
+        "CostPrice": cost,
+        "StockQTY": stock,
+        "Supplier": np.array(SUPPLIERS)[rng.integers(len(SUPPLIERS), size=n)],
+    })
+    with engine.connect() as conn:
+        ids = conn.execute(
+            sa.select(parts.c.PartID).where(parts.c.PartID >= first_id).order_by(parts.c.PartID)
+        ).scalars().all()
+    return np.asarray(ids), price, cost
+
+
+def generate_customers(engine, rng, n, start):
+    """Insert ``n`` customers created after ``start``; returns their CustomerIDs"""
+    first_id = _max_id(engine, customers.c.CustomerID) + 1
+    first = np.array(FIRST_NAMES)[rng.integers(len(FIRST_NAMES), size=n)]
+    last = np.array(LAST_NAMES)[rng.integers(len(LAST_NAMES), size=n)]
+    serial = first_id + np.arange(n)
+    span = (datetime.now() - start).total_seconds()
+    _insert(engine, customers, {
+        "FullName": [f"{f} {l} {s}" for f, l, s in zip(first, last, serial)],
+        "Email": [f"{f.lower()}.{l.lower().replace(' ', '')}{s}@example.com" for f, l, s in zip(first, last, serial)],
+        "Phone": [f"0{p}" for p in rng.integers(600_000_000, 839_999_999, size=n)],
+        "CreatedDate": [start + timedelta(seconds=s) for s in np.sort(rng.uniform(0, span, size=n))],
+    })
+    with engine.connect() as conn:
+        ids = conn.execute(
+            sa.select(customers.c.CustomerID).where(customers.c.CustomerID >= first_id).order_by(customers.c.CustomerID)
+        ).scalars().all()
+    return np.asarray(ids)
+
+
+def generate_sales(engine, rng, n_lines, part_ids, prices, customer_ids, start):
+    """Insert ``n_lines`` sales lines, grouped into orders of 1-4 lines, dated from ``start`` to now"""
+    lines_per_order = rng.integers(1, 5, size=max(1, n_lines // 2))
+    n_orders = int(np.searchsorted(np.cumsum(lines_per_order), n_lines)) + 1
+    lines_per_order = lines_per_order[:n_orders]
+    lines_per_order[-1] -= lines_per_order.sum() - n_lines
+
+    span = (datetime.now() - start).total_seconds()
+    offsets = np.sort(rng.uniform(0, span, size=n_orders))
+    order_customers = rng.choice(customer_ids, size=n_orders, p=_popularity(rng, len(customer_ids), 0.8))
+    part_weights = _popularity(rng, len(part_ids), 1.0)
+
+    # one block of receipt numbers for every order, taken the way the tills take theirs
+    first_receipt = reserve_receipt_numbers(engine, n_orders)
+
+    written = 0
+    for lo in range(0, n_orders, BATCH):
+        hi = min(lo + BATCH, n_orders)
+        dates = [start + timedelta(seconds=s) for s in offsets[lo:hi].tolist()]
+        counts = lines_per_order[lo:hi]
+        n = int(counts.sum())
+        which = rng.choice(len(part_ids), size=n, p=part_weights)
+        qty = rng.integers(1, 5, size=n)
+        totals = np.round(prices[which] * qty, 2)
+        order_of_line = np.repeat(np.arange(hi - lo), counts)
+        order_totals = np.round(np.bincount(order_of_line, weights=totals, minlength=hi - lo), 2)
+        receipts = [format_receipt_number(first_receipt + lo + i, day) for i, day in enumerate(dates)]
+
+        with engine.begin() as conn:
+            first_order = (conn.execute(sa.select(sa.func.max(sales_orders.c.OrderID))).scalar() or 0) + 1
+            conn.execute(sales_orders.insert(), _records({
+                "ReceiptNumber": receipts,
+                "CustomerID": order_customers[lo:hi],
+                "OrderDate": dates,
+                "TotalAmount": order_totals,
+            }))
+            order_ids = dict(conn.execute(
+                sa.select(sales_orders.c.ReceiptNumber, sales_orders.c.OrderID)
+                .where(sales_orders.c.OrderID >= first_order)
+            ).all())
+            conn.execute(sales.insert(), _records({
+                "OrderID": np.array([order_ids[r] for r in receipts])[order_of_line],
+                "CustomerID": order_customers[lo:hi][order_of_line],
+                "PartsID": part_ids[which],
+                "QuantitySold": qty,
+                "TotalAmount": totals,
+                "SaleDate": [dates[i] for i in order_of_line.tolist()],
+            }))
+        written += n
+    return written
+
+
+def generate(engine, n_parts, n_customers, n_sales, seed=42, days=730):
+    """Add synthetic parts, customers and ``days`` of sales to ``engine``'s database.
+
+    Returns ``{table: rows added}``. The daily rollup is rebuilt afterwards,
+    and the cached snapshots and sales velocities are dropped.
+    """
+    if n_sales and not (n_parts and n_customers):
+        raise ValueError("Synthetic sales need synthetic parts and customers to sell to")
+    rng = np.random.default_rng(seed)
+    start = datetime.now().replace(microsecond=0) - timedelta(days=days)
+    part_ids, prices, _cost = generate_parts(engine, rng, n_parts)
+    customer_ids = generate_customers(engine, rng, n_customers, start)
+    lines = generate_sales(engine, rng, n_sales, part_ids, prices, customer_ids, start) if n_sales else 0
+    with engine.begin() as conn:
+        rollup.rebuild(conn)
+    catalog.invalidate()
+    reorder.invalidate()
+    return {"Parts": len(part_ids), "Customers": len(customer_ids), "Sales": lines}
+
+
+def main(argv=None):
+    from autoparts.db import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m autoparts.synth",
+                                     description="Add seeded synthetic data to the configured database")
+    parser.add_argument("--size", choices=SIZES, default="small", help="preset sizes (default: small)")
+    parser.add_argument("--parts", type=int, help="parts to add (overrides --size)")
+    parser.add_argument("--customers", type=int, help="customers to add (overrides --size)")
+    parser.add_argument("--sales", type=int, help="sales lines to add (overrides --size)")
+    parser.add_argument("--days", type=int, default=730, help="days of sales history, ending now (default: 730)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    n_parts, n_customers, n_sales = SIZES[args.size]
+    added = generate(
+        get_engine(),
+        args.parts if args.parts is not None else n_parts,
+        args.customers if args.customers is not None else n_customers,
+        args.sales if args.sales is not None else n_sales,
+        seed=args.seed,
+        days=args.days,
+    )
+    print(", ".join(f"{table}: {rows}" for table, rows in added.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Fixtures: a fresh SQLite database per test, with the process-wide caches reset around it."""
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import catalog, config, crm, db, inventory, journal, numbering, reorder, search
+
+
+def _reset():
+    journal.stop_replicators()
+    journal._engines.clear()
+    config.get_settings.cache_clear()
+    db.get_engine.cache_clear()
+    numbering.get_allocator.cache_clear()
+    catalog.invalidate()
+    search.invalidate()
+    reorder.invalidate()
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """The app engine, on a migrated SQLite database of its own"""
+    monkeypatch.setenv("AUTOPARTS_DB_BACKEND", "sqlite")
+    monkeypatch.setenv("AUTOPARTS_SQLITE_PATH", str(tmp_path / "autoparts.db"))
+    for name in ("AUTOPARTS_DB_URL", "AUTOPARTS_REPLICA_DIR", "AUTOPARTS_JOURNAL_PATH"):
+        monkeypatch.delenv(name, raising=False)
+    _reset()
+    engine = db.get_engine()
+    yield engine
+    engine.dispose()
+    _reset()
+
+
+@pytest.fixture
+def journal_path(engine, tmp_path, monkeypatch):
+    """Turn on the sales journal, in a file of its own"""
+    path = tmp_path / "journal.db"
+    monkeypatch.setenv("AUTOPARTS_JOURNAL_PATH", str(path))
+    config.get_settings.cache_clear()
+    return str(path)
+
+
+@contextmanager
+def outage(engine):
+    """Make the database unreachable: every new connection fails, as when the link to SQL Server drops"""
+    def refuse(*_args, **_kwargs):
+        raise sqlite3.OperationalError("unable to open database file")
+
+    sa.event.listen(engine, "do_connect", refuse)
+    engine.dispose()
+    try:
+        yield
+    finally:
+        sa.event.remove(engine, "do_connect", refuse)
+
+
+@pytest.fixture
+def make_part(engine):
+    """Insert a part; returns its PartID"""
+    count = iter(range(1, 10_000))
+
+    def make(stock=10, price=100.0, cost=60.0, name=None, model="VW Polo", supplier=None):
+        return inventory.add_part(engine, name or f"Part {next(count)}", model, price, cost, stock, supplier)
+    return make
+
+
+@pytest.fixture
+def customer_id(engine):
+    return crm.add_customer(engine, "Test Customer")
+
+
+def line(part_id, qty, price=100.0):
+    """A cart line as Process Sale builds it"""
+    return {"PartID": part_id, "Qty": qty, "Price": price, "Total": price * qty}
+
+
+def stock_of(engine, part_id):
+    from autoparts.schema import parts
+
+    with engine.connect() as conn:
+        return conn.execute(sa.select(parts.c.StockQTY).where(parts.c.PartID == part_id)).scalar_one()
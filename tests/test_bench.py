@@ -0,0 +1,21 @@
+import json
+
+from autoparts import bench
+
+
+def test_every_case_has_a_threshold():
+    thresholds = bench.load_thresholds()
+
+    assert {case.name for case in bench.cases()} == set(thresholds) - {"_baseline"}
+
+
+def test_saved_thresholds_hold_only_this_runs_cases(tmp_path):
+    path = tmp_path / "thresholds.json"
+    path.write_text(json.dumps({"_baseline": {"backend": "mssql"}, "inventory/low_stock": {"p95_ms": 19.8}}))
+
+    bench.save_thresholds({"inventory/reorder_only": {"p95_ms": 10.0}}, path, {"backend": "sqlite"})
+
+    assert json.loads(path.read_text()) == {
+        "_baseline": {"backend": "sqlite"},
+        "inventory/reorder_only": {"p95_ms": round(10.0 * bench.HEADROOM, 1)},
+    }
@@ -0,0 +1,39 @@
+import sqlalchemy as sa
+
+from autoparts import catalog, crm, db, migrate, search
+
+
+def _other_engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    migrate.upgrade(engine)
+    return engine
+
+
+def test_snapshots_are_kept_apart_per_database(engine, make_part, tmp_path):
+    make_part(name="Brake Pad")
+    other = _other_engine(tmp_path)
+    crm.add_customer(other, "Only In Other")
+
+    assert catalog.parts_snapshot(engine)["PartName"].tolist() == ["Brake Pad"]
+    assert catalog.parts_snapshot(other).empty
+    assert catalog.customers_snapshot(engine).empty
+    assert catalog.customers_snapshot(other)["FullName"].tolist() == ["Only In Other"]
+
+
+def test_default_engine_shares_the_app_engine_cache(engine, make_part):
+    make_part(name="Brake Pad")
+    assert catalog.parts_snapshot() is catalog.parts_snapshot(db.get_engine())
+
+
+def test_invalidate_reaches_every_database(engine, make_part, tmp_path):
+    other = _other_engine(tmp_path)
+    first = catalog.parts_snapshot(other)
+    catalog.invalidate(catalog.PARTS)
+    assert catalog.parts_snapshot(other) is not first
+
+
+def test_search_index_is_kept_apart_per_database(engine, make_part, tmp_path):
+    make_part(name="Brake Pad")
+    other = _other_engine(tmp_path)
+    assert search.search("brake", engine)
+    assert not search.search("brake", other)
@@ -0,0 +1,68 @@
+import gzip
+import io
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from autoparts import exports, sales
+
+from conftest import line
+
+COLUMNS = ["SalesId", "SaleDate", "ReceiptNumber", "Customer", "PartName", "CarModel", "QuantitySold", "TotalAmount"]
+
+
+@pytest.fixture
+def history(engine, make_part, customer_id):
+    part_id = make_part(stock=100, name="Brake Pad")
+    for n in range(7):
+        sales.checkout(engine, customer_id, [line(part_id, 1)], datetime(2025, 3, 1 + n, 9, 30), f"R-{n}")
+    return sales.history_export(sales.history_filters(date(2025, 3, 1), date(2025, 3, 31)))
+
+
+def _export(engine, stmt, fmt):
+    out = io.BytesIO()
+    rows = exports.export(engine, stmt, out, fmt, chunksize=3)
+    out.seek(0)
+    return rows, out
+
+
+def test_gzip_csv_round_trips_across_chunks(engine, history):
+    rows, out = _export(engine, history, exports.CSV_GZ)
+
+    text = gzip.decompress(out.getvalue()).decode()
+    frame = pd.read_csv(io.StringIO(text), parse_dates=["SaleDate"])
+    assert rows == 7 and len(frame) == 7
+    assert text.count("SalesId") == 1
+    assert frame.columns.tolist() == COLUMNS
+    assert frame["SaleDate"].min() == pd.Timestamp(2025, 3, 1, 9, 30)
+    assert frame["QuantitySold"].dtype == "int64"
+
+
+def test_parquet_round_trips_across_chunks_with_sql_types(engine, history):
+    rows, out = _export(engine, history, exports.PARQUET)
+
+    parquet = pq.ParquetFile(out)
+    frame = parquet.read().to_pandas()
+    assert rows == 7 and len(frame) == 7
+    assert parquet.metadata.num_row_groups == 3
+    assert frame.columns.tolist() == COLUMNS
+    assert str(parquet.schema_arrow.field("SaleDate").type) == "timestamp[us]"
+    assert str(parquet.schema_arrow.field("TotalAmount").type) == "double"
+    assert frame["QuantitySold"].dtype == "int64"
+    assert frame["SaleDate"].min() == pd.Timestamp(2025, 3, 1, 9, 30)
+
+
+@pytest.mark.parametrize("fmt", exports.FORMATS)
+def test_an_empty_result_still_writes_a_valid_file(engine, fmt):
+    stmt = sales.history_export(sales.history_filters(date(2025, 3, 1), date(2025, 3, 31)))
+
+    rows, out = _export(engine, stmt, fmt)
+
+    assert rows == 0
+    if fmt == exports.CSV_GZ:
+        frame = pd.read_csv(io.BytesIO(gzip.decompress(out.getvalue())))
+    else:
+        frame = pq.read_table(out).to_pandas()
+    assert frame.empty and frame.columns.tolist() == COLUMNS
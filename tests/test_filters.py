@@ -0,0 +1,66 @@
+from datetime import date, datetime
+
+import sqlalchemy as sa
+
+from autoparts import crm, filters, plans, sales
+from autoparts.schema import sales as sales_table
+
+from conftest import line
+
+
+def test_escape_like_matches_wildcards_literally():
+    assert filters.escape_like(r"50%_off [new] \ sale") == r"50\%\_off \[new] \\ sale"
+
+
+def test_contains_finds_wildcard_characters_only_where_they_are(engine, make_part):
+    part_id = make_part(stock=10)
+    names = ["100% Motors", "A_B Panel", "C[1] Spares", "Plain Motors"]
+    for n, name in enumerate(names):
+        sales.checkout(engine, crm.add_customer(engine, name), [line(part_id, 1)], datetime(2025, 3, 1, 9), f"R-{n}")
+
+    def found(term):
+        page = sales.history_page(engine, sales.history_filters(date(2025, 3, 1), date(2025, 3, 1), term))
+        return sorted(page.rows["Customer"])
+
+    assert found("%") == ["100% Motors"]
+    assert found("_") == ["A_B Panel"]
+    assert found("[1]") == ["C[1] Spares"]
+    assert found("motors") == ["100% Motors", "Plain Motors"]
+
+
+def test_on_days_includes_the_whole_last_day_and_nothing_after(engine, make_part, customer_id):
+    part_id = make_part(stock=10)
+    sold = [datetime(2025, 2, 28, 23, 59, 59), datetime(2025, 3, 1), datetime(2025, 3, 31, 23, 59, 59),
+            datetime(2025, 4, 1)]
+    for n, sold_at in enumerate(sold):
+        sales.checkout(engine, customer_id, [line(part_id, 1)], sold_at, f"R-{n}")
+
+    page = sales.history_page(engine, sales.history_filters(date(2025, 3, 1), date(2025, 3, 31)))
+
+    assert sorted(page.rows["SaleDate"].dt.to_pydatetime().tolist()) == [
+        datetime(2025, 3, 1), datetime(2025, 3, 31, 23, 59, 59),
+    ]
+
+
+def test_between_is_half_open_with_open_ends():
+    day = sales_table.c.SaleDate
+
+    assert [str(c.compile()) for c in filters.between(day, date(2025, 3, 1), date(2025, 4, 1))] == [
+        '"Sales"."SaleDate" >= :SaleDate_1', '"Sales"."SaleDate" < :SaleDate_1',
+    ]
+    assert filters.between(day) == []
+    lower, = filters.between(day, date(2025, 3, 1))
+    assert lower.right.value == datetime(2025, 3, 1)
+
+
+def test_filters_bind_their_values_and_seek_the_sale_date_index(engine):
+    searched = sales.history_filters(date(2025, 3, 1), date(2025, 3, 31), "50%")
+    assert "50" not in str(sa.and_(*searched).compile(engine))
+
+    stmt = sa.select(sales_table.c.SalesId).where(*sales.history_filters(date(2025, 3, 1), date(2025, 3, 31)))
+    compiled = stmt.compile(engine)
+    assert "2025" not in str(compiled)
+    with engine.connect() as conn:
+        steps = plans.explain(conn, str(compiled), tuple(compiled.params[name] for name in compiled.positiontup))
+    assert [step.scan for step in steps] == [False]
+    assert "IX_Sales_SaleDate" in steps[0].detail
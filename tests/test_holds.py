@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import holds, sales
+from autoparts.inventory import InsufficientStockError, apply_stock_deltas
+from autoparts.schema import parts, stock_holds
+
+from conftest import line, stock_of
+
+
+def _version(engine, part_id):
+    with engine.connect() as conn:
+        return conn.execute(sa.select(parts.c.StockVersion).where(parts.c.PartID == part_id)).scalar_one()
+
+
+def test_other_carts_cannot_hold_units_already_held(engine, make_part):
+    part_id = make_part(stock=3)
+    first, second = holds.new_token(), holds.new_token()
+
+    assert holds.place(engine, first, part_id, 2) == 2
+    with pytest.raises(holds.HoldError, match="Only 1 more units"):
+        holds.place(engine, second, part_id, 2)
+    assert holds.place(engine, second, part_id, 1) == 1
+    assert holds.place(engine, first, part_id, 0) == 2
+
+
+def test_held_elsewhere_follows_place_and_release(engine, make_part):
+    part_id = make_part(stock=5)
+    mine, theirs = holds.new_token(), holds.new_token()
+    assert holds.held_elsewhere(engine, mine).empty
+
+    holds.place(engine, theirs, part_id, 2)
+    holds.place(engine, mine, part_id, 1)
+    assert holds.held_elsewhere(engine, mine).to_dict() == {part_id: 2}
+    assert holds.held_elsewhere(engine).to_dict() == {part_id: 3}
+
+    holds.release(engine, theirs)
+    assert holds.held_elsewhere(engine, mine).empty
+
+
+def test_held_elsewhere_is_served_from_the_cache(engine, make_part):
+    part_id = make_part(stock=5)
+    holds.place(engine, holds.new_token(), part_id, 2)
+    holds.held_elsewhere(engine)
+
+    statements = []
+    sa.event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert holds.held_elsewhere(engine).to_dict() == {part_id: 2}
+    assert statements == []
+
+
+def test_expired_holds_do_not_count(engine, make_part):
+    part_id = make_part(stock=2)
+    holds.place(engine, holds.new_token(), part_id, 2, ttl=0)
+    assert holds.held_elsewhere(engine).empty
+    assert holds.place(engine, holds.new_token(), part_id, 2) == 2
+
+
+def test_stock_movements_bump_the_version(engine, make_part):
+    part_id = make_part(stock=5)
+    before = _version(engine, part_id)
+    with engine.begin() as conn:
+        apply_stock_deltas(conn, {part_id: -1})
+    holds.place(engine, holds.new_token(), part_id, 1)
+    assert _version(engine, part_id) == before + 2
+
+
+def test_a_change_between_check_and_claim_is_rechecked(engine, make_part):
+    part_id = make_part(stock=3)
+    raced = []
+
+    def sell_in_between(conn, _cursor, statement, *_args):
+        # another till sells two units after place() read the stock, before it claims the version
+        if not raced and statement.startswith('UPDATE "Parts" SET "StockVersion"'):
+            raced.append(True)
+            with engine.begin() as other:
+                apply_stock_deltas(other, {part_id: -2})
+
+    sa.event.listen(engine, "before_cursor_execute", sell_in_between)
+    with pytest.raises(holds.HoldError, match=r"Only 1 more units .*\(1 in stock"):
+        holds.place(engine, holds.new_token(), part_id, 2)
+    assert raced
+    with engine.connect() as conn:
+        assert conn.execute(sa.select(sa.func.count()).select_from(stock_holds)).scalar_one() == 0
+
+
+def test_concurrent_tills_never_hold_more_than_the_stock(engine, make_part):
+    part_id = make_part(stock=5)
+    placed, refused = [], []
+
+    def till():
+        try:
+            placed.append(holds.place(engine, holds.new_token(), part_id, 1))
+        except holds.HoldError:
+            refused.append(True)
+
+    threads = [threading.Thread(target=till) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(placed) == 5 and len(refused) == 7
+    assert holds.held_elsewhere(engine).to_dict() == {part_id: 5}
+
+
+def test_checkout_leaves_other_carts_holds_and_drops_its_own(engine, make_part, customer_id):
+    part_id = make_part(stock=3)
+    mine, theirs = holds.new_token(), holds.new_token()
+    holds.place(engine, mine, part_id, 2)
+    holds.place(engine, theirs, part_id, 1)
+
+    with pytest.raises(InsufficientStockError):
+        sales.checkout(engine, customer_id, [line(part_id, 3)], datetime.now(), "R-1", mine)
+    sales.checkout(engine, customer_id, [line(part_id, 2)], datetime.now(), "R-2", mine)
+
+    assert stock_of(engine, part_id) == 1
+    assert holds.held_elsewhere(engine).to_dict() == {part_id: 1}
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from autoparts import inventory, reorder
+from autoparts.schema import parts
+
+from conftest import stock_of
+
+PAGE = Path(__file__).resolve().parents[1] / "app_pages" / "inventory_management.py"
+
+
+def test_receive_goods_adds_lines_for_the_same_part(engine, make_part):
+    part_id = make_part(stock=3)
+
+    assert inventory.receive_goods(engine, [(part_id, 2), (part_id, 5)]) == {part_id: 7}
+    assert stock_of(engine, part_id) == 10
+
+
+def test_unknown_parts_are_named_and_nothing_is_booked(engine, make_part):
+    part_id = make_part(stock=3)
+
+    with pytest.raises(inventory.DeliveryError, match=r"^No part with PartID 998, 999$"):
+        inventory.receive_goods(engine, [(part_id, 4), (999, 1), (998, 1)])
+    assert stock_of(engine, part_id) == 3
+
+
+def test_a_part_left_below_zero_is_not_reported_as_missing(engine, make_part):
+    part_id = make_part(stock=0, name="Brake Pad")
+    with engine.begin() as conn:
+        conn.execute(parts.update().where(parts.c.PartID == part_id).values(StockQTY=-5))
+
+    with pytest.raises(inventory.DeliveryError) as caught:
+        inventory.receive_goods(engine, [(part_id, 2), (999, 1)])
+
+    assert str(caught.value) == (f"No part with PartID 999; Brake Pad (PartID {part_id}) would still be below zero: "
+                                 f"-5 in stock, 2 received")
+    assert stock_of(engine, part_id) == -5
+
+
+def test_a_failed_restock_shows_an_error(engine, make_part):
+    part_id = make_part(stock=0, name="Brake Pad")
+    with engine.begin() as conn:
+        conn.execute(parts.update().where(parts.c.PartID == part_id).values(StockQTY=-50))
+    at = AppTest.from_file(str(PAGE), default_timeout=30).run()
+
+    [button for button in at.button if "Confirm Restock" in button.label][0].click().run()
+
+    assert not at.exception
+    assert [error.value for error in at.error] == [
+        f"Brake Pad (PartID {part_id}) would still be below zero: -50 in stock, 10 received"
+    ]
+    assert stock_of(engine, part_id) == -50
+
+
+def test_the_stock_list_works_out_reorder_statuses_once(engine, make_part, monkeypatch):
+    make_part(stock=3)
+    calls = []
+    statuses = reorder.statuses
+    monkeypatch.setattr(reorder, "statuses", lambda *args: calls.append(args) or statuses(*args))
+
+    at = AppTest.from_file(str(PAGE), default_timeout=30).run()
+
+    assert not at.exception
+    assert len(calls) == 1
@@ -0,0 +1,119 @@
+import time
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import catalog, holds, journal, sales
+from autoparts.inventory import apply_stock_deltas
+from autoparts.schema import sales_orders
+
+from conftest import line, outage, stock_of
+
+
+def _orders(engine):
+    with engine.connect() as conn:
+        return conn.execute(sa.select(sales_orders.c.ReceiptNumber).order_by(sales_orders.c.OrderID)).scalars().all()
+
+
+def test_checkout_without_a_journal_writes_straight_through(engine, make_part, customer_id):
+    part_id = make_part(stock=5)
+    assert journal.checkout(engine, customer_id, [line(part_id, 2)], datetime.now(), "R-1") is False
+    assert stock_of(engine, part_id) == 3
+
+
+def test_journaled_sales_replicate_in_order(engine, journal_path, make_part, customer_id):
+    part_id = make_part(stock=5)
+    for n in range(3):
+        journal.append(customer_id, [line(part_id, 1)], datetime.now(), f"R-{n}")
+    assert journal.counts()[journal.PENDING] == 3
+    assert journal.pending_units().to_dict() == {part_id: 3}
+
+    assert journal.drain(engine, batch_size=2) == {journal.REPLICATED: 3}
+    assert _orders(engine) == ["R-0", "R-1", "R-2"]
+    assert stock_of(engine, part_id) == 2
+    assert journal.counts() == {journal.PENDING: 0, journal.REPLICATED: 3, journal.FAILED: 0}
+    assert journal.pending_units().empty
+
+
+def test_a_receipt_already_in_the_central_database_is_not_applied_again(engine, journal_path, make_part,
+                                                                         customer_id):
+    part_id = make_part(stock=5)
+    journal.append(customer_id, [line(part_id, 1)], datetime.now(), "R-1")
+    # the batch committed centrally, but the till stopped before writing its outcome
+    sales.checkout(engine, customer_id, [line(part_id, 1)], datetime.now(), "R-1")
+
+    assert journal.drain(engine) == {journal.REPLICATED: 1}
+    assert _orders(engine) == ["R-1"]
+    assert stock_of(engine, part_id) == 4
+
+
+def test_refused_sales_are_set_aside_and_the_batch_goes_through(engine, journal_path, make_part, customer_id):
+    part_id = make_part(stock=2)
+    journal.append(customer_id, [line(part_id, 1)], datetime.now(), "R-1")
+    journal.append(customer_id, [line(part_id, 5)], datetime.now(), "R-2")
+    journal.append(customer_id, [line(part_id, 1)], datetime.now(), "R-3")
+
+    assert journal.drain(engine) == {journal.REPLICATED: 2, journal.FAILED: 1}
+    assert _orders(engine) == ["R-1", "R-3"]
+    [failure] = journal.failures()
+    assert failure.ReceiptNumber == "R-2" and "Not enough stock" in failure.Error
+
+    with engine.begin() as conn:
+        apply_stock_deltas(conn, {part_id: 5})
+    assert journal.retry() == 1
+    assert journal.drain(engine) == {journal.REPLICATED: 1}
+    assert _orders(engine) == ["R-1", "R-3", "R-2"]
+
+
+def test_an_unreachable_central_database_leaves_sales_pending(engine, journal_path, make_part, customer_id):
+    part_id = make_part(stock=5)
+    journal.append(customer_id, [line(part_id, 1)], datetime.now(), "R-1")
+    with outage(engine):
+        with pytest.raises(sa.exc.OperationalError):
+            journal.drain(engine)
+    assert journal.counts()[journal.PENDING] == 1
+    assert journal.drain(engine) == {journal.REPLICATED: 1}
+
+
+def test_replication_releases_the_carts_holds(engine, journal_path, make_part, customer_id):
+    part_id = make_part(stock=3)
+    token = holds.new_token()
+    holds.place(engine, token, part_id, 2)
+    journal.append(customer_id, [line(part_id, 2)], datetime.now(), "R-1", token)
+    # until the sale replicates, its holds keep other carts off its units
+    assert holds.held_elsewhere(engine).to_dict() == {part_id: 2}
+
+    journal.drain(engine)
+    assert holds.held_elsewhere(engine).empty
+    assert catalog.parts_snapshot(engine).set_index("PartID").loc[part_id, "StockQTY"] == 1
+
+
+def test_the_replicator_drains_as_soon_as_a_sale_is_journaled(engine, journal_path, make_part, customer_id):
+    part_id = make_part(stock=5)
+    assert journal.checkout(engine, customer_id, [line(part_id, 1)], datetime.now(), "R-1") is True
+    deadline = time.monotonic() + 5
+    while journal.counts()[journal.REPLICATED] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal.counts()[journal.REPLICATED] == 1
+    assert stock_of(engine, part_id) == 4
+
+
+def test_hold_falls_back_to_the_tills_own_figure_while_unreachable(engine, journal_path, make_part):
+    part_id = make_part(stock=5)
+    with outage(engine):
+        assert journal.hold(engine, holds.new_token(), part_id, 2, available=3) is False
+        with pytest.raises(holds.HoldError):
+            journal.hold(engine, holds.new_token(), part_id, 4, available=3)
+        journal.release(engine, holds.new_token())
+    assert journal.hold(engine, holds.new_token(), part_id, 2, available=3) is True
+
+
+def test_prune_drops_only_old_replicated_sales(engine, journal_path, make_part, customer_id):
+    part_id = make_part(stock=5)
+    journal.append(customer_id, [line(part_id, 1)], datetime.now(), "R-1")
+    journal.drain(engine)
+    journal.append(customer_id, [line(part_id, 1)], datetime.now(), "R-2")
+    assert journal.prune(days=1) == 0
+    assert journal.prune(days=0) == 1
+    assert journal.counts() == {journal.PENDING: 1, journal.REPLICATED: 0, journal.FAILED: 0}
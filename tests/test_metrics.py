@@ -0,0 +1,124 @@
+import json
+import re
+
+import pytest
+
+from autoparts import config, inventory, metrics
+
+
+@pytest.fixture
+def sinks(engine, tmp_path, monkeypatch):
+    """Both metrics sinks turned on, with ``engine`` instrumented and fresh running totals"""
+    log, textfile = tmp_path / "metrics.jsonl", tmp_path / "autoparts.prom"
+    monkeypatch.setenv("AUTOPARTS_METRICS_LOG", str(log))
+    monkeypatch.setenv("AUTOPARTS_METRICS_TEXTFILE", str(textfile))
+    config.get_settings.cache_clear()
+    monkeypatch.setattr(metrics, "_totals", metrics._Totals())
+    metrics.instrument(engine)
+    return log, textfile
+
+
+def _samples(textfile):
+    """The textfile's samples as {name{labels}: value}"""
+    lines = [line for line in textfile.read_text().splitlines() if not line.startswith("#")]
+    return {key: float(value) for key, value in (line.rsplit(" ", 1) for line in lines)}
+
+
+def test_a_page_query_is_recorded_with_its_frame(engine, sinks, make_part):
+    for stock in range(3):
+        make_part(stock=stock)
+
+    with metrics.trace("inventory") as recorded:
+        with metrics.section("stock list"):
+            page = inventory.parts_page(engine, [], None, 10)
+        inventory.parts_kpis(engine, [])
+
+    listed, totals = recorded.statements
+    assert listed.sql.startswith("SELECT") and "LIMIT" in listed.sql
+    assert listed.section == "stock list" and totals.section is None
+    assert listed.rows == len(page.rows) == 3
+    assert listed.bytes == int(page.rows.memory_usage(index=False, deep=True).sum()) > 0
+    assert listed.ms > 0 and totals.ms > 0
+    assert recorded.sections.keys() == {"stock list"}
+    assert recorded.sections["stock list"] >= listed.ms
+    assert recorded.total_ms >= recorded.sql_ms
+    assert recorded.outcome == "ok" and recorded.errors == []
+
+
+def test_statements_outside_a_trace_are_not_recorded(engine, sinks, make_part):
+    make_part()
+    inventory.parts_page(engine, [], None, 10)
+
+    with metrics.trace("inventory") as recorded:
+        pass
+
+    assert recorded.statements == [] and metrics.current() is None
+
+
+def test_a_handled_error_is_kept_in_the_trace(engine, sinks):
+    with metrics.trace("process sale") as recorded:
+        try:
+            raise ValueError("Not enough stock for Brake Pad")
+        except ValueError as e:
+            metrics.record_error(e)
+
+    assert recorded.errors == ["ValueError: Not enough stock for Brake Pad"]
+    assert recorded.outcome == "ok"
+
+
+def test_each_trace_is_one_json_line(engine, sinks, make_part):
+    log, _textfile = sinks
+    make_part()
+
+    with metrics.trace("inventory"):
+        inventory.parts_page(engine, [], None, 10)
+    with pytest.raises(RuntimeError):
+        with metrics.trace("reorder list"):
+            raise RuntimeError("rerun")
+
+    first, second = [json.loads(line) for line in log.read_text().splitlines()]
+    assert first["name"] == "inventory" and first["outcome"] == "ok"
+    assert first["rows"] == 1 and first["bytes"] > 0 and first["sql_ms"] > 0
+    assert [statement["rows"] for statement in first["statements"]] == [1]
+    assert "started" not in first
+    assert second["name"] == "reorder list" and second["outcome"] == "RuntimeError"
+    assert second["statements"] == []
+
+
+def test_the_textfile_holds_counters_and_a_cumulative_histogram(engine, sinks, make_part):
+    _log, textfile = sinks
+    for _ in range(2):
+        make_part()
+
+    for _ in range(2):
+        with metrics.trace("inventory"):
+            with metrics.section("stock list"):
+                inventory.parts_page(engine, [], None, 10)
+            metrics.record_error(ValueError("shown"))
+
+    text = textfile.read_text()
+    for metric, _help in metrics._Totals.COUNTERS:
+        assert f"# TYPE {metric} counter" in text
+    assert "# TYPE autoparts_rerun_seconds histogram" in text
+    samples = _samples(textfile)
+    assert samples['autoparts_reruns_total{page="inventory",outcome="ok"}'] == 2
+    assert samples['autoparts_sql_statements_total{page="inventory"}'] == 2
+    assert samples['autoparts_sql_rows_total{page="inventory"}'] == 4
+    assert samples['autoparts_sql_bytes_total{page="inventory"}'] > 0
+    assert samples['autoparts_sql_seconds_total{page="inventory"}'] > 0
+    assert samples['autoparts_section_seconds_total{page="inventory",section="stock list"}'] > 0
+    assert samples['autoparts_errors_total{page="inventory"}'] == 2
+
+    buckets = [
+        (bound, value) for key, value in samples.items()
+        for bound in re.findall(r'^autoparts_rerun_seconds_bucket\{page="inventory",le="([^"]+)"\}$', key)
+    ]
+    assert [bound for bound, _count in buckets] == [*map(str, metrics.BUCKETS), "+Inf"]
+    counts = [count for _bound, count in buckets]
+    assert counts == sorted(counts) and counts[-1] == 2
+    assert samples['autoparts_rerun_seconds_count{page="inventory"}'] == 2
+    assert samples['autoparts_rerun_seconds_sum{page="inventory"}'] > 0
+
+
+def test_label_values_are_escaped():
+    assert metrics._labels([("page", 'say "hi"\\\n')]) == '{page="say \\"hi\\"\\\\\\n"}'
@@ -0,0 +1,126 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import migrate
+from autoparts.schema import metadata, sales_daily_rollup
+
+
+@pytest.fixture
+def bare(tmp_path):
+    """An empty SQLite database, not yet migrated"""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'bare.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _layout(engine):
+    inspector = sa.inspect(engine)
+    return {
+        table: ({column["name"] for column in inspector.get_columns(table)},
+                {index["name"] for index in inspector.get_indexes(table)})
+        for table in inspector.get_table_names()
+    }
+
+
+def _baseline(engine):
+    """The tables as they stood before SchemaVersion, with a day of trading in them"""
+    with engine.begin() as conn:
+        for ddl in (
+            'CREATE TABLE "Parts" ("PartID" INTEGER PRIMARY KEY, "PartName" VARCHAR(200) NOT NULL, '
+            '"CarModel" VARCHAR(100) NOT NULL, "Price" NUMERIC(12, 2) NOT NULL, '
+            '"CostPrice" NUMERIC(12, 2) NOT NULL, "StockQTY" INTEGER NOT NULL, "Supplier" VARCHAR(200))',
+            'CREATE TABLE "Customers" ("CustomerID" INTEGER PRIMARY KEY, "FullName" VARCHAR(200) NOT NULL, '
+            '"Email" VARCHAR(200), "Phone" VARCHAR(50), "CreatedDate" DATETIME)',
+            'CREATE TABLE "Sales" ("SalesId" INTEGER PRIMARY KEY, "CustomerID" INTEGER NOT NULL, '
+            '"PartsID" INTEGER NOT NULL, "QuantitySold" INTEGER NOT NULL, '
+            '"TotalAmount" NUMERIC(12, 2) NOT NULL, "SaleDate" DATETIME NOT NULL)',
+        ):
+            conn.execute(sa.text(ddl))
+        conn.execute(sa.text("INSERT INTO \"Parts\" VALUES (1, 'Brake Pad', 'Polo', 450, 300, 7, 'Acme')"))
+        conn.execute(sa.text("INSERT INTO \"Customers\" VALUES (1, 'Thandi M', NULL, NULL, NULL)"))
+        conn.execute(sa.text("INSERT INTO \"Sales\" VALUES (1, 1, 1, 2, 900, :day)"),
+                     {"day": datetime(2024, 3, 1, 10, 30)})
+
+
+def test_a_fresh_database_ends_up_with_the_current_schema(bare):
+    assert migrate.upgrade(bare) == [migration.version for migration in migrate.MIGRATIONS]
+
+    head = {table.name: ({column.name for column in table.columns}, {index.name for index in table.indexes})
+            for table in metadata.sorted_tables}
+    layout = _layout(bare)
+    assert layout.keys() == head.keys()
+    for name, (columns, indexes) in head.items():
+        assert layout[name][0] == columns, name
+        assert indexes <= layout[name][1], name
+
+
+def test_each_version_creates_only_what_it_introduced(bare):
+    migrate.upgrade(bare, target=1)
+    layout = _layout(bare)
+    assert "PartsStaging" not in layout and "StockHolds" not in layout
+    assert "StockVersion" not in layout["Parts"][0]
+    assert "OrderID" not in layout["Sales"][0]
+    assert not layout["Parts"][1]
+
+    migrate.upgrade(bare, target=5)
+    layout = _layout(bare)
+    assert "PartsStaging" in layout and "StockHolds" not in layout
+    assert "UQ_Parts_PartName_CarModel" in layout["Parts"][1]
+
+    assert migrate.upgrade(bare, target=6) == [6]
+    layout = _layout(bare)
+    assert "StockHolds" in layout and "StockVersion" in layout["Parts"][0]
+
+    migrate.upgrade(bare)
+    assert "UQ_Parts_PartName_CarModel" not in _layout(bare)["Parts"][1]
+
+
+def test_a_baseline_database_upgrades_in_place(bare):
+    _baseline(bare)
+
+    migrate.upgrade(bare)
+
+    layout = _layout(bare)
+    assert {"OrderID"} <= layout["Sales"][0]
+    assert {"IX_Sales_OrderID", "IX_Sales_SaleDate", "IX_Sales_PartsID"} <= layout["Sales"][1]
+    with bare.connect() as conn:
+        part = conn.execute(sa.text('SELECT "StockQTY", "StockVersion" FROM "Parts"')).one()
+        rollup = conn.execute(sa.select(sales_daily_rollup.c.Units, sales_daily_rollup.c.Cost)).all()
+    assert tuple(part) == (7, 0)
+    assert [tuple(row) for row in rollup] == [(2, 600.0)]
+
+
+def test_duplicate_parts_stop_the_index_migration(bare):
+    _baseline(bare)
+    with bare.begin() as conn:
+        conn.execute(sa.text("INSERT INTO \"Parts\" VALUES (2, 'Brake Pad', 'Polo', 460, 310, 1, 'Acme')"))
+
+    with pytest.raises(migrate.MigrationError, match="Brake Pad"):
+        migrate.upgrade(bare)
+
+    assert set(migrate.applied_versions(bare)) == {1, 2, 3}
+
+
+def test_blank_suppliers_become_null(bare):
+    _baseline(bare)
+    with bare.begin() as conn:
+        conn.execute(sa.text("INSERT INTO \"Parts\" VALUES (2, 'Oil Filter', 'Polo', 90, 60, 3, ' ')"))
+
+    migrate.upgrade(bare)
+
+    with bare.connect() as conn:
+        suppliers = conn.execute(sa.text('SELECT "Supplier" FROM "Parts" ORDER BY "PartID"')).scalars().all()
+    assert suppliers == ["Acme", None]
+
+
+def test_a_blank_supplier_beside_a_null_one_stops_the_upgrade(bare):
+    _baseline(bare)
+    migrate.upgrade(bare, target=8)
+    with bare.begin() as conn:
+        conn.execute(sa.text("INSERT INTO \"Parts\" VALUES (2, 'Oil Filter', 'Polo', 90, 60, 3, '', 0)"))
+        conn.execute(sa.text("INSERT INTO \"Parts\" VALUES (3, 'Oil Filter', 'Polo', 95, 60, 0, NULL, 0)"))
+
+    with pytest.raises(migrate.MigrationError, match=r"Oil Filter \(Polo\)"):
+        migrate.upgrade(bare)
@@ -0,0 +1,70 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import numbering
+
+from conftest import outage
+
+
+def test_blocks_are_handed_out_from_memory(engine):
+    allocator = numbering.HiLoAllocator(engine, block_size=5)
+    statements = []
+    sa.event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    values = [allocator.next() for _ in range(12)]
+    assert values == list(range(1, 13))
+    # three blocks of five: one round trip each, plus one to create the counter
+    assert len([s for s in statements if "ReceiptCounters" in s]) == 4
+
+
+def test_allocators_never_share_a_number(engine):
+    allocators = [numbering.HiLoAllocator(engine, block_size=3) for _ in range(4)]
+    taken = []
+    lock = threading.Lock()
+
+    def till(allocator):
+        for _ in range(25):
+            value = allocator.next()
+            with lock:
+                taken.append(value)
+
+    threads = [threading.Thread(target=till, args=(allocator,)) for allocator in allocators for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(taken) == len(set(taken)) == 200
+
+
+def test_a_restart_skips_the_rest_of_its_block(engine):
+    first = numbering.HiLoAllocator(engine, block_size=10)
+    assert first.next() == 1
+    assert numbering.HiLoAllocator(engine, block_size=10).next() == 11
+
+
+def test_reserve_receipt_numbers_takes_a_consecutive_run(engine):
+    numbering.HiLoAllocator(engine, block_size=10).next()
+    assert numbering.reserve_receipt_numbers(engine, 100) == 11
+    assert numbering.HiLoAllocator(engine, block_size=10).next() == 111
+
+
+def test_receipt_numbers_carry_the_date():
+    assert numbering.format_receipt_number(42, datetime(2026, 1, 17)) == "20260117-000042"
+
+
+def test_blocks_reserved_ahead_outlast_an_outage(engine):
+    allocator = numbering.HiLoAllocator(engine, block_size=2, ahead=1)
+    assert allocator.next() == 1
+    deadline = time.monotonic() + 5
+    while not allocator._spares and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    with outage(engine):
+        assert [allocator.next() for _ in range(3)] == [2, 3, 4]
+        with pytest.raises(sa.exc.OperationalError):
+            allocator.next()
+    assert allocator.next() >= 5
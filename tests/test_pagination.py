@@ -0,0 +1,62 @@
+from datetime import date, datetime
+
+from autoparts import inventory, sales
+from autoparts.pagination import seek_after
+
+from conftest import line
+
+
+def _walk(fetch, page_size):
+    """Every page from the first, following last_key; returns the pages' PartIDs or SalesIds"""
+    pages, after = [], None
+    while True:
+        page = fetch(after, page_size)
+        pages.append(page.rows.iloc[:, 0].tolist())
+        if not page.has_next:
+            return pages
+        after = page.last_key
+
+
+def test_pages_cover_every_part_once_in_stock_order(engine, make_part):
+    # many ties on StockQTY, broken by PartID
+    part_ids = [make_part(stock=stock % 4) for stock in range(23)]
+
+    pages = _walk(lambda after, size: inventory.parts_page(engine, [], after, size), 5)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    expected = sorted(part_ids, key=lambda part_id: ((part_id - 1) % 4, part_id))
+    assert [part_id for page in pages for part_id in page] == expected
+
+
+def test_a_page_boundary_does_not_move_when_rows_are_added(engine, make_part):
+    for stock in range(10):
+        make_part(stock=stock)
+    first = inventory.parts_page(engine, [], None, 4)
+
+    make_part(stock=0)
+    second = inventory.parts_page(engine, [], first.last_key, 4)
+
+    assert first.last_key == (3, 4)
+    assert second.rows["PartID"].tolist() == [5, 6, 7, 8]
+
+
+def test_history_pages_run_newest_first_through_equal_sale_dates(engine, make_part, customer_id):
+    part_id = make_part(stock=100)
+    for n in range(7):
+        sold_at = datetime(2025, 3, 1 + n // 3, 12)
+        sales.checkout(engine, customer_id, [line(part_id, 1)], sold_at, f"R-{n}")
+    conditions = sales.history_filters(date(2025, 3, 1), date(2025, 3, 31))
+
+    pages = _walk(lambda after, size: sales.history_page(engine, conditions, after, size), 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [sales_id for page in pages for sales_id in page] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_seek_after_expands_to_plain_comparisons(engine):
+    condition = seek_after(sales.HISTORY_KEYS, (datetime(2025, 3, 1), 9))
+
+    sql = str(condition.compile(engine))
+
+    # SQL Server has no (a, b) < (x, y)
+    assert sql == '"Sales"."SaleDate" < ? OR "Sales"."SaleDate" = ? AND "Sales"."SalesId" < ?'
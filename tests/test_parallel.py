@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from autoparts import config, inventory, metrics, parallel
+
+
+def test_reads_run_at_the_same_time():
+    # each read waits for the other; run one after the other, the barrier would time out
+    barrier = threading.Barrier(2, timeout=5)
+
+    futures = [parallel.submit(barrier.wait) for _ in range(2)]
+
+    assert sorted(future.result(timeout=10) for future in futures) == [0, 1]
+
+
+def test_a_failed_read_raises_where_its_result_is_used():
+    def fail(message):
+        raise LookupError(message)
+
+    future = parallel.submit(fail, "no such part")
+
+    with pytest.raises(LookupError, match="no such part"):
+        future.result(timeout=10)
+
+
+def test_reads_land_in_the_callers_trace(engine, make_part, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTOPARTS_METRICS_LOG", str(tmp_path / "metrics.jsonl"))
+    config.get_settings.cache_clear()
+    metrics.instrument(engine)
+    make_part(stock=3)
+
+    with metrics.trace("inventory") as recorded:
+        kpis = parallel.submit(inventory.parts_kpis, engine, [], section="kpis")
+        page = parallel.submit(inventory.parts_page, engine, [], None, 10)
+        assert kpis.result(timeout=10)["TotalQty"] == 3
+        assert len(page.result(timeout=10).rows) == 1
+        assert parallel.submit(metrics.current).result(timeout=10) is recorded
+
+    assert sorted(str(statement.section) for statement in recorded.statements) == ["None", "kpis"]
+    assert recorded.sections.keys() == {"kpis"}
+    assert metrics.current() is None
@@ -0,0 +1,74 @@
+import io
+
+import pandas as pd
+import sqlalchemy as sa
+
+from autoparts import inventory, pricelist
+from autoparts.__main__ import main
+from autoparts.schema import parts
+
+
+def _import(engine, csv, supplier=None, **kwargs):
+    return pricelist.import_price_list(engine, io.BytesIO(csv.encode()), pricelist.CSV, supplier, **kwargs)
+
+
+def _parts(engine):
+    with engine.connect() as conn:
+        return pd.read_sql(
+            sa.select(parts.c.PartName, parts.c.Supplier, parts.c.CostPrice, parts.c.Price, parts.c.StockQTY)
+            .order_by(parts.c.PartID),
+            conn,
+        )
+
+
+def test_parts_are_matched_per_supplier(engine, make_part):
+    make_part(stock=4, name="Brake Pad", model="VW Polo", supplier="Acme", price=150, cost=100)
+
+    result = _import(engine, "PartName,CarModel,Supplier,CostPrice,Price\n"
+                             "Brake Pad,VW Polo,Acme,110,165\n"
+                             "Brake Pad,VW Polo,Goldwagen,90,\n")
+
+    assert (result.inserted, result.updated, result.unchanged, result.superseded, result.rejected) == (1, 1, 0, 0, 0)
+    assert _parts(engine).values.tolist() == [
+        ["Brake Pad", "Acme", 110.0, 165.0, 4],
+        ["Brake Pad", "Goldwagen", 90.0, 135.0, 0],
+    ]
+
+
+def test_a_later_row_supersedes_an_earlier_one_without_rejecting_it(engine):
+    result = _import(engine, "PartName,CarModel,CostPrice\n"
+                             "Brake Pad,VW Polo,100\n"
+                             "Oil Filter,VW Polo,-1\n"
+                             "Brake Pad,VW Polo,120\n", supplier="Acme")
+
+    assert (result.rows, result.inserted, result.superseded, result.rejected) == (3, 1, 1, 1)
+    assert result.rejects["Reason"].tolist() == ["cost price missing or negative"]
+    assert _parts(engine)[["PartName", "CostPrice"]].values.tolist() == [["Brake Pad", 120.0]]
+
+
+def test_rows_without_a_supplier_match_parts_without_one(engine, make_part):
+    make_part(name="Brake Pad", model="VW Polo", price=150, cost=100)
+
+    result = _import(engine, "PartName,CarModel,CostPrice,Price\n"
+                             "Brake Pad,VW Polo,100,150\n"
+                             "Brake Pad,VW Polo,100,150\n")
+
+    assert (result.inserted, result.updated, result.unchanged, result.superseded) == (0, 0, 1, 1)
+
+
+def test_command_line_reports_superseded_rows(engine, tmp_path, capsys):
+    path = tmp_path / "prices.csv"
+    path.write_text("PartName,CarModel,CostPrice\nBrake Pad,VW Polo,100\nBrake Pad,VW Polo,120\n")
+
+    main(["pricelist", str(path), "--supplier", "Acme"])
+
+    assert capsys.readouterr().out == "2 rows: 1 inserted, 0 updated, 0 unchanged, 1 superseded, 0 rejected\n"
+
+
+def test_a_part_added_with_a_blank_supplier_is_repriced_not_duplicated(engine):
+    inventory.add_part(engine, "Brake Pad", "VW Polo", 50, 10, 4, supplier="")
+
+    result = _import(engine, "PartName,CarModel,CostPrice,Price\nBrake Pad,VW Polo,20,55\n")
+
+    assert (result.inserted, result.updated) == (0, 1)
+    assert _parts(engine).values.tolist() == [["Brake Pad", None, 20.0, 55.0, 4]]
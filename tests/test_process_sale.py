@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import sqlalchemy as sa
+from streamlit.testing.v1 import AppTest
+
+from autoparts import catalog, journal
+from autoparts.schema import sales_orders
+
+from conftest import outage, stock_of
+
+PAGE = Path(__file__).resolve().parents[1] / "app_pages" / "process_sale.py"
+
+
+def open_page():
+    at = AppTest.from_file(str(PAGE), default_timeout=30)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def sell(at, part_name, qty=1):
+    """Put ``qty`` of ``part_name`` in the cart and complete the sale"""
+    [box for box in at.selectbox if box.label == "Select Part"][0].select(part_name).run()
+    [box for box in at.number_input if box.label == "Quantity"][0].set_value(qty).run()
+    [button for button in at.button if "Add to Cart" in button.label][0].click().run()
+    [button for button in at.button if "Complete Sale" in button.label][0].click().run()
+    assert not at.exception
+    assert not [error.value for error in at.error], [error.value for error in at.error]
+
+
+def test_two_checkouts_in_a_row(engine, make_part, customer_id):
+    brake_pad = make_part(stock=5, name="Brake Pad")
+    oil_filter = make_part(stock=5, name="Oil Filter")
+    at = open_page()
+    first_receipt = at.session_state['receipt_number']
+
+    sell(at, "Brake Pad", 2)
+    assert [success.value for success in at.success] == ["Sale completed successfully! Total: R200.00"]
+    assert at.session_state['cart'] == []
+    second_receipt = at.session_state['receipt_number']
+    assert second_receipt != first_receipt
+    assert at.session_state['last_sale']['receipt_number'] == first_receipt
+
+    sell(at, "Oil Filter", 1)
+    assert at.session_state['last_sale']['receipt_number'] == second_receipt
+    assert at.session_state['receipt_number'] not in (first_receipt, second_receipt)
+
+    with engine.connect() as conn:
+        receipts = conn.execute(sa.select(sales_orders.c.ReceiptNumber).order_by(sales_orders.c.OrderID)).scalars()
+        assert list(receipts) == [first_receipt, second_receipt]
+    assert stock_of(engine, brake_pad) == 3
+    assert stock_of(engine, oil_filter) == 4
+
+
+def test_start_new_sale_dismisses_the_receipt(engine, make_part, customer_id):
+    make_part(stock=5, name="Brake Pad")
+    at = open_page()
+    sell(at, "Brake Pad")
+    [button for button in at.button if "Start New Sale" in button.label][0].click().run()
+    assert 'last_sale' not in at.session_state
+    assert [info.value for info in at.info][-1] == "Your cart is empty. Add items to begin."
+
+
+def test_sells_with_the_central_database_unreachable(engine, journal_path, make_part, customer_id):
+    brake_pad = make_part(stock=3, name="Brake Pad")
+    at = open_page()
+    first_receipt = at.session_state['receipt_number']
+
+    with outage(engine):
+        # the snapshots expire while the link is down
+        catalog.invalidate()
+        at.run()
+        sell(at, "Brake Pad", 2)
+        assert at.session_state['last_sale']['receipt_number'] == first_receipt
+        assert at.session_state['last_sale']['journaled']
+        assert at.session_state['receipt_number'] not in (None, first_receipt)
+
+        # the till counts its own unreplicated sale against the stock it shows
+        [button for button in at.button if "Start New Sale" in button.label][0].click().run()
+        assert any("**Available:** 1" in info.value for info in at.info)
+        assert journal.counts()[journal.PENDING] == 1
+
+    assert journal.drain(engine) == {journal.REPLICATED: 1}
+    assert stock_of(engine, brake_pad) == 1
@@ -0,0 +1,51 @@
+import re
+from datetime import datetime
+
+from autoparts import receipts, sales
+
+from conftest import line
+
+
+def _cells(html):
+    """The text of each item row's cells"""
+    return [re.findall(r"<td>(.*?)</td>", row) for row in re.findall(r"<tr>\s*(<td>.*?)</tr>", html, re.S)]
+
+
+def test_a_receipt_lists_every_line_with_the_totals_and_customer():
+    items = [
+        {"PartName": "Brake Pad", "CarModel": "VW Polo", "Qty": 2, "Price": 450.0, "Total": 900.0},
+        {"PartName": "Oil Filter", "CarModel": "Toyota Corolla", "Qty": 3, "Price": 111.5, "Total": 334.5},
+    ]
+
+    html = receipts.render_receipt("Thandi M", items, 1234.5, datetime(2025, 3, 1, 9, 30), "20250301-000042")
+    text = html.decode("utf-8")
+
+    assert _cells(text) == [
+        ["Brake Pad", "VW Polo", "2", "R450.00", "R900.00"],
+        ["Oil Filter", "Toyota Corolla", "3", "R111.50", "R334.50"],
+    ]
+    assert "<strong>Customer:</strong> Thandi M" in text
+    assert "<strong>Receipt No:</strong> 20250301-000042" in text
+    assert "<strong>Date:</strong> 2025-03-01 09:30:00" in text
+    assert "R1,234.50" in text
+
+
+def test_names_are_escaped():
+    items = [{"PartName": 'Wiper <12">', "CarModel": "Ford & Co", "Qty": 1, "Price": 80.0, "Total": 80.0}]
+
+    text = receipts.render_receipt("<script>alert(1)</script>", items, 80.0, datetime(2025, 3, 1), "R-1").decode()
+
+    assert "<script>" not in text and "&lt;script&gt;alert(1)&lt;/script&gt;" in text
+    assert _cells(text) == [["Wiper &lt;12&quot;&gt;", "Ford &amp; Co", "1", "R80.00", "R80.00"]]
+
+
+def test_a_stored_order_reprints_as_it_was_sold(engine, make_part, customer_id):
+    brake_pad = make_part(stock=5, price=450, name="Brake Pad")
+    oil_filter = make_part(stock=5, price=120, name="Oil Filter")
+    sales.checkout(engine, customer_id, [line(brake_pad, 2, 450), line(oil_filter, 1, 120)],
+                   datetime(2025, 3, 1, 9), "R-1")
+
+    text = receipts.render_order(sales.find_order(engine, "R-1")).decode()
+
+    assert [cells[0] for cells in _cells(text)] == ["Brake Pad", "Oil Filter"]
+    assert "Test Customer" in text and "R1,020.00" in text
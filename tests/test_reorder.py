@@ -0,0 +1,70 @@
+from datetime import date, datetime
+
+import pytest
+
+from autoparts import inventory, reorder, rollup, sales, search
+from autoparts.__main__ import main
+from autoparts.schema import sales as sales_table
+from conftest import line
+
+
+@pytest.fixture
+def shelf(engine, make_part, customer_id):
+    """A part selling out, one barely stocked that never sells, and one well stocked"""
+    selling = make_part(stock=22, name="Brake Pad Front")
+    idle = make_part(stock=1, name="Brake Pad Rear")
+    plenty = make_part(stock=500, name="Brake Disc")
+    sales.checkout(engine, customer_id, [line(selling, 20), line(plenty, 1)], datetime.now(), "R-1")
+    return selling, idle, plenty
+
+
+def test_only_parts_at_their_reorder_point_are_due(engine, shelf):
+    selling, idle, plenty = shelf
+
+    assert reorder.reorder_ids(engine) == [selling]
+    assert reorder.statuses(engine, [idle])[idle] == reorder.NO_SALES
+
+
+def test_the_inventory_filter_follows_the_reorder_plan(engine, shelf):
+    selling, _idle, _plenty = shelf
+
+    page = inventory.parts_page(engine, inventory.part_filters(reorder_ids=reorder.reorder_ids(engine)))
+
+    assert page.rows["PartID"].tolist() == [selling]
+    assert inventory.parts_kpis(engine, inventory.part_filters(reorder_ids=[]))["TotalItems"] == 0
+
+
+def test_search_can_be_limited_to_the_parts_due(engine, shelf):
+    selling, _idle, _plenty = shelf
+
+    assert search.search("brake", engine, part_ids=reorder.reorder_ids(engine)) == [selling]
+
+
+def test_low_stock_command_lists_the_reorder_list(engine, shelf, capsys):
+    main(["low-stock"])
+
+    out = capsys.readouterr().out
+    assert "Brake Pad Front" in out
+    assert "Brake Pad Rear" not in out and "Brake Disc" not in out
+
+
+def test_days_rebuilt_elsewhere_are_read_again(engine, make_part, customer_id):
+    part_id = make_part(stock=100)
+    sales.checkout(engine, customer_id, [line(part_id, 2)], datetime(2025, 3, 1, 9), "R-1")
+    sales.checkout(engine, customer_id, [line(part_id, 3)], datetime(2025, 3, 9, 9), "R-2")
+    state = reorder.Velocity(window=30, refresh=0)
+    state.refresh(engine, today=date(2025, 3, 10))
+    assert state.totals()[1].to_dict() == {part_id: 5}
+
+    # Sales corrected by hand, then `python -m autoparts.rollup rebuild` in another process
+    with engine.begin() as conn:
+        conn.execute(sales_table.update().where(sales_table.c.SaleDate < datetime(2025, 3, 2)).values(QuantitySold=6))
+        rollup.rebuild(conn, date(2025, 3, 1), date(2025, 3, 2))
+    state.refresh(engine, today=date(2025, 3, 10))
+    assert state.totals()[1].to_dict() == {part_id: 9}
+
+    with engine.begin() as conn:
+        conn.execute(sales_table.delete().where(sales_table.c.SaleDate > datetime(2025, 3, 2)))
+        rollup.rebuild(conn)
+    state.refresh(engine, today=date(2025, 3, 10))
+    assert state.totals()[1].to_dict() == {part_id: 6}
@@ -0,0 +1,76 @@
+import io
+import zipfile
+from datetime import date, datetime
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import receipts, replica, rollup, sales
+from autoparts.schema import sales as sales_table, sales_daily_rollup
+
+from conftest import line
+
+pytest.importorskip("duckdb_engine")
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def root(engine, tmp_path):
+    yield tmp_path / "replica"
+    replica.replica_engine.cache_clear()
+
+
+def _units_by_day(root):
+    day = sales_daily_rollup.c.SaleDay
+    with replica.replica_engine(str(root)).connect() as conn:
+        rows = conn.execute(sa.select(day, sa.func.sum(sales_daily_rollup.c.Units)).group_by(day).order_by(day))
+        return {str(sale_day): int(units) for sale_day, units in rows}
+
+
+@pytest.fixture
+def two_months(engine, root, make_part, customer_id):
+    part_id = make_part(stock=100)
+    sales.checkout(engine, customer_id, [line(part_id, 2)], datetime(2024, 1, 10, 9), "R-1")
+    sales.checkout(engine, customer_id, [line(part_id, 3)], datetime(2024, 2, 5, 9), "R-2")
+    replica.sync(engine, root)
+    assert _units_by_day(root) == {"2024-01-10": 2, "2024-02-05": 3}
+    return part_id
+
+
+def _correct(engine, receipt_number, qty):
+    order_id = sales.find_order(engine, receipt_number).order_id
+    with engine.begin() as conn:
+        conn.execute(sales_table.update().where(sales_table.c.OrderID == order_id).values(QuantitySold=qty))
+
+
+def test_a_rebuilt_older_month_is_copied_again(engine, root, two_months):
+    _correct(engine, "R-1", 5)
+    with engine.begin() as conn:
+        rollup.rebuild(conn, date(2024, 1, 1), date(2024, 2, 1))
+
+    assert replica.sync(engine, root)["sales"] == 0
+    assert _units_by_day(root) == {"2024-01-10": 5, "2024-02-05": 3}
+
+    # nothing rebuilt since: the months are left alone
+    replica.sync(engine, root)
+    assert _units_by_day(root) == {"2024-01-10": 5, "2024-02-05": 3}
+
+
+def test_a_full_rebuild_replaces_every_month(engine, root, two_months):
+    with engine.begin() as conn:
+        conn.execute(sales_table.delete().where(sales_table.c.SaleDate < datetime(2024, 2, 1)))
+        rollup.rebuild(conn)
+
+    replica.sync(engine, root)
+
+    assert _units_by_day(root) == {"2024-02-05": 3}
+
+
+def test_receipts_export_reads_the_replica(engine, root, two_months):
+    archive = io.BytesIO()
+    report_engine = replica.replica_engine(str(root))
+
+    written = receipts.write_receipts_zip(report_engine, date(2024, 1, 1), date(2024, 2, 29), archive)
+
+    assert written == 2
+    assert sorted(zipfile.ZipFile(archive).namelist()) == ["receipt_R-1.html", "receipt_R-2.html"]
@@ -0,0 +1,30 @@
+from datetime import date
+
+import pytest
+
+from autoparts import reports
+
+TODAY = date(2025, 3, 15)
+
+
+@pytest.mark.parametrize("period, expected", [
+    ("Current Month", (date(2025, 3, 1), date(2025, 4, 1))),
+    ("Last Month", (date(2025, 2, 1), date(2025, 3, 1))),
+    ("Last 30 Days", (date(2025, 2, 14), date(2025, 3, 16))),
+    ("12", (date(2025, 12, 1), date(2026, 1, 1))),
+    ("All Time", (None, None)),
+])
+def test_period_ranges_are_half_open(period, expected):
+    assert reports.period_range(period, 2025, today=TODAY) == expected
+
+
+def test_the_last_30_days_are_30_days_ending_today():
+    start, end = reports.period_range("Last 30 Days", today=TODAY)
+
+    assert (end - start).days == 30
+    assert start <= TODAY < end
+
+
+def test_a_custom_range_includes_its_end_day():
+    assert reports.period_range("Custom Range", custom_start=date(2025, 1, 1), custom_end=date(2025, 1, 31)) == (
+        date(2025, 1, 1), date(2025, 2, 1))
@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+import pytest
+import sqlalchemy as sa
+
+from autoparts import rollup, sales
+from autoparts.inventory import InsufficientStockError
+from autoparts.schema import sales_daily_rollup
+
+from conftest import line
+
+
+def _rollup(engine):
+    r = sales_daily_rollup.c
+    with engine.connect() as conn:
+        rows = conn.execute(
+            sa.select(r.SaleDay, r.PartID, r.CustomerID, r.Lines, r.Units, r.Revenue, r.Cost)
+            .order_by(r.SaleDay, r.PartID, r.CustomerID)
+        ).all()
+    return [tuple(row) for row in rows]
+
+
+def test_checkouts_keep_the_rollup_as_a_rebuild_would(engine, make_part, customer_id):
+    brake_pad = make_part(stock=20, price=100, cost=60)
+    oil_filter = make_part(stock=20, price=50, cost=20)
+    sales.checkout(engine, customer_id, [line(brake_pad, 2), line(oil_filter, 1, 50)], datetime(2025, 3, 1, 9), "R-1")
+    sales.checkout(engine, customer_id, [line(brake_pad, 1), line(brake_pad, 3)], datetime(2025, 3, 1, 16), "R-2")
+    sales.checkout(engine, customer_id, [line(oil_filter, 4, 50)], datetime(2025, 3, 2, 10), "R-3")
+
+    kept = _rollup(engine)
+
+    assert kept == [
+        (date(2025, 3, 1), brake_pad, customer_id, 3, 6, 600.0, 360.0),
+        (date(2025, 3, 1), oil_filter, customer_id, 1, 1, 50.0, 20.0),
+        (date(2025, 3, 2), oil_filter, customer_id, 1, 4, 200.0, 80.0),
+    ]
+    with engine.begin() as conn:
+        rollup.rebuild(conn)
+    assert _rollup(engine) == kept
+
+
+def test_a_failed_checkout_leaves_the_rollup_alone(engine, make_part, customer_id):
+    part_id = make_part(stock=1)
+
+    with pytest.raises(InsufficientStockError):
+        sales.checkout(engine, customer_id, [line(part_id, 2)], datetime(2025, 3, 1, 9), "R-1")
+
+    assert _rollup(engine) == []
+
+
+def test_rebuilding_a_range_leaves_other_days_alone(engine, make_part, customer_id):
+    part_id = make_part(stock=20)
+    sales.checkout(engine, customer_id, [line(part_id, 2)], datetime(2025, 2, 28, 9), "R-1")
+    sales.checkout(engine, customer_id, [line(part_id, 3)], datetime(2025, 3, 1, 9), "R-2")
+    with engine.begin() as conn:
+        conn.execute(sales_daily_rollup.delete())
+
+        assert rollup.rebuild(conn, date(2025, 3, 1), date(2025, 4, 1)) == 1
+
+    assert [(day, units) for day, _part, _customer, _lines, units, *_ in _rollup(engine)] == [(date(2025, 3, 1), 3)]
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from autoparts import inventory, search
+from autoparts.search import PartSearchIndex
+
+PAGE = Path(__file__).resolve().parents[1] / "app_pages" / "inventory_view.py"
+
+
+def _index():
+    return PartSearchIndex(
+        part_ids=[1, 2, 3, 4, 5],
+        names=["Brake Pad", "Brakeline Hose", "Wiper Blade", "Brake Pad Set", "Oil Filter"],
+        models=["VW Polo", "VW Polo", "Padstow", "Toyota Corolla", "VW Polo"],
+        stock=[5, 5, 5, 0, 5],
+    )
+
+
+def test_whole_words_rank_above_prefixes_and_names_above_models():
+    index = _index()
+
+    # in stock before out of stock, then the shorter name
+    assert index.search("brake") == [1, 4, 2]
+    assert index.search("pad") == [1, 4, 3]
+    assert index.search("pad", fields=search.NAME) == [1, 4]
+
+
+def test_every_query_word_must_match():
+    index = _index()
+
+    assert index.search("brak pol") == [1, 2]
+    assert index.search("brake hose") == [2]
+    assert index.search("brake filter") == []
+    assert index.search("  ") == []
+
+
+def test_filters_and_limit_apply_before_the_cut_off():
+    index = _index()
+
+    assert index.search("brake", car_model="Toyota Corolla") == [4]
+    assert index.search("brake", part_ids=[2, 4]) == [4, 2]
+    assert index.search("brake", limit=1) == [1]
+    assert index.search("brake", limit=None) == [1, 4, 2]
+
+
+def test_upsert_and_remove_keep_the_words_in_step():
+    index = _index()
+
+    index.upsert(6, "Brake Disc", "VW Golf", 3)
+    index.upsert(2, "Fuel Hose", "VW Polo", 5)
+    index.remove(5)
+
+    assert index.search("brake") == [1, 6, 4]
+    assert index.search("brakeline") == []
+    assert index.search("fuel") == [2]
+    assert index.search("oil") == []
+    assert len(index) == 5
+
+
+def test_the_live_index_follows_new_parts_and_restocks(engine, make_part):
+    empty = make_part(stock=0, name="Brake Pad")
+    assert search.search("brake", engine) == [empty]
+
+    stocked = inventory.add_part(engine, "Brake Pad Kit", "VW Polo", 100, 60, 2)
+    assert search.search("brake", engine) == [stocked, empty]
+
+    inventory.receive_goods(engine, [(empty, 5)])
+    assert search.search("brake", engine) == [empty, stocked]
+
+
+def test_inventory_totals_cover_every_match_not_just_the_listed_ones(engine, make_part, monkeypatch):
+    monkeypatch.setattr(search, "DEFAULT_LIMIT", 2)
+    for stock in (1, 2, 3):
+        make_part(stock=stock, price=10, name=f"Brake Pad {stock}")
+    make_part(stock=50, price=10, name="Oil Filter")
+
+    at = AppTest.from_file(str(PAGE), default_timeout=30).run()
+    at.text_input[0].input("brake").run()
+
+    assert not at.exception
+    assert [metric.value for metric in at.metric] == ["3", "6", "R 60.00"]
+    assert any("top 2 of 3 matches" in caption.value for caption in at.caption)